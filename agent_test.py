@@ -3,10 +3,12 @@ tests to run and debug your minimax and alphabeta agents locally.  The test
 cases used by the project assistant are not public.
 """
 
+import ast
 import unittest
 
 import isolation
 import game_agent
+import competition_agent
 
 from importlib import reload
 
@@ -20,6 +22,23 @@ class IsolationTest(unittest.TestCase):
         self.player2 = "Player2"
         self.game = isolation.Board(self.player1, self.player2)
 
+    def test_agent_only_imports_allowed_modules(self):
+        # the project assistant and the PvP competition only allow these
+        # modules in the files they load
+        allowed = {"random", "numpy", "scipy", "sklearn", "itertools", "math", "heapq",
+                   "collections", "array", "copy", "operator"}
+        for module in (game_agent, competition_agent):
+            with open(module.__file__) as f:
+                tree = ast.parse(f.read())
+            modules = set()
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Import):
+                    modules.update(alias.name.split(".")[0] for alias in node.names)
+                elif isinstance(node, ast.ImportFrom):
+                    modules.add(node.module.split(".")[0])
+            with self.subTest(module=module.__name__):
+                self.assertLessEqual(modules, allowed)
+
 
 if __name__ == '__main__':
     unittest.main()
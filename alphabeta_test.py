@@ -1,10 +1,14 @@
+import pickle
+import time
 import unittest
 import unittest.mock as mock
 
 import isolation
 import game_agent
+import parallel_agent
 
-from sample_players import open_move_score
+from sample_players import open_move_score, improved_score
+from benchmarks.movegen import position_for, random_positions
 
 from importlib import reload
 
@@ -14,6 +18,7 @@ class AlphaBetaTest(unittest.TestCase):
 
     def setUp(self):
         reload(game_agent)
+        reload(parallel_agent)
         self.player1 = game_agent.AlphaBetaPlayer(score_fn=open_move_score, search_depth=3)
         self.player2 = "Player2"
         self.game = isolation.Board(self.player1, self.player2)
@@ -52,6 +57,279 @@ class AlphaBetaTest(unittest.TestCase):
             self.player1.get_move(self.game, lambda : 15. if self.player1.search_depth <= 2 else 0.)
             self.assertEqual(alphabeta_fn.call_count, 3)
 
+    def test_search_does_not_copy_board(self):
+        self.game.apply_move((2, 3))
+        self.game.apply_move((0, 5))
+        before = self.game.to_string()
+        self.player1.time_left = lambda : 15.
+        with mock.patch.object(self.game, 'copy', wraps=self.game.copy) as copy_fn:
+            self.player1.alphabeta(self.game, 3)
+            self.assertEqual(copy_fn.call_count, 0)
+        self.assertEqual(self.game.to_string(), before)
+        self.assertEqual(self.game.active_player, self.player1)
+
+    def test_transposition_table_preserves_minimax_value(self):
+        def move_value(game, move, depth):
+            minimax_player = game_agent.MinimaxPlayer(score_fn=improved_score, search_depth=depth)
+            minimax_player.time_left = lambda : 15.
+            board = position_for(game, minimax_player, self.player2)
+            board.apply_move(move)
+            return minimax_player._min_value(board, 1)
+
+        for position in random_positions(7, 7, 10, seed=5):
+            moves = []
+            for tt_size_mb in (0, 1):
+                player = game_agent.AlphaBetaPlayer(score_fn=improved_score, tt_size_mb=tt_size_mb)
+                player.time_left = lambda : 15.
+                game = position_for(position, player, self.player2)
+                player._prepare_tt(game)
+                for depth in range(1, 4):
+                    player.search_depth = depth
+                    move = player.alphabeta(game, depth)
+                moves.append(move)
+            self.assertEqual(move_value(position, moves[0], 3), move_value(position, moves[1], 3))
+
+    def test_transposition_table_is_cleared_for_new_game(self):
+        self.player1.time_left = lambda : 15.
+        self.player1._prepare_tt(self.game)
+        self.player1.alphabeta(self.game, 3)
+        self.assertGreater(len(self.player1.tt), 0)
+
+        self.player1._prepare_tt(isolation.Board(self.player1, self.player2))
+        self.assertEqual(len(self.player1.tt), 0)
+
+    def test_transposition_table_is_allocated_by_search(self):
+        # unpickled players (e.g., in tournament workers) hold no slots until
+        # they search
+        clone = pickle.loads(pickle.dumps(self.player1.tt))
+        self.assertIsNone(clone._entries)
+        self.assertEqual(len(clone), 0)
+        self.assertIsNone(clone.lookup(self.game.zobrist))
+        clone.store(self.game.zobrist, 1, clone.EXACT, 0., (2, 3))
+        self.assertEqual(len(clone._entries), clone.size)
+        self.assertEqual(clone.lookup(self.game.zobrist)[4], (2, 3))
+        clone.clear()
+        self.assertIsNone(clone._entries)
+
+    def test_get_move_records_pv_and_node_counts(self):
+        self.game.apply_move((2, 3))
+        self.game.apply_move((0, 5))
+        best_move = self.player1.get_move(self.game, lambda : 15. if self.player1.search_depth <= 4 else 0.)
+        self.assertEqual(len(self.player1.node_counts), 4)
+        self.assertEqual(self.player1.pv[0], best_move)
+        self.assertLessEqual(len(self.player1.pv), 4)
+        self.assertEqual(self.player1.node_counts, sorted(self.player1.node_counts))
+
+    def test_search_is_carried_over_to_next_move(self):
+        for reuse_search in (True, False):
+            player = game_agent.AlphaBetaPlayer(score_fn=improved_score, endgame_threshold=None,
+                                                reuse_search=reuse_search)
+            game = isolation.Board(player, self.player2)
+            game.apply_move((2, 3))
+            game.apply_move((0, 5))
+            time_left = lambda : 15. if player.search_depth < 5 else 0.
+            move = player.get_move(game, time_left)
+            pv = list(player.pv)
+            game.apply_move(move)
+            game.apply_move(pv[1])
+
+            move = player.get_move(game, time_left)
+            self.assertIn(move, game.get_legal_moves())
+            if reuse_search:
+                # the last search reached depth 4, so it searched the
+                # position after the reply two plies deep
+                self.assertEqual(player.node_counts[0], 0)
+                self.assertGreater(player.node_counts[1], 0)
+            else:
+                self.assertNotIn(0, player.node_counts)
+
+    def test_pondering_carries_search_over_to_next_move(self):
+        player = parallel_agent.PonderingAlphaBetaPlayer(score_fn=improved_score,
+                                                         endgame_threshold=None, ponder_depth=5)
+        time_left = lambda : 15. if player.search_depth < 3 else 0.
+        try:
+            game = isolation.Board(player, self.player2)
+            game.apply_move((2, 3))
+            game.apply_move((0, 5))
+            for hit in (True, False):
+                move = player.get_move(game, time_left)
+                game.apply_move(move)
+                state = game._board_state
+                player.notify_move(game, move)
+                self.assertEqual(game._board_state, state)
+                replies = game.get_legal_moves()
+                reply = player.pv[1] if hit else next(r for r in replies if r != player.pv[1])
+                game.apply_move(reply)
+                player.notify_move(game, reply)
+
+                move = player.get_move(game, time_left)
+                self.assertIn(move, game.get_legal_moves())
+                if hit:
+                    # the search starts from the pondered depth, beyond this
+                    # move's limit
+                    self.assertEqual(player.ponder_hits, 1)
+                    self.assertEqual(player.node_counts, [0] * 4)
+                else:
+                    self.assertEqual(player.ponder_misses, 1)
+                    self.assertNotIn(0, player.node_counts)
+        finally:
+            player.close()
+
+    def test_late_pondering_results_are_dropped(self):
+        player = parallel_agent.PonderingAlphaBetaPlayer(score_fn=improved_score,
+                                                         endgame_threshold=None)
+        try:
+            game = isolation.Board(player, self.player2)
+            game.apply_move((2, 3))
+            game.apply_move((0, 5))
+            move = player.get_move(game, lambda : 0. if player.search_depth > 2 else 15.)
+            game.apply_move(move)
+            player.notify_move(game, move)
+            game.apply_move(player.pv[1])
+            # let the pondering search get going, so it can't answer at once
+            time.sleep(.1)
+
+            # the reply isn't reported, so the pondering process is only
+            # stopped by get_move(), which has no time left to wait for it
+            player.get_move(game, lambda : player.TIMER_THRESHOLD)
+            self.assertEqual((player.ponder_hits, player.ponder_timeouts), (0, 1))
+
+            # the late results are read before the next ponder starts
+            move = game.get_legal_moves()[0]
+            game.apply_move(move)
+            player.notify_move(game, move)
+            self.assertFalse(player._ponder_unread)
+        finally:
+            player.close()
+
+    def test_search_clock_amortizes_timer_checks(self):
+        player = game_agent.AlphaBetaPlayer(score_fn=improved_score, endgame_threshold=None)
+        game = isolation.Board(player, self.player2)
+        game.apply_move((2, 3))
+        game.apply_move((0, 5))
+        calls = []
+
+        def time_left():
+            calls.append(player.search_depth)
+            return 15. if player.search_depth <= 4 else 0.
+
+        player.get_move(game, time_left)
+        stats = player.move_stats[-1]
+        self.assertEqual(stats.depth, 4)
+        self.assertEqual(stats.time_left, 0.)
+        # the clock counts the nodes below the root of each iteration
+        self.assertEqual(stats.nodes, sum(player.node_counts) - len(player.node_counts))
+        self.assertLess(len(calls), sum(player.node_counts) / 4)
+        self.assertEqual(player.timeout_depths, [])
+
+    def test_move_stats_are_bounded(self):
+        player = game_agent.AlphaBetaPlayer(score_fn=improved_score)
+        for depth in range(player.MOVE_STATS_LIMIT + 10):
+            player._start_clock(lambda : 15.)
+            player._stop_clock(depth)
+        self.assertEqual(len(player.move_stats), player.MOVE_STATS_LIMIT)
+        self.assertEqual(player.move_stats[-1].depth, player.MOVE_STATS_LIMIT + 9)
+
+    def test_time_manager_predicts_next_iteration(self):
+        clock = [100.]
+        manager = game_agent.TimeManager(lambda : clock[0], 10.)
+        self.assertTrue(manager.should_continue())
+        clock[0] = 98.
+        manager.iteration_done(10, (1, 2))
+        clock[0] = 92.
+        manager.iteration_done(40, (1, 2))
+        self.assertEqual(manager.predicted_time(), 24.)
+        self.assertTrue(manager.should_continue())
+
+        # a stable search only starts iterations that can complete, while an
+        # unstable one accepts completing part of the iteration
+        clock[0] = 30.
+        self.assertFalse(manager.should_continue())
+        manager.iterations[-1] = (40, 6., (2, 1))
+        self.assertTrue(manager.should_continue())
+        clock[0] = 20.
+        self.assertFalse(manager.should_continue())
+
+    def test_search_modes_agree_on_root_value(self):
+        for position in random_positions(7, 7, 10, seed=3, max_plies=16):
+            values = []
+            for options in ({}, {"search_mode": "pvs"},
+                            {"search_mode": "pvs", "aspiration_window": 1.}):
+                player = game_agent.AlphaBetaPlayer(score_fn=improved_score, **options)
+                game = position_for(position, player, self.player2)
+                player.get_move(game, lambda : 0. if player.search_depth > 4 else 15.)
+                values.append(player.root_value)
+            self.assertEqual(values[0], values[1])
+            self.assertEqual(values[0], values[2])
+
+    def test_parallel_search_matches_serial_search(self):
+        serial = game_agent.AlphaBetaPlayer(score_fn=improved_score)
+        with parallel_agent.ParallelAlphaBetaPlayer(score_fn=improved_score,
+                                                    processes=2) as parallel:
+            for position in random_positions(7, 7, 5, seed=3, max_plies=16):
+                values = []
+                for player in (serial, parallel):
+                    game = position_for(position, player, self.player2)
+                    player.get_move(game, lambda : 0. if player.search_depth > 3 else float("inf"))
+                    values.append(player.root_value)
+                self.assertEqual(values[0], values[1])
+
+    def test_parallel_search_is_carried_over_to_next_move(self):
+        with parallel_agent.ParallelAlphaBetaPlayer(
+                score_fn=improved_score, endgame_threshold=None, processes=2,
+                reuse_search=True) as player:
+            game = isolation.Board(player, self.player2)
+            game.apply_move((2, 3))
+            game.apply_move((0, 5))
+            time_left = lambda : float("inf") if player.search_depth < 5 else 0.
+            move = player.get_move(game, time_left)
+            game.apply_move(move)
+            game.apply_move(player.pv[1])
+
+            move = player.get_move(game, time_left)
+            self.assertIn(move, game.get_legal_moves())
+            # the PV of the last search reached depth 4, two plies below
+            # this root
+            self.assertEqual(player.node_counts[0], 0)
+            self.assertGreater(player.node_counts[1], 0)
+            self.assertEqual([stats.depth for stats in player.move_stats], [4, 4])
+            self.assertEqual(player.move_stats[-1].nodes, sum(player.node_counts))
+
+    def test_parallel_pool_is_started_by_context(self):
+        player = parallel_agent.ParallelAlphaBetaPlayer(processes=2)
+        self.assertIsNone(player._pool)
+        with player:
+            self.assertIsNotNone(player._pool)
+            self.assertTrue(player._pool_finalizer.alive)
+        self.assertIsNone(player._pool)
+
+    def test_unknown_search_mode_raises(self):
+        with self.assertRaises(ValueError):
+            game_agent.AlphaBetaPlayer(search_mode="mtdf")
+
+    def test_endgame_solver_matches_exhaustive_search(self):
+        def wins(game):
+            return any(not wins(game.forecast_move(m)) for m in game.get_legal_moves())
+
+        solver = game_agent.EndgameSolver(blank_threshold=10)
+        for game in random_positions(5, 5, 200, seed=3):
+            if (game.get_player_location(game.inactive_player) is None or
+                    len(game.get_blank_spaces()) > 10):
+                continue
+            move = solver.best_move(game, lambda: None)
+            if game.is_partitioned():
+                self.assertIn(move, game.get_legal_moves() or [None])
+                self.assertEqual(solver._solve(game), wins(game))
+            else:
+                self.assertEqual(move is not None, wins(game))
+            if move is not None and wins(game):
+                self.assertFalse(wins(game.forecast_move(move)))
+
+    def test_endgame_solver_is_opt_in(self):
+        self.assertIsNone(self.player1.endgame)
+        player = game_agent.AlphaBetaPlayer(endgame_threshold=12)
+        self.assertEqual(player.endgame.blank_threshold, 12)
+
 
 if __name__ == '__main__':
     unittest.main()
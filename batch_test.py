@@ -0,0 +1,61 @@
+import random
+import unittest
+
+import isolation
+
+from benchmarks.movegen import random_positions
+
+try:
+    import numpy as np
+    from isolation.batch import BatchBoard, random_win_rate
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class BatchBoardTest(unittest.TestCase):
+    """Unit tests for isolation.batch.BatchBoard"""
+
+    def setUp(self):
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+
+    def test_legal_moves_match_board(self):
+        for width, height in [(7, 7), (5, 8)]:
+            games = random_positions(width, height, 20)
+            games.append(isolation.Board(self.player1, self.player2, width, height))
+            for game in games:
+                batch = BatchBoard.from_board(game, 1)
+                legal = {r + c * height for r, c in game.get_legal_moves()}
+                self.assertEqual(set(np.flatnonzero(batch.legal_move_mask()[0])), legal)
+
+                board = batch.to_board(0, game._player_1, game._player_2)
+                self.assertEqual(board._board_state, game._board_state)
+                self.assertIs(board.active_player, game.active_player)
+
+    def test_random_games_follow_board_rules(self):
+        batch = BatchBoard(50, width=6, height=5, seed=1)
+        boards = [isolation.Board(self.player1, self.player2, 6, 5) for _ in range(batch.size)]
+        while True:
+            moves = batch.random_moves()
+            batch.update_winners()
+            for board, move, winner in zip(boards, moves, batch.winner):
+                if move < 0:
+                    self.assertTrue(board.is_loser(board.active_player))
+                    self.assertEqual(winner, int(board.inactive_player == self.player2))
+                else:
+                    self.assertIn((move % 5, move // 5), board.get_legal_moves())
+                    board.apply_move((move % 5, move // 5))
+            if not (moves >= 0).any():
+                break
+            batch.apply_moves(moves)
+        self.assertTrue(batch.done.all())
+
+        random.seed(0)
+        self.assertTrue(0 <= random_win_rate(boards[0], 100, seed=0) <= 1)
+        self.assertEqual(list(BatchBoard(20, seed=3).play_random()),
+                         list(BatchBoard(20, seed=3).play_random()))
+
+
+if __name__ == '__main__':
+    unittest.main()
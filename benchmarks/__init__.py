@@ -0,0 +1,6 @@
+"""
+Micro-benchmarks for the isolation engine and the search agents. Each module
+is a script that can be run from the repository root, e.g.
+
+    python -m benchmarks.movegen
+"""
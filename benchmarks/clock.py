@@ -0,0 +1,81 @@
+"""Measure the cost of reading the timer at every node, as `_terminal_test`
+did before the `SearchClock` amortized the checks, against the clock, on a
+corpus of random mid-game positions:
+
+  * the search speed (nodes per second) of fixed-depth iterative deepening
+    with the same `time_left` closures as `Board.play`, and
+  * the time left when timed searches return (which must stay above 0).
+
+    python -m benchmarks.clock
+"""
+import timeit
+
+from sample_players import improved_score
+from game_agent import AlphaBetaPlayer
+
+from benchmarks.movegen import position_for, random_positions
+
+TIME_LIMIT = 150  # number of milliseconds per move
+FIXED_DEPTH = 5
+NUM_POSITIONS = 30
+MAX_PLIES = 16
+
+
+class PerNodeTimer(AlphaBetaPlayer):
+    """An `AlphaBetaPlayer` reading the timer at every node. """
+
+    def _start_clock(self, time_left):
+        self.time_left = time_left
+        self._clock = None
+
+    def _stop_clock(self, depth, nodes=None):
+        pass
+
+
+def _setup(position, player_cls):
+    """Return a new player of class `player_cls` and a copy of `position`
+    where that player holds the initiative.
+    """
+    player = player_cls(score_fn=improved_score, endgame_threshold=None, reuse_search=False)
+    return player, position_for(position, player)
+
+
+def play_clock(time_limit):
+    """Return a `time_left` function built like the one in `Board.play`. """
+    time_millis = lambda: 1000 * timeit.default_timer()
+    move_start = time_millis()
+    return lambda: time_limit - (time_millis() - move_start)
+
+
+def main():
+    positions = random_positions(7, 7, NUM_POSITIONS, seed=7, max_plies=MAX_PLIES)
+
+    # warm up, so the first configuration isn't penalized
+    for position in positions:
+        player, game = _setup(position, AlphaBetaPlayer)
+        player.get_move(game, lambda: 1. if player.search_depth > FIXED_DEPTH else float("inf"))
+
+    print("{:<16}{:>16}{:>20}{:>20}".format(
+        "Timer checks", "nodes / s", "mean time left", "min time left"))
+    for name, player_cls in (("every node", PerNodeTimer), ("SearchClock", AlphaBetaPlayer)):
+        nodes = elapsed = 0
+        for position in positions:
+            player, game = _setup(position, player_cls)
+            clock = play_clock(float("inf"))
+            start = timeit.default_timer()
+            player.get_move(game, lambda: 1. if player.search_depth > FIXED_DEPTH else clock())
+            elapsed += timeit.default_timer() - start
+            nodes += sum(player.node_counts)
+
+        left = []
+        for position in positions:
+            player, game = _setup(position, player_cls)
+            clock = play_clock(TIME_LIMIT)
+            player.get_move(game, clock)
+            left.append(clock())
+        print("{:<16}{:>16,.0f}{:>17.2f} ms{:>17.2f} ms".format(
+            name, nodes / elapsed, sum(left) / len(left), min(left)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Measure the playout throughput (playouts per second) of the Monte Carlo
+tree search agent in `competition_agent.CustomPlayer` on a corpus of random
+opening and mid-game positions, with uniformly random and `improved_score`
+guided playouts.
+
+    python -m benchmarks.mcts
+"""
+import random
+import timeit
+
+from sample_players import improved_score
+from competition_agent import CustomPlayer
+
+from benchmarks.movegen import position_for, random_positions
+
+TIME_LIMIT = 150  # number of milliseconds per move
+NUM_POSITIONS = 20
+MAX_PLIES = 16  # keep the corpus in the opening and middle game
+
+CONFIGS = [
+    ("random", {}),
+    ("improved_score", {"rollout_score": improved_score}),
+]
+
+
+def main():
+    positions = random_positions(7, 7, NUM_POSITIONS, seed=7, max_plies=MAX_PLIES)
+    time_millis = lambda: 1000 * timeit.default_timer()
+
+    print("{:<18}{:>16}{:>18}".format("Playouts", "playouts / s", "playouts / move"))
+    for name, options in CONFIGS:
+        random.seed(0)
+        player = CustomPlayer(timeout=10., reuse_tree=False, **options)
+        playouts = 0
+        for position in positions:
+            game = position_for(position, player)
+            move_start = time_millis()
+            player.get_move(game, lambda: TIME_LIMIT - (time_millis() - move_start))
+            playouts += player.playouts
+        print("{:<18}{:>16,.0f}{:>18,.0f}".format(
+            name, player.average_playout_rate(), playouts / len(positions)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Measure legal move generation throughput (moves generated per second) of
+the precomputed move tables in `isolation.Board` against the original
+implementation, which rebuilt and bounds-checked the eight knight directions
+on every call.
+
+    python -m benchmarks.movegen
+"""
+import random
+import timeit
+
+from isolation import Board
+
+BOARD_SIZES = [(7, 7), (9, 9), (11, 11)]
+NUM_POSITIONS = 200  # number of random mid-game positions per board size
+REPEAT = 5
+
+
+def legacy_get_moves(game, loc):
+    """The move generator used by `Board.__get_moves` before the per-size
+    move tables were introduced.
+    """
+    if loc == Board.NOT_MOVED:
+        return game.get_blank_spaces()
+
+    r, c = loc
+    directions = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+                  (1, -2), (1, 2), (2, -1), (2, 1)]
+    valid_moves = [(r + dr, c + dc) for dr, dc in directions
+                   if game.move_is_legal((r + dr, c + dc))]
+    random.shuffle(valid_moves)
+    return valid_moves
+
+
+def random_positions(width, height, count, seed=0, max_plies=None):
+    """Return a list of `count` boards reached by playing random moves for a
+    random number of plies (between 2 and `max_plies`, which defaults to half
+    the board) from an empty board. Positions where the active player has no
+    moves are skipped.
+    """
+    rng = random.Random(seed)
+    positions = []
+    max_plies = max_plies or width * height // 2
+    while len(positions) < count:
+        game = Board("p1", "p2", width=width, height=height)
+        for _ in range(rng.randint(2, max_plies)):
+            moves = game.get_legal_moves()
+            if not moves:
+                break
+            game.apply_move(rng.choice(sorted(moves)))
+        if game.get_legal_moves():
+            positions.append(game)
+    return positions
+
+
+def position_for(position, player, opponent="opponent"):
+    """Return a copy of `position` played by `player` and `opponent`, where
+    `player` takes the place of the player holding the initiative.
+    """
+    if position._board_state[-3]:
+        game = Board(opponent, player, width=position.width, height=position.height)
+        game._active_player, game._inactive_player = player, opponent
+    else:
+        game = Board(player, opponent, width=position.width, height=position.height)
+    game._board_state = list(position._board_state)
+    game.move_count = position.move_count
+    return game
+
+
+def moves_per_second(fn, positions):
+    """Return the number of legal moves generated per second by calling
+    `fn(game)` once on each position, taking the best of REPEAT runs.
+    """
+    total_moves = sum(len(fn(game)) for game in positions)
+    best = min(timeit.repeat(lambda: [fn(game) for game in positions],
+                             number=1, repeat=REPEAT))
+    return total_moves / best
+
+
+def main():
+    print("{:^9}{:>16}{:>16}{:>10}".format("Board", "before (mv/s)", "after (mv/s)", "speedup"))
+    for width, height in BOARD_SIZES:
+        positions = random_positions(width, height, NUM_POSITIONS)
+        before = moves_per_second(
+            lambda g: legacy_get_moves(g, g.get_player_location(g.active_player)), positions)
+        after = moves_per_second(lambda g: g.get_legal_moves(), positions)
+        print("{:^9}{:>16,.0f}{:>16,.0f}{:>9.2f}x".format(
+            "{}x{}".format(width, height), before, after, after / before))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Measure the per-call latency of `game_agent.nearby_openness`, which counts
+the blank cells around a player as a population count of a precomputed
+neighborhood mask against the board's blank cell mask, against the original
+implementation, which called `move_is_legal` on each of the (up to 81) cells
+in the neighborhood.
+
+    python -m benchmarks.openness
+"""
+import timeit
+
+from isolation import Board, BitBoard
+from game_agent import nearby_openness
+
+from benchmarks.movegen import random_positions
+
+BOARD_SIZES = [(7, 7), (9, 9), (11, 11)]
+NUM_POSITIONS = 200  # number of random mid-game positions per board size
+REPEAT = 5
+
+
+def legacy_nearby_openness(game, player, radius=4):
+    """The implementation of `nearby_openness` before the neighborhood masks
+    were introduced.
+    """
+    nearby_legal_move_count = 0
+    current_location = game.get_player_location(player)
+
+    for row in range(current_location[0] - radius, current_location[0] + radius + 1):
+        if row < 0 or row > game.height - 1:
+            continue
+        for col in range(current_location[1] - radius, current_location[1] + radius + 1):
+            if col < 0 or col > game.width - 1:
+                continue
+            if game.move_is_legal((row, col)):
+                nearby_legal_move_count += 1
+
+    return float(nearby_legal_move_count)
+
+
+def latency_us(fn, positions):
+    """Return the mean latency in microseconds of calling `fn(game, player)`
+    for the active player of each position, taking the best of REPEAT runs.
+    """
+    calls = [(game, game.active_player) for game in positions]
+    best = min(timeit.repeat(lambda: [fn(game, player) for game, player in calls],
+                             number=1, repeat=REPEAT))
+    return 1e6 * best / len(calls)
+
+
+def main():
+    print("{:^9}{:^10}{:>14}{:>14}{:>10}".format(
+        "Board", "Engine", "before (us)", "after (us)", "speedup"))
+    for width, height in BOARD_SIZES:
+        positions = random_positions(width, height, NUM_POSITIONS)
+        for engine in (Board, BitBoard):
+            boards = []
+            for position in positions:
+                board = engine(position._player_1, position._player_2, width, height)
+                board._board_state = list(position._board_state)
+                board._active_player = position.active_player
+                board._inactive_player = position.inactive_player
+                boards.append(board)
+            assert all(legacy_nearby_openness(g, g.active_player) ==
+                       nearby_openness(g, g.active_player) for g in boards)
+
+            before = latency_us(legacy_nearby_openness, boards)
+            after = latency_us(nearby_openness, boards)
+            print("{:^9}{:^10}{:>14.2f}{:>14.2f}{:>9.2f}x".format(
+                "{}x{}".format(width, height), engine.__name__, before, after, before / after))
+
+
+if __name__ == "__main__":
+    main()
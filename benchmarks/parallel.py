@@ -0,0 +1,72 @@
+"""Measure the speedup of `ParallelAlphaBetaPlayer` over the serial
+`AlphaBetaPlayer` as the number of worker processes grows, reporting for each
+process count the time needed to complete a fixed-depth iterative deepening
+search over a corpus of random mid-game positions, and the nodes searched.
+
+    python -m benchmarks.parallel [--depth 6] [--positions 20]
+"""
+import argparse
+import os
+import random
+import timeit
+
+from sample_players import improved_score
+from game_agent import AlphaBetaPlayer
+from parallel_agent import ParallelAlphaBetaPlayer
+
+from benchmarks.movegen import position_for, random_positions
+
+FIXED_DEPTH = 6
+NUM_POSITIONS = 20
+MAX_PLIES = 16  # keep the corpus in the opening and middle game
+
+
+def time_to_depth(player, positions, depth=FIXED_DEPTH):
+    """Return (seconds, nodes) needed by `player` to search every position
+    with iterative deepening to `depth`.
+    """
+    elapsed = nodes = 0
+    for position in positions:
+        game = position_for(position, player)
+        random.seed(0)
+        start = timeit.default_timer()
+        player.get_move(game, lambda: 0. if player.search_depth > depth else float("inf"))
+        elapsed += timeit.default_timer() - start
+        nodes += sum(player.node_counts)
+    return elapsed, nodes
+
+
+def process_counts(max_processes):
+    """Return 1, 2, 4, ... up to (and including) `max_processes`. """
+    counts = [1]
+    while counts[-1] * 2 < max_processes:
+        counts.append(counts[-1] * 2)
+    if max_processes > 1:
+        counts.append(max_processes)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=FIXED_DEPTH)
+    parser.add_argument("--positions", type=int, default=NUM_POSITIONS)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1,
+                        help="largest number of worker processes to measure")
+    args = parser.parse_args()
+
+    positions = random_positions(7, 7, args.positions, seed=7, max_plies=MAX_PLIES)
+    # disable the endgame solver so every configuration runs the same search
+    serial, _ = time_to_depth(AlphaBetaPlayer(score_fn=improved_score, endgame_threshold=None),
+                              positions, args.depth)
+
+    print("{:<12}{:>12}{:>16}{:>10}".format("Processes", "seconds", "nodes", "speedup"))
+    for processes in process_counts(args.processes):
+        with ParallelAlphaBetaPlayer(score_fn=improved_score, processes=processes,
+                                     endgame_threshold=None) as player:
+            elapsed, nodes = time_to_depth(player, positions, args.depth)
+        print("{:<12}{:>12.2f}{:>16,}{:>10.2f}".format(
+            processes, elapsed, nodes, serial / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Measure the effect of carrying the search of one move over to the next
+(`AlphaBetaPlayer(reuse_search=True)`) by playing games between two copies
+of the same agent under the tournament time limit, and reporting the
+average depth completed per move and how many iterations were skipped.
+
+    python -m benchmarks.reuse
+"""
+import random
+
+from isolation import Board
+from sample_players import improved_score
+from game_agent import AlphaBetaPlayer
+
+TIME_LIMIT = 150  # number of milliseconds per move
+NUM_GAMES = 6
+
+
+class DepthRecorder(AlphaBetaPlayer):
+    """An `AlphaBetaPlayer` that records the depth completed on each move
+    and the depth its iterative deepening started from, capped at the
+    number of blank cells since deeper iterations of a solved position only
+    repeat the same search.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(score_fn=improved_score, endgame_threshold=None, **kwargs)
+        self.depths = []
+        self.start_depths = []
+
+    def get_move(self, game, time_left):
+        blank_count = game.get_blank_count()
+        move = super().get_move(game, time_left)
+        self.depths.append(min(len(self.node_counts), blank_count))
+        self.start_depths.append(min(self.node_counts.count(0) + 1, blank_count))
+        return move
+
+
+def main():
+    print("{:<14}{:>12}{:>14}{:>12}".format("reuse_search", "depth", "start depth", "moves"))
+    for reuse in (False, True):
+        random.seed(0)
+        depths, starts = [], []
+        for _ in range(NUM_GAMES):
+            players = [DepthRecorder(reuse_search=reuse) for _ in range(2)]
+            game = Board(*players)
+            for _ in range(2):
+                game.apply_move(random.choice(game.get_legal_moves()))
+            game.play(time_limit=TIME_LIMIT)
+            for player in players:
+                depths.extend(player.depths)
+                starts.extend(player.start_depths)
+        print("{!s:<14}{:>12.2f}{:>14.2f}{:>12}".format(
+            reuse, sum(depths) / len(depths), sum(starts) / len(starts), len(depths)))
+
+
+if __name__ == "__main__":
+    main()
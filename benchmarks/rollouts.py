@@ -0,0 +1,50 @@
+"""Measure random playout throughput (games played per second) of
+`isolation.batch.BatchBoard`, which advances a whole batch of games in
+lockstep with NumPy, against playing the games one at a time with
+`Board.play` between two `RandomPlayer`s.
+
+    python -m benchmarks.rollouts
+"""
+import random
+import timeit
+
+from isolation import Board, BitBoard
+from isolation.batch import BatchBoard
+from sample_players import RandomPlayer
+
+BOARD_SIZES = [(7, 7), (9, 9)]
+NUM_GAMES = 200  # number of games played one at a time per engine
+BATCH_SIZES = [100, 1000, 10000]
+REPEAT = 3
+
+
+def sequential_games_per_second(board_cls, width, height, num_games=NUM_GAMES):
+    """Return the number of random games per second played by `Board.play`. """
+    def play():
+        for _ in range(num_games):
+            board_cls(RandomPlayer(), RandomPlayer(), width, height).play(time_limit=float("inf"))
+    random.seed(0)
+    return num_games / min(timeit.repeat(play, number=1, repeat=REPEAT))
+
+
+def batch_games_per_second(size, width, height):
+    """Return the number of random games per second played by a batch. """
+    best = min(timeit.repeat(lambda: BatchBoard(size, width, height, seed=0).play_random(),
+                             number=1, repeat=REPEAT))
+    return size / best
+
+
+def main():
+    print("{:^9}{:<18}{:>14}".format("Board", "Engine", "games / s"))
+    for width, height in BOARD_SIZES:
+        board = "{}x{}".format(width, height)
+        for engine in (Board, BitBoard):
+            print("{:^9}{:<18}{:>14,.0f}".format(
+                board, engine.__name__, sequential_games_per_second(engine, width, height)))
+        for size in BATCH_SIZES:
+            print("{:^9}{:<18}{:>14,.0f}".format(
+                board, "BatchBoard({})".format(size), batch_games_per_second(size, width, height)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Compare the search modes of `AlphaBetaPlayer` on a corpus of random
+mid-game positions, reporting for each configuration:
+
+  * the average number of nodes needed to complete a fixed-depth iterative
+    deepening search, and
+  * the average nodes searched and depth reached per move under the
+    tournament time limit.
+
+    python -m benchmarks.search_modes
+"""
+import random
+import timeit
+
+from sample_players import improved_score
+from game_agent import AlphaBetaPlayer
+
+from benchmarks.movegen import position_for, random_positions
+
+TIME_LIMIT = 150  # number of milliseconds per move
+FIXED_DEPTH = 5
+NUM_POSITIONS = 30
+MAX_PLIES = 16  # keep the corpus in the opening and middle game
+
+CONFIGS = [
+    ("alphabeta", {}),
+    ("pvs", {"search_mode": "pvs"}),
+    ("alphabeta+asp", {"aspiration_window": 1.}),
+    ("pvs+asp", {"search_mode": "pvs", "aspiration_window": 1.}),
+]
+
+
+def _setup(position, options):
+    """Return a new player built with `options` and a copy of `position`
+    where that player holds the initiative.
+    """
+    player = AlphaBetaPlayer(score_fn=improved_score, **options)
+    return player, position_for(position, player)
+
+
+def fixed_depth_nodes(position, options, depth=FIXED_DEPTH):
+    """Return the total nodes searched by iterative deepening to `depth`. """
+    player, game = _setup(position, options)
+    player.get_move(game, lambda: 1. if player.search_depth > depth else float("inf"))
+    return sum(player.node_counts)
+
+
+def timed_search(position, options, time_limit=TIME_LIMIT):
+    """Return (nodes searched, depth completed) by a single timed get_move.
+    The depth is capped at the number of blank cells, since deeper iterations
+    of a solved position only repeat the same search.
+    """
+    player, game = _setup(position, options)
+    time_millis = lambda: 1000 * timeit.default_timer()
+    move_start = time_millis()
+    player.get_move(game, lambda: time_limit - (time_millis() - move_start))
+    depth = min(len(player.node_counts), game.get_blank_count())
+    return sum(player.node_counts) + player.nodes, depth
+
+
+def main():
+    positions = random_positions(7, 7, NUM_POSITIONS, seed=7, max_plies=MAX_PLIES)
+
+    print("{:<15}{:>16}{:>16}{:>12}".format(
+        "Mode", "nodes @ d={}".format(FIXED_DEPTH), "nodes / move", "depth"))
+    for name, options in CONFIGS:
+        random.seed(0)
+        fixed = sum(fixed_depth_nodes(p, options) for p in positions) / len(positions)
+        timed = [timed_search(p, options) for p in positions]
+        nodes = sum(t[0] for t in timed) / len(timed)
+        depth = sum(t[1] for t in timed) / len(timed)
+        print("{:<15}{:>16,.0f}{:>16,.0f}{:>12.2f}".format(name, fixed, nodes, depth))
+
+
+if __name__ == "__main__":
+    main()
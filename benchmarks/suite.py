@@ -0,0 +1,242 @@
+"""Measure the throughput of the isolation engines and the search agents on a
+fixed corpus of reproducible positions, and optionally compare it against a
+baseline recorded earlier to catch performance regressions.
+
+The corpus holds opening, midgame and endgame positions (reached by seeded
+random play) on several board sizes. For both `Board` and `BitBoard`, the
+suite measures:
+
+  * movegen: legal moves generated per second (for both players),
+  * forecast: `forecast_move` calls per second,
+  * score/<name>: evaluations per second of `custom_score`, `custom_score_2`,
+    `custom_score_3` and `improved_score`, and
+  * search: nodes per second of a fixed-depth iterative deepening
+    `AlphaBetaPlayer` search.
+
+Every rate is the median of REPEAT timed runs of at least MIN_TIME seconds.
+Results are written as JSON, one rate per "metric/engine/size/phase" key:
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --save-baseline
+    python -m benchmarks.suite --baseline benchmarks/baseline.json --threshold 0.25
+
+The comparison only runs when --baseline is given. It lists the rates that
+fell by more than the threshold (a fraction of the baseline rate) and exits
+with status 1 if there are any. Rates depend on the machine, so no baseline
+is shipped: record one locally with --save-baseline (on the same machine and
+Python version, with the machine otherwise idle) before making a change.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import timeit
+
+from isolation import Board, ENGINES
+from sample_players import improved_score
+from game_agent import AlphaBetaPlayer, custom_score, custom_score_2, custom_score_3
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+THRESHOLD = 0.25  # fraction of the baseline rate a result may lose
+
+BOARD_SIZES = [(7, 7), (9, 9), (11, 11)]
+NUM_POSITIONS = 40  # positions per board size and phase
+SEARCH_POSITIONS = 5  # positions per board size and phase searched by "search"
+SEARCH_DEPTH = 4
+MIN_TIME = 0.1  # shortest timed run, in seconds
+REPEAT = 7
+
+SCORE_FNS = [custom_score, custom_score_2, custom_score_3, improved_score]
+
+
+def _phase_plies(width, height):
+    """Return the number of random plies played to reach each game phase. """
+    cells = width * height
+    return {"opening": 4, "midgame": cells // 4, "endgame": cells // 2}
+
+
+def corpus(width, height, phase, count=NUM_POSITIONS, seed=0):
+    """Return (width, height, `_board_state`, move count) for `count`
+    positions reached by playing the number of random plies of `phase` from
+    an empty board. Games that end early, and positions where the active
+    player has no moves, are skipped, so every phase holds exactly `count`
+    positions. The corpus only depends on the arguments.
+    """
+    plies = _phase_plies(width, height)[phase]
+    rng = random.Random("{}x{}/{}/{}".format(width, height, phase, seed))
+    positions = []
+    while len(positions) < count:
+        game = Board("p1", "p2", width=width, height=height, shuffle=False)
+        for _ in range(plies):
+            moves = game.get_legal_moves()
+            if not moves:
+                break
+            game.apply_move(rng.choice(moves))
+        else:
+            if game.get_legal_moves():
+                positions.append((width, height, game._board_state, game.move_count))
+    return positions
+
+
+def load(position, board_cls, player_1="p1", player_2="p2"):
+    """Return a `board_cls` board (that doesn't shuffle its legal moves) in
+    the given corpus position, with the right player holding the initiative.
+    """
+    width, height, state, move_count = position
+    game = board_cls(player_1, player_2, width=width, height=height, shuffle=False)
+    game._board_state = list(state)
+    game.move_count = move_count
+    if state[-3]:
+        game._active_player, game._inactive_player = player_2, player_1
+    return game
+
+
+def rate(fn, work):
+    """Return `work` units per second of calling `fn()`, taking the median
+    of REPEAT timed runs of at least MIN_TIME seconds each.
+    """
+    number = 1
+    while timeit.timeit(fn, number=number) < MIN_TIME:
+        number *= 2
+    elapsed = statistics.median(timeit.repeat(fn, number=number, repeat=REPEAT))
+    return work * number / elapsed
+
+
+def movegen_rate(games):
+    """Legal moves generated per second for both players of each game. """
+    players = [(game, game.active_player, game.inactive_player) for game in games]
+    work = sum(len(g.get_legal_moves(p1)) + len(g.get_legal_moves(p2)) for g, p1, p2 in players)
+    return rate(lambda: [(g.get_legal_moves(p1), g.get_legal_moves(p2))
+                         for g, p1, p2 in players], work)
+
+
+def forecast_rate(games):
+    """`forecast_move` calls per second, one per legal move of each game. """
+    moves = [(game, game.get_legal_moves()) for game in games]
+    work = sum(len(legal) for _, legal in moves)
+    return rate(lambda: [game.forecast_move(move) for game, legal in moves for move in legal],
+                work)
+
+
+def score_rate(score_fn, games):
+    """Evaluations per second of `score_fn` for the active player. """
+    return rate(lambda: [score_fn(game, game.active_player) for game in games], len(games))
+
+
+def search_rate(positions, board_cls):
+    """Nodes per second of iterative deepening to SEARCH_DEPTH plies. """
+    def search():
+        nodes = 0
+        for position in positions:
+            player = AlphaBetaPlayer(score_fn=improved_score, endgame_threshold=None)
+            players = ("opponent", player) if position[2][-3] else (player, "opponent")
+            game = load(position, board_cls, *players)
+            player.get_move(game, lambda: 0. if player.search_depth > SEARCH_DEPTH
+                            else float("inf"))
+            nodes += sum(player.node_counts)
+        return nodes
+
+    # the search doesn't shuffle its moves, so every run searches as many nodes
+    return rate(search, search())
+
+
+def run(metrics=None, log=None):
+    """Run the suite and return a dict mapping each result key to its rate.
+    If `metrics` is given, only the metrics it names are measured; each
+    result is also printed to `log` (a file) as it completes.
+    """
+    results = {}
+    for width, height in BOARD_SIZES:
+        for phase in _phase_plies(width, height):
+            positions = corpus(width, height, phase)
+            for engine, board_cls in sorted(ENGINES.items()):
+                games = [load(p, board_cls) for p in positions]
+                tests = [("movegen", lambda: movegen_rate(games)),
+                         ("forecast", lambda: forecast_rate(games))]
+                tests += [("score/" + fn.__name__, lambda fn=fn: score_rate(fn, games))
+                          for fn in SCORE_FNS]
+                tests += [("search", lambda: search_rate(positions[:SEARCH_POSITIONS],
+                                                         board_cls))]
+                for metric, test in tests:
+                    if metrics and metric not in metrics:
+                        continue
+                    key = "{}/{}/{}x{}/{}".format(metric, engine, width, height, phase)
+                    random.seed(0)
+                    results[key] = test()
+                    if log is not None:
+                        print("{:<48}{:>16,.0f}".format(key, results[key]), file=log)
+    return results
+
+
+def report(results):
+    """Return the JSON document describing a run of the suite. """
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """Compare `results` against the `baseline` results.
+
+    Returns
+    -------
+    list<(str, float, float)>
+        The (key, baseline rate, rate) of every result slower than the
+        baseline by more than `threshold` (a fraction of the baseline rate),
+        in key order. Keys missing from either run are not compared.
+    """
+    return [(key, baseline[key], results[key]) for key in sorted(results)
+            if key in baseline and results[key] < (1. - threshold) * baseline[key]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", metavar="PATH",
+                        help="write the results as JSON to this file")
+    parser.add_argument("--baseline", metavar="PATH",
+                        help="baseline results to compare against, recorded on this "
+                             "machine (default: no comparison)")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="largest allowed slowdown, as a fraction of the baseline rate")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store the results as the new --baseline (default: "
+                             "benchmarks/baseline.json) instead of comparing")
+    parser.add_argument("--metric", action="append", dest="metrics",
+                        help="only run this metric (e.g., movegen, search or "
+                             "score/custom_score); may be repeated")
+    args = parser.parse_args()
+
+    results = run(args.metrics, log=sys.stdout)
+    document = report(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+    if args.save_baseline:
+        path = args.baseline or BASELINE
+        with open(path, "w") as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+        print("Saved the baseline to {}".format(path))
+        return
+    if args.baseline is None:
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.threshold)
+    compared = sum(1 for key in results if key in baseline)
+    print("\n{} of {} results regressed by more than {:.0%} against {}".format(
+        len(regressions), compared, args.threshold, args.baseline))
+    for key, old, new in regressions:
+        print("{:<48}{:>16,.0f}{:>16,.0f}{:>9.1%}".format(key, old, new, new / old - 1.))
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Compare fixed-threshold iterative deepening with the adaptive
+`TimeManager` of `AlphaBetaPlayer` on a corpus of random mid-game
+positions, reporting per move the average depth completed, the time spent,
+the time wasted on iterations that ran out of time, and the smallest time
+left at return.
+
+    python -m benchmarks.time_manager
+"""
+import timeit
+
+from sample_players import improved_score
+from game_agent import AlphaBetaPlayer
+
+from benchmarks.movegen import position_for, random_positions
+
+TIME_LIMIT = 150  # number of milliseconds per move
+NUM_POSITIONS = 40
+MAX_PLIES = 16
+
+
+class IterationTimer(AlphaBetaPlayer):
+    """An `AlphaBetaPlayer` recording the time left after each completed
+    iteration.
+    """
+
+    def get_move(self, game, time_left):
+        self.iteration_time_left = [time_left()]
+        return super().get_move(game, time_left)
+
+    def _search_iteration(self, game):
+        best_move = super()._search_iteration(game)
+        self.iteration_time_left.append(self.time_left())
+        return best_move
+
+
+def main():
+    positions = random_positions(7, 7, NUM_POSITIONS, seed=11, max_plies=MAX_PLIES)
+    time_millis = lambda: 1000 * timeit.default_timer()
+
+    print("{:<15}{:>8}{:>14}{:>14}{:>16}".format(
+        "adaptive_time", "depth", "used (ms)", "wasted (ms)", "min left (ms)"))
+    for adaptive in (False, True):
+        depths, used, wasted, left = [], [], [], []
+        for position in positions:
+            player = IterationTimer(score_fn=improved_score, endgame_threshold=None,
+                                    adaptive_time=adaptive)
+            game = position_for(position, player)
+            move_start = time_millis()
+            time_left = lambda: TIME_LIMIT - (time_millis() - move_start)
+            player.get_move(game, time_left)
+            end = time_left()
+
+            depths.append(min(len(player.node_counts), game.get_blank_count()))
+            used.append(TIME_LIMIT - end)
+            wasted.append(player.iteration_time_left[-1] - end)
+            left.append(end)
+        n = len(positions)
+        print("{!s:<15}{:>8.2f}{:>14.1f}{:>14.1f}{:>16.2f}".format(
+            adaptive, sum(depths) / n, sum(used) / n, sum(wasted) / n, min(left)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import random
+import unittest
+
+import isolation
+
+from sample_players import RandomPlayer, GreedyPlayer, improved_score
+
+
+class BitBoardTest(unittest.TestCase):
+    """Unit tests for the bitboard implementation of isolation.Board"""
+
+    def setUp(self):
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+
+    def play_seeded(self, board_cls, seed, width=7, height=7):
+        random.seed(seed)
+        p1, p2 = RandomPlayer(), GreedyPlayer(score_fn=improved_score)
+        game = board_cls(p1, p2, width=width, height=height)
+        winner, history, termination = game.play(time_limit=float("inf"))
+        return winner == p1, history, termination, game.to_string(), game._board_state
+
+    def test_seeded_games_match_reference_board(self):
+        for seed in range(20):
+            for width, height in [(7, 7), (9, 9), (5, 8)]:
+                self.assertEqual(
+                    self.play_seeded(isolation.Board, seed, width, height),
+                    self.play_seeded(isolation.BitBoard, seed, width, height))
+
+    def test_legal_moves_match_reference_board(self):
+        board = isolation.Board(self.player1, self.player2)
+        bitboard = isolation.BitBoard(self.player1, self.player2)
+        self.assertEqual(board.get_legal_moves(), bitboard.get_legal_moves())
+
+        for move in [(2, 3), (0, 5), (4, 4), (2, 4), (3, 2)]:
+            board.apply_move(move)
+            bitboard.apply_move(move)
+            for player in (self.player1, self.player2):
+                self.assertEqual(sorted(board.get_legal_moves(player)),
+                                 sorted(bitboard.get_legal_moves(player)))
+                self.assertEqual(board.get_player_location(player),
+                                 bitboard.get_player_location(player))
+                self.assertEqual(board.utility(player), bitboard.utility(player))
+            self.assertEqual(board.get_blank_spaces(), bitboard.get_blank_spaces())
+            self.assertEqual(board.to_string(), bitboard.to_string())
+            self.assertEqual(board._board_state, bitboard._board_state)
+
+    def test_forecast_move_does_not_modify_board(self):
+        bitboard = isolation.BitBoard(self.player1, self.player2)
+        bitboard.apply_move((2, 3))
+        new_board = bitboard.forecast_move((0, 5))
+        self.assertEqual(bitboard.get_player_location(self.player2), None)
+        self.assertEqual(new_board.get_player_location(self.player2), (0, 5))
+        self.assertEqual(new_board.active_player, self.player1)
+        self.assertEqual(bitboard.active_player, self.player2)
+
+    def test_board_state_round_trip(self):
+        board = isolation.Board(self.player1, self.player2, width=9, height=9)
+        board._board_state = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 0, 0, 0, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 19, 67]
+        bitboard = isolation.BitBoard(self.player1, self.player2, width=9, height=9)
+        bitboard._board_state = board._board_state
+        self.assertEqual(board._board_state, bitboard._board_state)
+        self.assertEqual(sorted(board.get_legal_moves()), sorted(bitboard.get_legal_moves()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,8 +4,11 @@ champions) in a tournament.
 
          COMPLETING AND SUBMITTING A COMPETITION AGENT IS OPTIONAL
 """
+import math
 import random
 
+from array import array
+
 
 class SearchTimeout(Exception):
     """Subclass base exception for code clarity. """
@@ -33,16 +36,111 @@ def custom_score(game, player):
     float
         The heuristic value of the current game state to the specified player.
     """
-    raise NotImplementedError
+    # the "Improved" heuristic of `sample_players`, copied here because the
+    # competition only loads this file
+    if game.is_loser(player):
+        return float("-inf")
+
+    if game.is_winner(player):
+        return float("inf")
+
+    own_moves = len(game.get_legal_moves(player))
+    opp_moves = len(game.get_legal_moves(game.get_opponent(player)))
+    return float(own_moves - opp_moves)
+
+
+class SearchTree:
+    """Monte Carlo search tree stored in parallel arrays indexed by node ID
+    instead of one Python object per node. Node 0 is the root, and the
+    children of a node are allocated as one contiguous block when it is
+    expanded.
+
+    Attributes
+    ----------
+    move : array<int>
+        The cell index (row + column * height) of the move leading to each
+        node, or -1 for the root.
+
+    first_child, num_children : array<int>
+        The ID of the first child of each node and the number of children,
+        which is -1 until the node is expanded.
+
+    visits : array<int>
+        The number of playouts through each node.
+
+    wins : array<float>
+        The number of those playouts won by the player who made the move
+        leading to the node.
+    """
+
+    def __init__(self):
+        self.move = array("i", [-1])
+        self.first_child = array("i", [0])
+        self.num_children = array("i", [-1])
+        self.visits = array("i", [0])
+        self.wins = array("d", [0.])
+
+    def __len__(self):
+        return len(self.move)
+
+    def expand(self, node, moves):
+        """Allocate one child of `node` for each cell index in `moves`. """
+        self.first_child[node] = len(self.move)
+        self.num_children[node] = len(moves)
+        self.move.extend(moves)
+        self.first_child.extend([0] * len(moves))
+        self.num_children.extend([-1] * len(moves))
+        self.visits.extend([0] * len(moves))
+        self.wins.extend([0.] * len(moves))
+
+    def children(self, node):
+        first = self.first_child[node]
+        return range(first, first + max(self.num_children[node], 0))
+
+    def select(self, node, exploration):
+        """Return the child of an expanded node with the highest UCT value,
+        or its first unvisited child.
+        """
+        visits, wins = self.visits, self.wins
+        log_visits = math.log(visits[node])
+        best_child, best_value = -1, float("-inf")
+        for child in self.children(node):
+            n = visits[child]
+            if n == 0:
+                return child
+            value = wins[child] / n + exploration * math.sqrt(log_visits / n)
+            if value > best_value:
+                best_child, best_value = child, value
+        return best_child
+
+    def subtree(self, node):
+        """Return a new tree holding the subtree rooted at `node`, with its
+        statistics, so the search can continue from that position.
+        """
+        tree = SearchTree()
+        tree.visits[0], tree.wins[0] = self.visits[node], self.wins[node]
+        queue = [(node, 0)]
+        for old, new in queue:
+            if self.num_children[old] < 0:
+                continue
+            children = self.children(old)
+            tree.expand(new, self.move[children.start:children.stop])
+            for i, child in enumerate(children):
+                copy = tree.first_child[new] + i
+                tree.visits[copy], tree.wins[copy] = self.visits[child], self.wins[child]
+                queue.append((child, copy))
+        return tree
 
 
 class CustomPlayer:
     """Game-playing agent to use in the optional player vs player Isolation
-    competition.
+    competition, searching with Monte Carlo tree search (UCT).
 
-    You must at least implement the get_move() method and a search function
-    to complete this class, but you may use any of the techniques discussed
-    in lecture or elsewhere on the web -- opening books, MCTS, etc.
+    Each playout descends the tree by the UCT rule, expands the leaf it
+    reaches, plays the game out to the end from there and credits the win to
+    every node on the path. The most visited move is played, and the subtree
+    of the position reached after the opponent's reply is kept for the next
+    search.
 
     **************************************************************************
           THIS CLASS IS OPTIONAL -- IT IS ONLY USED IN THE ISOLATION PvP
@@ -59,12 +157,41 @@ class CustomPlayer:
         the PvP competition uses more accurate timers that are not cross-
         platform compatible, so a limit of 1ms (vs 10ms for the other classes)
         is generally sufficient.
+
+    exploration : float (optional)
+        The exploration constant of the UCT rule.
+
+    rollout_score : callable or None (optional)
+        If None, playouts are played with uniformly random moves. Otherwise
+        each playout move maximizes this score function (e.g.,
+        `improved_score`) for the player making it, with ties broken at
+        random; such playouts are slower but more informative.
+
+    reuse_tree : bool (optional)
+        Keep the subtree of the current position between moves.
     """
 
-    def __init__(self, data=None, timeout=1.):
+    def __init__(self, data=None, timeout=1., exploration=math.sqrt(2), rollout_score=None,
+                 reuse_tree=True):
         self.score = custom_score
         self.time_left = None
         self.TIMER_THRESHOLD = timeout
+        self.exploration = exploration
+        self.rollout_score = rollout_score
+        self.reuse_tree = reuse_tree
+        self.playouts = 0
+        self.playout_rates = []
+        self._tree = None
+        self._tree_node = None
+        self._tree_game = None
+
+    def average_playout_rate(self):
+        """Return the average number of playouts per second of the searches
+        made so far.
+        """
+        if not self.playout_rates:
+            return 0.
+        return sum(self.playout_rates) / len(self.playout_rates)
 
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
@@ -93,5 +220,112 @@ class CustomPlayer:
             Board coordinates corresponding to a legal move; may return
             (-1, -1) if there are no available legal moves.
         """
-        # OPTIONAL: Finish this function!
-        raise NotImplementedError
+        self.time_left = time_left
+        legal_moves = game.get_legal_moves()
+        if not legal_moves:
+            return (-1, -1)
+
+        tree = self._reuse_tree(game)
+        # the rate is timed with time_left, since the competition sandbox
+        # does not allow timer modules
+        start = time_left()
+        self.playouts = self.mcts(game, tree)
+        elapsed_ms = start - time_left()
+        if elapsed_ms > 0:
+            self.playout_rates.append(1000. * self.playouts / elapsed_ms)
+
+        children = tree.children(0)
+        if not children:
+            return legal_moves[0]
+        best = max(children, key=lambda child: tree.visits[child])
+        move = divmod(tree.move[best], game.height)[::-1]
+
+        if self.reuse_tree:
+            # the subtree is only extracted on the next move, within its time
+            self._tree, self._tree_node = tree, best
+            self._tree_game = game.forecast_move(move)
+        return move
+
+    def _reuse_tree(self, game):
+        """Return the subtree kept from the previous search for the position
+        reached by the opponent's reply, or a new tree if there is none.
+        """
+        tree, node, last_game = self._tree, self._tree_node, self._tree_game
+        self._tree = self._tree_node = self._tree_game = None
+        if tree is None or game.move_count != last_game.move_count + 1 or \
+                (last_game.width, last_game.height) != (game.width, game.height):
+            return SearchTree()
+
+        loc = game.get_player_location(game.inactive_player)
+        if loc is None or last_game.forecast_move(loc).zobrist != game.zobrist:
+            return SearchTree()
+        cell = loc[0] + loc[1] * game.height
+        for child in tree.children(node):
+            if tree.move[child] == cell:
+                return tree.subtree(child)
+        return SearchTree()
+
+    def mcts(self, game, tree):
+        """Run playouts from the position of `game` into `tree` until the
+        time left (minus a margin for one more playout) falls below the
+        TIMER_THRESHOLD.
+
+        Returns
+        -------
+        int
+            The number of playouts.
+        """
+        height = game.height
+        playouts = 0
+        start = self.time_left()
+        while True:
+            remaining = self.time_left()
+            # leave room for a playout twice as long as the average so far
+            if remaining - 2 * (start - remaining) / (playouts + 1) < self.TIMER_THRESHOLD:
+                return playouts
+
+            board = game.copy()
+            node, path, movers = 0, [0], [None]
+            while tree.num_children[node] > 0:
+                node = tree.select(node, self.exploration)
+                movers.append(board.active_player)
+                board.apply_move((tree.move[node] % height, tree.move[node] // height))
+                path.append(node)
+
+            if tree.num_children[node] < 0:
+                moves = board.get_legal_moves()
+                tree.expand(node, [r + c * height for r, c in moves])
+                if moves:
+                    node = tree.first_child[node] + random.randrange(len(moves))
+                    movers.append(board.active_player)
+                    board.apply_move((tree.move[node] % height, tree.move[node] // height))
+                    path.append(node)
+
+            winner = self.rollout(board)
+            visits, wins = tree.visits, tree.wins
+            for node, mover in zip(path, movers):
+                visits[node] += 1
+                if mover is winner:
+                    wins[node] += 1
+            playouts += 1
+
+    def rollout(self, board):
+        """Play the game on `board` to the end and return the winner. """
+        score = self.rollout_score
+        while True:
+            moves = board.get_legal_moves()
+            if not moves:
+                return board.inactive_player
+            if score is None:
+                board.apply_move(random.choice(moves))
+                continue
+
+            player = board.active_player
+            best_move, best_value = None, float("-inf")
+            for move in moves:
+                undo = board.apply_move(move)
+                value = score(board, player)
+                board.undo_move(undo)
+                if best_move is None or value > best_value:
+                    best_move, best_value = move, value
+            board.apply_move(best_move)
@@ -0,0 +1,149 @@
+"""Vectorized evaluation of the `custom_score_general` features with NumPy.
+
+`feature_matrix` extracts the feature vector of many (board, player) pairs at
+once, and `linear_scores` applies any number of candidate weight vectors to
+all of them in a single matrix product, so many weightings of the same set of
+leaves (e.g., the leaves of one search tree) can be compared in one pass.
+
+NumPy is only needed by this module; the agents and the isolation package do
+not depend on it.
+"""
+import numpy as np
+
+from game_agent import number_moves, nearby_openness
+
+# the features of `custom_score_general`, in the order of its constants
+FEATURES = (
+    "own_moves",
+    "opp_moves",
+    "move_ratio",
+    "own_openness",
+    "opp_openness",
+    "openness_ratio",
+    "own_centerness",
+    "opp_centerness",
+    "centerness_ratio",
+)
+
+
+def feature_matrix(games, players):
+    """Return the features of each game state for the corresponding player,
+    normalized as in `custom_score_general`.
+
+    Parameters
+    ----------
+    games : list<`isolation.Board`>
+        The game states to evaluate (e.g., the leaves of a search tree).
+
+    players : list<object> or object
+        The player to evaluate each state for, or a single player for all of
+        them.
+
+    Returns
+    -------
+    (numpy.ndarray, numpy.ndarray)
+        An array of shape (len(games), len(FEATURES)) with the features of
+        each state, and an array of shape (len(games),) holding the value of
+        the states decided regardless of the weights (-inf if the player has
+        lost or has no legal moves, inf if the opponent has) and NaN for the
+        others. The features of decided states are 0.
+    """
+    if not isinstance(players, (list, tuple)):
+        players = [players] * len(games)
+
+    n = len(games)
+    own_moves, opp_moves = np.zeros(n), np.zeros(n)
+    own_openness, opp_openness = np.zeros(n), np.zeros(n)
+    own_loc, opp_loc = np.zeros((n, 2)), np.zeros((n, 2))
+    half_size = np.zeros((n, 2))
+    outcomes = np.full(n, np.nan)
+
+    for i, (game, player) in enumerate(zip(games, players)):
+        opponent = game.get_opponent(player)
+        own, opp = number_moves(game, player), number_moves(game, opponent)
+        if game.is_loser(player) or own == 0:
+            outcomes[i] = -np.inf
+            continue
+        if game.is_winner(player) or opp == 0:
+            outcomes[i] = np.inf
+            continue
+
+        own_moves[i], opp_moves[i] = own, opp
+        own_openness[i] = nearby_openness(game, player)
+        opp_openness[i] = nearby_openness(game, opponent)
+        own_loc[i] = game.get_player_location(player)
+        opp_loc[i] = game.get_player_location(opponent)
+        half_size[i] = (game.height / 2., game.width / 2.)
+
+    decided = ~np.isnan(outcomes)
+    centerness_max = np.where(decided, 1., (half_size ** 2).sum(axis=1))
+    own_centerness = ((half_size - own_loc) ** 2).sum(axis=1)
+    opp_centerness = ((half_size - opp_loc) ** 2).sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        features = np.column_stack([
+            own_moves / 8,
+            opp_moves / 8,
+            np.where(decided, 0., own_moves / np.where(decided, 1., opp_moves) / 8),
+            own_openness / 80,
+            opp_openness / 80,
+            own_openness / (opp_openness / 80 + 0.0001 * 80) / 80,
+            own_centerness / centerness_max,
+            opp_centerness / centerness_max,
+            own_centerness / (opp_centerness + 0.1) / centerness_max,
+        ])
+    features[decided] = 0.
+    return features, outcomes
+
+
+def linear_scores(features, outcomes, weights):
+    """Score every state with every weight vector.
+
+    Parameters
+    ----------
+    features, outcomes : numpy.ndarray
+        As returned by `feature_matrix`.
+
+    weights : array_like
+        A single weight vector of length len(FEATURES), or a matrix with one
+        weight vector per row.
+
+    Returns
+    -------
+    numpy.ndarray
+        The score of each state (rows) for each weight vector (columns), or
+        a vector of scores if a single weight vector was given.
+    """
+    weights = np.asarray(weights, dtype=float)
+    scores = features @ np.atleast_2d(weights).T
+    decided = ~np.isnan(outcomes)
+    scores[decided] = outcomes[decided, np.newaxis]
+    return scores if weights.ndim == 2 else scores[:, 0]
+
+
+class LinearScore:
+    """A picklable score function computing the weighted sum of the
+    `FEATURES` of a state, with `score_batch` to evaluate many leaves at once.
+
+    Unlike `custom_score_general`, every feature is always computed and paired
+    with its own weight (including centerness_ratio), so the score is exactly
+    linear in the weights.
+
+    Parameters
+    ----------
+    weights : array_like
+        One weight per feature in `FEATURES`.
+    """
+
+    def __init__(self, weights):
+        self.weights = np.asarray(weights, dtype=float)
+        if self.weights.shape != (len(FEATURES),):
+            raise ValueError("expected {} weights, got shape {}".format(
+                len(FEATURES), self.weights.shape))
+
+    def __call__(self, game, player):
+        return float(self.score_batch([game], player)[0])
+
+    def score_batch(self, games, player):
+        """Return an array with the score of each game state for `player`. """
+        return linear_scores(*feature_matrix(games, player), self.weights)
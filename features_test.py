@@ -0,0 +1,47 @@
+import unittest
+
+import game_agent
+
+from benchmarks.movegen import random_positions
+
+try:
+    import numpy as np
+    import features
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class FeaturesTest(unittest.TestCase):
+    """Unit tests for the vectorized heuristic features"""
+
+    def setUp(self):
+        self.games = random_positions(7, 7, 40, seed=5)
+        self.players = [game.active_player for game in self.games]
+
+    def test_linear_scores_match_custom_score_general(self):
+        # custom_score_general drops centerness_ratio, and skips (misaligning
+        # the weights of) the features whose weights are zero
+        weights = [[2, -1, 1, 1, -1, 1, 1, -1, 0], [1, -2, 2, 0.5, -0.5, 2, -1, 1, 0]]
+        scores = features.linear_scores(*features.feature_matrix(self.games, self.players), weights)
+        self.assertEqual(scores.shape, (len(self.games), len(weights)))
+        for i, (game, player) in enumerate(zip(self.games, self.players)):
+            for j, constants in enumerate(weights):
+                expected = game_agent.custom_score_general(game, player, constants)
+                if np.isinf(expected):
+                    self.assertEqual(scores[i, j], expected)
+                else:
+                    self.assertAlmostEqual(scores[i, j], expected)
+
+    def test_linear_score_is_a_score_function(self):
+        score = features.LinearScore([1, -1, 0, 0, 0, 0, 0, 0, 0.5])
+        batch = score.score_batch(self.games, self.players)
+        for game, player, value in zip(self.games, self.players, batch):
+            self.assertEqual(score(game, player), value)
+
+        with self.assertRaises(ValueError):
+            features.LinearScore([1, -1])
+
+
+if __name__ == '__main__':
+    unittest.main()
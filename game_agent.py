@@ -6,6 +6,8 @@ import random
 from random import randint
 import math
 
+from collections import deque, namedtuple
+
 
 
 class SearchTimeout(Exception):
@@ -317,6 +319,38 @@ def custom_score_general2(game, player, constants=[]):
 
 
 
+class WeightedScore:
+    """A heuristic built by calling a general scoring function (such as
+    `custom_score_general`) with a fixed list of weights.
+
+    Unlike score functions generated with `exec` or closures, instances can
+    be pickled (as long as `score_fn` is a module level function), so they
+    can be sent to tournament worker processes.
+
+    Parameters
+    ----------
+    score_fn : callable
+        A function with the signature score_fn(game, player, constants).
+
+    weights : list(numeric)
+        The constants passed to `score_fn`.
+    """
+
+    def __init__(self, score_fn, weights):
+        self.score_fn = score_fn
+        self.weights = list(weights)
+
+    def __call__(self, game, player):
+        return self.score_fn(game, player, self.weights)
+
+    def __repr__(self):
+        return "{}{}".format(self.score_fn.__name__, self.weights)
+
+    def label(self):
+        """Return the weights joined by underscores, e.g. "2_-1_2". """
+        return '_'.join(str(w) for w in self.weights)
+
+
 def number_moves(game, player):
     """Calculate the number of available moves for the passed in player
 
@@ -348,32 +382,10 @@ def nearby_openness(game, player):
         current position. Result will be between 0-80.
     """
     radius = 4
-    nearby_legal_move_count = 0
-
     current_location = game.get_player_location(player)
 
-    min_row = current_location[0] - radius
-    max_row = current_location[0] + radius + 1
-    min_col = current_location[1] - radius
-    max_col = current_location[1] + radius + 1
-
-    for row in range(min_row, max_row):
-        if row < 0 or row > game.height - 1:
-            continue
-
-        for col in range(min_col, max_col):
-            if col < 0 or col > game.width - 1:
-                continue
-
-            if game.move_is_legal((row, col)):
-                nearby_legal_move_count += 1
-
-    # print()
-    # print(player)
-    # print(nearby_legal_move_count)
-    # print(game.to_string())
-
-    return float(nearby_legal_move_count)
+    # masked population count against the board's blank cell mask
+    return float(game.count_blank_near(current_location, radius))
 
 
 def centerness(game, player):
@@ -412,10 +424,378 @@ def completeness_of_game(game):
         The percent of complete the game board is. Between 0 and 1.
     """
     spaces = game.width * game.height
-    played_spaces = len([x for x in game._board_state[:-3] if x == 1])
+    played_spaces = spaces - game.get_blank_count()
     return float(played_spaces / spaces)
 
 
+class TranspositionTable:
+    """A fixed-size cache of search results keyed by the Zobrist hash of a
+    game state (`isolation.Board.zobrist`).
+
+    Each slot holds a single entry `(key, depth, flag, value, move,
+    generation)` where `depth` is the number of plies searched below the
+    state, `flag` tells whether `value` is the exact minimax value or only a
+    lower/upper bound on it (after a beta/alpha cutoff), and `move` is the
+    best move found. When two states map to the same slot, the new entry
+    replaces the old one if the old one is from a previous search
+    (generation), describes the same state, or was searched no deeper.
+
+    The slots are only allocated by the first `store()`, and `clear()`
+    releases them, so idle tables (e.g., of players unpickled by a worker process that
+    hasn't run them yet) don't hold any memory.
+
+    Parameters
+    ----------
+    size_mb : float (optional)
+        Approximate upper bound on the memory used by the table entries, in
+        megabytes.
+    """
+    EXACT = 0
+    LOWER = 1
+    UPPER = 2
+
+    # Approximate size of one entry (slot pointer, tuple, key and value)
+    ENTRY_BYTES = 160
+
+    def __init__(self, size_mb=16.):
+        self.size = max(1, int(size_mb * 2**20) // TranspositionTable.ENTRY_BYTES)
+        self.generation = 0
+        self.clear()
+
+    def __getstate__(self):
+        # The entries are only a cache, so don't pay to pickle them when the
+        # owning player is sent to another process
+        state = self.__dict__.copy()
+        del state["_entries"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.clear()
+
+    def __len__(self):
+        if self._entries is None:
+            return 0
+        return sum(1 for entry in self._entries if entry is not None)
+
+    def clear(self):
+        """Remove every entry from the table and release its slots. """
+        self._entries = None
+
+    def new_search(self):
+        """Mark the entries stored so far as belonging to a previous search so
+        they are the first to be replaced.
+        """
+        self.generation += 1
+
+    def lookup(self, key):
+        """Return the entry stored for the state with the given Zobrist key,
+        or None if there is no entry for it.
+        """
+        if self._entries is None:
+            return None
+        entry = self._entries[key % self.size]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, flag, value, move):
+        """Record the result of searching a state `depth` plies deep, subject
+        to the replacement policy described above.
+        """
+        if self._entries is None:
+            self._entries = [None] * self.size
+        slot = key % self.size
+        old = self._entries[slot]
+        if (old is None or old[0] == key or old[5] != self.generation or
+                depth >= old[1]):
+            self._entries[slot] = (key, depth, flag, value, move, self.generation)
+
+
+class EndgameSolver:
+    """Exact solver for isolation endgames.
+
+    Once the players are separated (see `isolation.Board.is_partitioned()`)
+    each of them can only move inside its own region of the board, so the
+    player to move wins if and only if its longest knight path is strictly
+    longer than its opponent's. Longest paths are memoized by (cell, available
+    cells), so regions are only solved once. When the players are not
+    separated but few blank cells remain, the game tree is searched to the end
+    with the win/loss results memoized by Zobrist key.
+
+    Parameters
+    ----------
+    blank_threshold : int (optional)
+        Solve positions that are not partitioned when at most this many
+        blank cells remain.
+
+    max_entries : int (optional)
+        Each memo table is cleared when it grows beyond this many entries.
+    """
+    CHECK_INTERVAL = 256  # number of solved nodes between timer checks
+
+    def __init__(self, blank_threshold=12, max_entries=2**20):
+        self.blank_threshold = blank_threshold
+        self.max_entries = max_entries
+        self._paths = {}
+        self._results = {}
+        self._check_time = None
+        self._calls = 0
+
+    def best_move(self, game, check_time):
+        """Return the best move for the active player if the position can be
+        solved exactly, or None if it is not an endgame (or every move loses
+        against perfect play and the players are not separated, in which case
+        the caller's heuristic search is better at setting traps).
+
+        Parameters
+        ----------
+        game : `isolation.Board`
+            The current game state.
+
+        check_time : callable
+            Called periodically during the solve; it should raise
+            `SearchTimeout` to abort the solve.
+        """
+        if (game.get_player_location(game.active_player) is None or
+                game.get_player_location(game.inactive_player) is None):
+            return None
+
+        moves = game.get_legal_moves()
+        if not moves:
+            return None
+
+        self._check_time = check_time
+        if len(self._results) > self.max_entries:
+            self._results.clear()
+        if sum(len(memo) for memo in self._paths.values()) > self.max_entries:
+            self._paths.clear()
+
+        if game.is_partitioned():
+            return self._longest_path_move(game, moves)
+
+        if game.get_blank_count() > self.blank_threshold:
+            return None
+
+        for move in moves:
+            undo = game.apply_move(move)
+            try:
+                opponent_wins = self._solve(game)
+            finally:
+                game.undo_move(undo)
+            if not opponent_wins:
+                return move
+        return None
+
+    def path_length(self, game, player):
+        """Return the number of moves in the longest knight path the player
+        can make through blank cells, ignoring the opponent.
+        """
+        loc = game.get_player_location(player)
+        if loc is None:
+            return 0
+        return self._longest_path(game._move_masks, self._path_memo(game),
+                                  loc[0] + loc[1] * game.height,
+                                  game.get_reachable_mask(player))
+
+    def _longest_path_move(self, game, moves):
+        """Return the first move of the longest path of the active player. """
+        masks, memo = game._move_masks, self._path_memo(game)
+        region = game.get_reachable_mask(game.active_player)
+        best_move, best_length = None, -1
+        for move in moves:
+            idx = move[0] + move[1] * game.height
+            length = self._longest_path(masks, memo, idx, region & ~(1 << idx))
+            if length > best_length:
+                best_move, best_length = move, length
+        return best_move
+
+    def _path_memo(self, game):
+        """Return the longest path memo for boards of the size of `game`. """
+        return self._paths.setdefault((game.width, game.height), {})
+
+    def _longest_path(self, masks, memo, loc, available):
+        """Return the length of the longest knight path starting at cell `loc`
+        using only the cells set in the `available` bit mask.
+        """
+        key = (loc, available)
+        length = memo.get(key)
+        if length is not None:
+            return length
+
+        self._tick()
+        length = 0
+        limit = bin(available).count("1")
+        moves = masks[loc] & available
+        while moves and length < limit:
+            low = moves & -moves
+            moves ^= low
+            length = max(length, 1 + self._longest_path(
+                masks, memo, low.bit_length() - 1, available ^ low))
+
+        memo[key] = length
+        return length
+
+    def _solve(self, game):
+        """Return True if the active player wins the current game state with
+        perfect play by both players.
+        """
+        key = game.zobrist
+        result = self._results.get(key)
+        if result is not None:
+            return result
+
+        self._tick()
+        if game.is_partitioned():
+            result = (self.path_length(game, game.active_player) >
+                      self.path_length(game, game.inactive_player))
+        else:
+            result = False
+            for move in game.get_legal_moves():
+                undo = game.apply_move(move)
+                try:
+                    result = not self._solve(game)
+                finally:
+                    game.undo_move(undo)
+                if result:
+                    break
+
+        self._results[key] = result
+        return result
+
+    def _tick(self):
+        self._calls += 1
+        if self._calls % EndgameSolver.CHECK_INTERVAL == 0:
+            self._check_time()
+
+
+MoveStats = namedtuple("MoveStats", ["nodes", "depth", "time_left"])
+
+
+class SearchClock:
+    """Amortized search timer that reads the real `time_left` only every
+    `interval` nodes instead of at every node.
+
+    The interval is recalibrated at each check from the node rate measured
+    since the previous check (timed with `time_left` itself, so it holds for
+    any clock the search is run with), so that the next check comes after at most
+    MAX_CHECK_MS of search and after at most half of the time left above
+    the threshold; the checks get more frequent as the threshold
+    approaches, so the search still stops before `time_left` falls below
+    `threshold` unless the node rate suddenly drops by more than half.
+
+    Parameters
+    ----------
+    time_left : callable
+        The `time_left` function passed to `get_move`.
+
+    threshold : float
+        The number of milliseconds left at which the search must stop.
+    """
+    MAX_CHECK_MS = 2.  # longest search time between timer checks
+
+    def __init__(self, time_left, threshold):
+        self.time_left = time_left
+        self.threshold = threshold
+        self.interval = 1
+        self.countdown = 1
+        self._checked = 0
+        self._last_remaining = time_left()
+
+    @property
+    def nodes(self):
+        """The number of nodes counted so far. """
+        return self._checked + self.interval - self.countdown
+
+    def expired(self):
+        """Read the timer, which is due when `countdown` reaches 0, and
+        return True if the time left is below the threshold. Otherwise,
+        schedule the next check.
+        """
+        remaining = self.time_left()
+        if remaining < self.threshold:
+            return True
+
+        elapsed_ms = self._last_remaining - remaining
+        budget_ms = min(SearchClock.MAX_CHECK_MS, (remaining - self.threshold) / 2.)
+        if elapsed_ms > 0:  # False for clocks that are infinite or stopped
+            interval = int(self.interval * budget_ms / elapsed_ms)
+        else:
+            interval = 2 * self.interval
+        # grow the interval gradually in case the measured rate was a fluke
+        interval = max(1, min(interval, 2 * self.interval))
+
+        self._checked += self.interval
+        self.interval = self.countdown = interval
+        self._last_remaining = remaining
+        return False
+
+
+class TimeManager:
+    """Decides whether iterative deepening should start another iteration
+    of the search for a move.
+
+    The time the next iteration will take is predicted from the time of the
+    last one and the effective branching factor (the ratio of the node
+    counts of the last two iterations). When the last two iterations agreed
+    on the best move, the next one is only started if it is predicted to
+    complete before the time left falls to the threshold. Otherwise the
+    position is unstable and the next iteration is started as long as
+    UNSTABLE_FRACTION of it is predicted to complete, since the root moves
+    it completes can still replace the best move.
+
+    Time is measured with `time_left`, so the predictions hold for any
+    clock the search is run with.
+
+    Parameters
+    ----------
+    time_left : callable
+        The `time_left` function passed to `get_move`.
+
+    threshold : float
+        The number of milliseconds left at which the search must stop.
+    """
+    UNSTABLE_FRACTION = 0.5
+
+    def __init__(self, time_left, threshold):
+        self.time_left = time_left
+        self.threshold = threshold
+        self.iterations = []  # (nodes, milliseconds, best move) per iteration
+        self.last_time_left = time_left()
+
+    def iteration_done(self, nodes, best_move):
+        """Record a completed iteration. """
+        now = self.time_left()
+        elapsed = self.last_time_left - now
+        if math.isnan(elapsed):
+            elapsed = 0.  # an infinite clock
+        self.iterations.append((nodes, elapsed, best_move))
+        self.last_time_left = now
+
+    def predicted_time(self):
+        """Return the predicted number of milliseconds of the next iteration,
+        or 0 until two iterations have completed.
+        """
+        if len(self.iterations) < 2:
+            return 0.
+        (prev_nodes, _, _), (nodes, elapsed, _) = self.iterations[-2:]
+        return elapsed * max(1., nodes / max(prev_nodes, 1))
+
+    def stable(self):
+        """Return True if the last two iterations chose the same move. """
+        return len(self.iterations) >= 2 and self.iterations[-1][2] == self.iterations[-2][2]
+
+    def should_continue(self):
+        """Return True if another iteration should be started. """
+        remaining = self.time_left() - self.threshold
+        if remaining <= 0:
+            return False
+        needed = self.predicted_time()
+        if not self.stable():
+            needed *= TimeManager.UNSTABLE_FRACTION
+        return needed < remaining
+
+
 class IsolationPlayer:
     """Base class for minimax and alphabeta agents -- this class is never
     constructed or tested directly.
@@ -454,7 +834,58 @@ class IsolationPlayer:
             return -1
 
 
-class MinimaxPlayer(IsolationPlayer):
+class SearchClockMixin:
+    """Mixin for `IsolationPlayer` subclasses that amortizes the timer checks
+    of their searches with a `SearchClock`, and records the `MoveStats` of
+    the last MOVE_STATS_LIMIT moves in `move_stats`, so players reused
+    across many games keep a bounded history.
+
+    `get_move` starts the clock with `_start_clock`, the search calls
+    `_out_of_time` at every node, and `_stop_clock` records the statistics
+    of the move.
+    """
+    MOVE_STATS_LIMIT = 100
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.move_stats = deque(maxlen=self.MOVE_STATS_LIMIT)
+        self._clock = None
+
+    def _start_clock(self, time_left):
+        """Start the `SearchClock` that amortizes the timer checks of the
+        search for a new move.
+        """
+        self.time_left = time_left
+        self._clock = SearchClock(time_left, self.TIMER_THRESHOLD)
+
+    def _stop_clock(self, depth, nodes=None):
+        """Record the `MoveStats` of the search for the current move in
+        `move_stats`: the number of nodes searched below the root (counted by
+        the clock unless given), the depth completed, and the time left when
+        the search returned.
+        """
+        clock, self._clock = self._clock, None
+        if nodes is None:
+            nodes = clock.nodes
+        self.move_stats.append(MoveStats(nodes, depth, self.time_left()))
+
+    def _out_of_time(self, depth):
+        """Count a node `depth` plies from the root and tell whether the
+        search must stop. Timer checks are amortized by the clock started by
+        `get_move`; searches started without it check the timer every time.
+        """
+        clock = self._clock
+        if clock is None:
+            expired = self.time_left() < self.TIMER_THRESHOLD
+        else:
+            clock.countdown -= 1
+            expired = clock.countdown <= 0 and clock.expired()
+        if expired:
+            self.timeout_depths.append(depth)
+        return expired
+
+
+class MinimaxPlayer(SearchClockMixin, IsolationPlayer):
     """Game-playing agent that chooses a move using depth-limited minimax
     search. You must finish and test this player to make sure it properly uses
     minimax to return a good move before the search time limit expires.
@@ -488,7 +919,8 @@ class MinimaxPlayer(IsolationPlayer):
             Board coordinates corresponding to a legal move; may return
             (-1, -1) if there are no available legal moves.
         """
-        self.time_left = time_left
+        self._start_clock(time_left)
+        timeouts = len(self.timeout_depths)
 
         # Initialize the best move so that this function returns something
         # in case the search fails due to timeout
@@ -497,11 +929,13 @@ class MinimaxPlayer(IsolationPlayer):
         try:
             # The try/except block will automatically catch the exception
             # raised when the timer is about to expire.
-            return self.minimax(game, self.search_depth)
+            best_move = self.minimax(game, self.search_depth)
+            completed = len(self.timeout_depths) == timeouts
 
         except SearchTimeout:
-            pass  # Handle any actions required after timeout as needed
+            completed = False  # Handle any actions required after timeout as needed
 
+        self._stop_clock(self.search_depth if completed else 0)
         # Return the best move from the last completed search iteration
         return best_move
 
@@ -567,8 +1001,15 @@ class MinimaxPlayer(IsolationPlayer):
             # The try/except block will automatically catch the exception
             # raised when the timer is about to expire.
             # return max(actions, key=lambda action: self._min_value(game.forecast_move(action), 1))
+            # Walk the tree on a single board with apply_move/undo_move rather
+            # than allocating a copy of the board per node with forecast_move
             for action in actions:
-                score = self._min_value(game.forecast_move(action), 1)
+                undo = game.apply_move(action)
+                try:
+                    score = self._min_value(game, 1)
+                finally:
+                    game.undo_move(undo)
+
                 if score > best_score:
                     best_score = score
                     best_move = action
@@ -596,7 +1037,11 @@ class MinimaxPlayer(IsolationPlayer):
             v = float("inf")
 
             for action in game.get_legal_moves():
-                v = min(v, self._max_value(game.forecast_move(action), depth + 1))
+                undo = game.apply_move(action)
+                try:
+                    v = min(v, self._max_value(game, depth + 1))
+                finally:
+                    game.undo_move(undo)
 
             return v
 
@@ -618,7 +1063,11 @@ class MinimaxPlayer(IsolationPlayer):
             v = float("-inf")
 
             for action in game.get_legal_moves():
-                v = max(v, self._min_value(game.forecast_move(action), depth + 1))
+                undo = game.apply_move(action)
+                try:
+                    v = max(v, self._min_value(game, depth + 1))
+                finally:
+                    game.undo_move(undo)
 
             return v
 
@@ -628,10 +1077,10 @@ class MinimaxPlayer(IsolationPlayer):
         Check if the depth is equal or greater than the search_depth of the
         agent or if there are no legal moves.
 
-        Raise SearchTimeout if time_left is less than the TIMER_THRESHOLD.
+        Raise SearchTimeout if time_left is less than the TIMER_THRESHOLD
+        (checked every few nodes, see `SearchClock`).
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            self.timeout_depths.append(depth)
+        if self._out_of_time(depth):
             raise SearchTimeout()
 
         beyond_search_depth = depth >= self.search_depth
@@ -640,12 +1089,120 @@ class MinimaxPlayer(IsolationPlayer):
         return beyond_search_depth or no_legal_moves
 
 
+# Width of the null windows searched by principal variation search; it must be
+# smaller than the smallest difference between two heuristic scores
+PVS_EPSILON = 1e-9
 
-class AlphaBetaPlayer(IsolationPlayer):
+
+class AlphaBetaPlayer(SearchClockMixin, IsolationPlayer):
     """Game-playing agent that chooses a move using iterative deepening minimax
     search with alpha-beta pruning. You must finish and test this player to
     make sure it returns a good move before the search time limit expires.
+
+    Search results are cached in a `TranspositionTable` that is shared by all
+    iterations of the iterative deepening search, so states reached through
+    different move orders are only searched once per depth.
+
+    Moves are ordered to maximize pruning: at the root and at each ply, the
+    principal variation (PV) of the previous iteration is tried first, then
+    the transposition table move, the killer moves that caused cutoffs at the
+    same ply, and finally the remaining moves by history heuristic score. The
+    number of nodes searched by each completed iteration of the last call to
+    get_move() is available in `node_counts` (indexed by depth - 1), and the
+    `MoveStats` of the recent moves in `move_stats`.
+
+    The timer is read every few nodes rather than at every node (see
+    `SearchClock`).
+
+    Parameters
+    ----------
+    search_depth : int (optional)
+        See `IsolationPlayer`.
+
+    score_fn : callable (optional)
+        See `IsolationPlayer`.
+
+    timeout : float (optional)
+        See `IsolationPlayer`.
+
+    tt_size_mb : float (optional)
+        Approximate memory cap (in megabytes) of the transposition table.
+        Set to 0 to disable the table.
+
+    persist_tt : bool (optional)
+        Keep the transposition table between moves of the same game (it is
+        always cleared at the start of a new game). If False, the table is
+        cleared at the start of every move.
+
+    search_mode : str (optional)
+        "alphabeta" (default) searches every move with the full (alpha, beta)
+        window. "pvs" uses principal variation search (NegaScout): the first
+        move at each node gets the full window and the others are searched
+        with a null window (`PVS_EPSILON` wide) that only proves they are no
+        better, re-searching the rare moves that turn out better.
+
+    aspiration_window : float or None (optional)
+        If set, each iteration of iterative deepening after the first
+        searches the root with the window (score - aspiration_window,
+        score + aspiration_window) around the previous iteration's score, and
+        re-searches with the full window only when the result falls outside.
+
+    endgame_threshold : int or None (optional)
+        Before searching, try to solve the position exactly with an
+        `EndgameSolver`: always once the players are separated, and by
+        searching to the end of the game when at most this many blank cells
+        remain. The solver gets at most half of the remaining time, so the
+        heuristic search can still run if it fails. Disabled (None) by
+        default; 12 blank cells is a good value on a 7x7 board.
+
+    adaptive_time : bool (optional)
+        Let a `TimeManager` decide when to stop deepening, instead of
+        starting iterations until the time left falls below the
+        TIMER_THRESHOLD, and play the best move found by an iteration that
+        runs out of time if it completed any root move (the PV move of the
+        previous iteration is searched first). Iterations never go deeper
+        than the number of blank cells. Disabled (False) by default.
+
+    reuse_search : bool (optional)
+        Carry the previous move's search over to this one when the
+        transposition table is kept: iterative deepening starts at the depth
+        to which the table already holds the current position (the iterations
+        below it are skipped and count 0 nodes in `node_counts`), the rest of
+        the previous PV is tried first if the opponent followed it, and the
+        killer moves and (halved) history scores are kept. Disabled (False)
+        by default.
     """
+    SEARCH_MODES = ("alphabeta", "pvs")
+
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.,
+                 tt_size_mb=16., persist_tt=True, search_mode="alphabeta",
+                 aspiration_window=None, endgame_threshold=None, reuse_search=False,
+                 adaptive_time=False):
+        super().__init__(search_depth, score_fn, timeout)
+        if search_mode not in AlphaBetaPlayer.SEARCH_MODES:
+            raise ValueError("search_mode must be one of {}, got {!r}".format(
+                AlphaBetaPlayer.SEARCH_MODES, search_mode))
+        self.tt = TranspositionTable(tt_size_mb) if tt_size_mb else None
+        self.persist_tt = persist_tt
+        self.search_mode = search_mode
+        self.aspiration_window = aspiration_window
+        self.reuse_search = reuse_search
+        self.adaptive_time = adaptive_time
+        self.time_manager = None
+        self._root_best = None
+        self._pvs = search_mode == "pvs"
+        self.endgame = (EndgameSolver(endgame_threshold)
+                        if endgame_threshold is not None else None)
+        self._last_game = None
+
+        # move ordering and search statistics
+        self.pv = []
+        self.nodes = 0
+        self.node_counts = []
+        self.root_value = None
+        self._pv_table = {}
+        self._killers = {}
+        self._history = ({}, {})
 
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
@@ -677,28 +1234,67 @@ class AlphaBetaPlayer(IsolationPlayer):
             Board coordinates corresponding to a legal move; may return
             (-1, -1) if there are no available legal moves.
         """
-        self.time_left = time_left
+        self._start_clock(time_left)
 
-        # Initialize the best move so that this function returns something
-        # in case the search fails due to timeout
-        best_move = (-1, -1)
+        # The best move is initialized (to the move stored for this position
+        # by the previous search, if any) so that this function returns
+        # something in case the search fails due to timeout
+        if self._prepare_tt(game) and self.reuse_search:
+            start_depth, best_move = self._carry_over_search(game)
+        else:
+            self._reset_ordering()
+            start_depth, best_move = 1, (-1, -1)
+
+        if self.endgame is not None:
+            solved_move = self._solve_endgame(game)
+            if solved_move is not None:
+                self._stop_clock(game.get_blank_count())
+                return solved_move
 
         try:
             # The try/except block will automatically catch the exception
             # raised when the timer is about to expire.
-            self.search_depth = 0
+            self.search_depth = start_depth - 1
+            self.node_counts = [0] * (start_depth - 1)
 
-            while self.time_left() > self.TIMER_THRESHOLD:
-                self.search_depth += 1
-                best_move = self.alphabeta(game, self.search_depth)
+            if self.adaptive_time:
+                best_move = self._deepen(game, best_move)
+            else:
+                while self.time_left() > self.TIMER_THRESHOLD:
+                    self.search_depth += 1
+                    best_move = self._search_iteration(game)
+                    self.node_counts.append(self.nodes)
 
         except SearchTimeout:
-            pass  # Handle any actions required after timeout as needed
-
+            # Handle any actions required after timeout as needed
+            if self.adaptive_time:
+                iterations = self.time_manager.iterations
+                if self._root_best is not None:
+                    best_move = self._root_best
+                elif iterations:
+                    best_move = iterations[-1][2]
+
+        self._stop_clock(len(self.node_counts))
         # Return the best move from the last completed search iteration
         return best_move
 
 
+    def _deepen(self, game, best_move):
+        """Run iterative deepening from `self.search_depth` + 1 for as long
+        as the `time_manager` allows, up to the number of blank cells (deeper
+        iterations would only repeat the same search), and return the best
+        move of the last iteration (`best_move` if none completed).
+        """
+        self.time_manager = manager = TimeManager(self.time_left, self.TIMER_THRESHOLD)
+        self._root_best = None
+        max_depth = max(game.get_blank_count(), self.search_depth + 1)
+        while self.search_depth < max_depth and manager.should_continue():
+            self.search_depth += 1
+            best_move = self._search_iteration(game)
+            self.node_counts.append(self.nodes)
+            manager.iteration_done(self.nodes, best_move)
+        return best_move
+
     def alphabeta(self, game, depth, alpha=float("-inf"), beta=float("inf")):
         """Implement depth-limited minimax search with alpha-beta pruning as
         described in the lectures.
@@ -759,6 +1355,8 @@ class AlphaBetaPlayer(IsolationPlayer):
 
         best_move = (-1, -1)
         actions = game.get_legal_moves()
+        self.nodes = 1
+        self._root_best = None
 
         if not actions:
             return best_move
@@ -770,13 +1368,39 @@ class AlphaBetaPlayer(IsolationPlayer):
         # try:
         #     # The try/except block will automatically catch the exception
         #     # raised when the timer is about to expire.
-        for action in sorted(actions):
-            v = self._min_value(game.forecast_move(action), alpha, beta, 1)
+        alpha_orig = alpha
+        actions.sort()
+        if self.pv and self.pv[0] in actions:
+            actions.remove(self.pv[0])
+            actions.insert(0, self.pv[0])
+        pv = [best_move]
+
+        # The search applies and undoes moves on `game` in place, so the board
+        # is left unchanged when this returns (or raises SearchTimeout)
+        for i, action in enumerate(actions):
+            undo = game.apply_move(action)
+            try:
+                if self._pvs and i > 0:
+                    v = self._min_value(game, alpha, alpha + PVS_EPSILON, 1)
+                    if alpha < v < beta:
+                        v = self._min_value(game, alpha, beta, 1)
+                else:
+                    v = self._min_value(game, alpha, beta, 1)
+            finally:
+                game.undo_move(undo)
 
             # print("v = {}".format(v))
             if v > alpha:
                 alpha = v
-                best_move = action
+                best_move = self._root_best = action
+                pv = [action] + self._pv_table.get(1, [])
+
+            if alpha >= beta:
+                break
+
+        self._tt_store(game, 0, alpha_orig, beta, alpha, best_move)
+        self.pv = pv
+        self.root_value = alpha
 
         # except SearchTimeout:
         #     # print("SearchTimeout in AlphaBetaPlayer.alphabeta. best_move = {}".format(best_move))
@@ -800,21 +1424,44 @@ class AlphaBetaPlayer(IsolationPlayer):
                 alpha = MAX(alpha, v)
             return v
         """
+        self.nodes += 1
+        self._pv_table[depth] = []
         if self._terminal_test(game, depth):
             return self.score(game, self)
         else:
-            v = float("-inf")
-
-            for action in game.get_legal_moves():
-                min_value = self._min_value(game.forecast_move(action), alpha, beta, depth + 1)
+            tt_value, tt_move = self._tt_probe(game, alpha, beta, depth)
+            if tt_value is not None:
+                return tt_value
 
-                v = max(v, min_value)
+            alpha_orig = alpha
+            v = float("-inf")
+            best_move = None
+
+            for i, action in enumerate(self._ordered_moves(game, depth, tt_move)):
+                undo = game.apply_move(action)
+                try:
+                    if self._pvs and i > 0:
+                        # null window: only prove the move can't beat alpha
+                        min_value = self._min_value(game, alpha, alpha + PVS_EPSILON, depth + 1)
+                        if alpha < min_value < beta:
+                            min_value = self._min_value(game, alpha, beta, depth + 1)
+                    else:
+                        min_value = self._min_value(game, alpha, beta, depth + 1)
+                finally:
+                    game.undo_move(undo)
+
+                if min_value > v:
+                    v = min_value
+                    best_move = action
+                    self._pv_table[depth] = [action] + self._pv_table[depth + 1]
 
                 if v >= beta:
-                    return v
+                    self._record_cutoff(action, depth)
+                    break
 
                 alpha = max(alpha, v)
 
+            self._tt_store(game, depth, alpha_orig, beta, v, best_move)
             return v
 
 
@@ -834,32 +1481,244 @@ class AlphaBetaPlayer(IsolationPlayer):
 
             return v
         """
+        self.nodes += 1
+        self._pv_table[depth] = []
         if self._terminal_test(game, depth):
             return self.score(game, self)
         else:
-            v = float("inf")
-
-            for action in game.get_legal_moves():
-                max_value = self._max_value(game.forecast_move(action), alpha, beta, depth + 1)
+            tt_value, tt_move = self._tt_probe(game, alpha, beta, depth)
+            if tt_value is not None:
+                return tt_value
 
-                v = min(v, max_value)
+            beta_orig = beta
+            v = float("inf")
+            best_move = None
+
+            for i, action in enumerate(self._ordered_moves(game, depth, tt_move)):
+                undo = game.apply_move(action)
+                try:
+                    if self._pvs and i > 0:
+                        # null window: only prove the move can't go below beta
+                        max_value = self._max_value(game, beta - PVS_EPSILON, beta, depth + 1)
+                        if alpha < max_value < beta:
+                            max_value = self._max_value(game, alpha, beta, depth + 1)
+                    else:
+                        max_value = self._max_value(game, alpha, beta, depth + 1)
+                finally:
+                    game.undo_move(undo)
+
+                if max_value < v:
+                    v = max_value
+                    best_move = action
+                    self._pv_table[depth] = [action] + self._pv_table[depth + 1]
 
                 if v <= alpha:
-                    return v
+                    self._record_cutoff(action, depth)
+                    break
 
                 beta = min(beta, v)
 
+            self._tt_store(game, depth, alpha, beta_orig, v, best_move)
             return v
 
+    def _search_iteration(self, game):
+        """Run one iteration of iterative deepening to `self.search_depth`,
+        using an aspiration window around the previous iteration's score when
+        `aspiration_window` is set, and return the best move.
+        """
+        previous = self.root_value
+        if (self.aspiration_window is None or self.search_depth == 1 or
+                previous is None or math.isinf(previous)):
+            return self.alphabeta(game, self.search_depth)
+
+        alpha = previous - self.aspiration_window
+        beta = previous + self.aspiration_window
+        best_move = self.alphabeta(game, self.search_depth, alpha, beta)
+        if alpha < self.root_value < beta:
+            return best_move
+
+        # The score fell outside the window, so the move may be wrong
+        nodes = self.nodes
+        best_move = self.alphabeta(game, self.search_depth)
+        self.nodes += nodes
+        return best_move
+
+    def _reset_ordering(self):
+        """Forget the move ordering information and statistics gathered while
+        searching the previous move.
+        """
+        self.pv = []
+        self.nodes = 0
+        self.node_counts = []
+        self.root_value = None
+        self._pv_table = {}
+        self._killers = {}
+        self._history = ({}, {})
+
+    def _carry_over_search(self, game):
+        """Reset the statistics for a new move, keeping the move ordering
+        information of the previous move's search that applies to the
+        current position (see `reuse_search`).
+
+        Returns
+        -------
+        (int, (int, int))
+            The depth to start iterative deepening from and the best move
+            stored for the current position in the transposition table, or
+            (1, (-1, -1)) if the position isn't in the table.
+        """
+        pv, killers, history = self.pv, self._killers, self._history
+        self._reset_ordering()
+
+        entry = self.tt.lookup(game.zobrist)
+        if entry is None or entry[4] not in game.get_legal_moves():
+            return 1, (-1, -1)
+
+        # the previous PV holds this player's move and the predicted reply
+        if (len(pv) > 2 and pv[0] == game.get_player_location(self) and
+                pv[1] == game.get_player_location(game.get_opponent(self))):
+            self.pv = pv[2:]
+        else:
+            self.pv = [entry[4]]
+
+        # the root has moved two plies down the tree
+        self._killers = {depth - 2: moves for depth, moves in killers.items() if depth > 2}
+        self._history = tuple({move: score >> 1 for move, score in scores.items()}
+                              for scores in history)
+        # iterations beyond the end of the game only repeat the same search
+        return max(1, min(entry[1], game.get_blank_count())), entry[4]
+
+    def _ordered_moves(self, game, depth, tt_move):
+        """Return the legal moves of the active player ordered so the moves
+        most likely to cause a cutoff are searched first: the previous
+        iteration's PV move at this ply, the transposition table move, the
+        killer moves for this ply, then the rest by history score.
+        """
+        actions = game.get_legal_moves()
+        if len(actions) < 2:
+            return actions
+
+        history = self._history[depth & 1]
+        if history:
+            actions.sort(key=lambda m: history.get(m, 0), reverse=True)
+
+        killers = self._killers.get(depth, ())
+        pv_move = self.pv[depth] if depth < len(self.pv) else None
+        for move in reversed((pv_move, tt_move) + tuple(killers)):
+            if move is not None and move in actions:
+                actions.remove(move)
+                actions.insert(0, move)
+        return actions
+
+    def _record_cutoff(self, move, depth):
+        """Update the killer moves and history scores for a move that caused
+        a cutoff `depth` plies from the root.
+        """
+        killers = self._killers.setdefault(depth, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[2:]
+
+        # Cutoffs close to the root prune larger subtrees, so weight them more
+        history = self._history[depth & 1]
+        remaining = self.search_depth - depth
+        history[move] = history.get(move, 0) + remaining * remaining
+
+    def _solve_endgame(self, game):
+        """Return the move chosen by the endgame solver, or None if the
+        position could not be solved in half of the remaining time.
+        """
+        reserve = self.time_left() / 2.
+
+        def check_time():
+            if self.time_left() - reserve < self.TIMER_THRESHOLD:
+                raise SearchTimeout()
+
+        try:
+            return self.endgame.best_move(game, check_time)
+        except SearchTimeout:
+            return None
+
+    def _prepare_tt(self, game):
+        """Age or clear the transposition table before searching a new move.
+
+        Values are stored from this player's point of view, so the table is
+        cleared whenever a new game starts (detected by the move count not
+        increasing, or this player switching sides) as well as on every move
+        if `persist_tt` is False.
+
+        Returns
+        -------
+        bool
+            True if the entries of the previous search were kept.
+        """
+        if self.tt is None:
+            return False
+
+        this_game = (game.move_count, game.active_player == game._player_1,
+                     game.width, game.height)
+        last_game = self._last_game
+        if (not self.persist_tt or last_game is None or this_game[0] <= last_game[0]
+                or this_game[1:] != last_game[1:]):
+            self.tt.clear()
+            kept = False
+        else:
+            kept = True
+        self.tt.new_search()
+        self._last_game = this_game
+        return kept
+
+    def _tt_probe(self, game, alpha, beta, depth):
+        """Look up the current state in the transposition table.
+
+        Returns
+        -------
+        (float or None, (int, int) or None)
+            The stored value if it was searched at least as deep as needed
+            here and is usable with the (alpha, beta) window (None otherwise),
+            and the stored best move (None if there is no entry).
+        """
+        if self.tt is None:
+            return None, None
+
+        entry = self.tt.lookup(game.zobrist)
+        if entry is None:
+            return None, None
+
+        _, entry_depth, flag, value, move, _ = entry
+        if entry_depth >= self.search_depth - depth:
+            if (flag == TranspositionTable.EXACT or
+                    (flag == TranspositionTable.LOWER and value >= beta) or
+                    (flag == TranspositionTable.UPPER and value <= alpha)):
+                return value, move
+
+        return None, move
+
+    def _tt_store(self, game, depth, alpha, beta, v, best_move):
+        """Store the value `v` of the current state, searched with the window
+        (alpha, beta) at `depth` plies from the root, in the transposition
+        table.
+        """
+        if self.tt is None:
+            return
+
+        if v <= alpha:
+            flag = TranspositionTable.UPPER
+        elif v >= beta:
+            flag = TranspositionTable.LOWER
+        else:
+            flag = TranspositionTable.EXACT
+        self.tt.store(game.zobrist, self.search_depth - depth, flag, v, best_move)
+
     def _terminal_test(self, game, depth):
         """
         Check if the depth is equal or greater than the search_depth of the
         agent or if there are no legal moves.
 
-        Raise SearchTimeout if time_left is less than the TIMER_THRESHOLD.
+        Raise SearchTimeout if time_left is less than the TIMER_THRESHOLD
+        (checked every few nodes, see `SearchClock`).
         """
-        if self.time_left() < self.TIMER_THRESHOLD:
-            self.timeout_depths.append(depth)
+        if self._out_of_time(depth):
             raise SearchTimeout()
 
         beyond_search_depth = depth >= self.search_depth
@@ -9,3 +9,11 @@ legal moves loses, and the opponent is declared the winner.
 
 # Make the Board class available at the root of the module for imports
 from .isolation import Board
+from .bitboard import BitBoard
+
+# The board implementations by name, for the scripts that let the user choose
+# the engine (tournaments, benchmarks and perft)
+ENGINES = {
+    "list": Board,
+    "bitboard": BitBoard
+}
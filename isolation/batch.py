@@ -0,0 +1,221 @@
+"""
+This file contains the `BatchBoard` class, which stores many independent
+games of Isolation in NumPy arrays and advances all of them in lockstep, so
+random playouts (e.g., for rollouts, dataset generation, or estimating the
+win rate of an opening) cost a few array operations per ply for the whole
+batch instead of a `Board.play` call per game.
+
+NumPy is only needed by this module, which is not imported by the package:
+
+    from isolation.batch import BatchBoard
+"""
+import numpy as np
+
+from .isolation import Board, _move_table
+
+_MOVE_ARRAYS = {}
+
+
+def _move_array(width, height):
+    """Return an array of shape (width * height, 8) holding the index of the
+    cell reached by each knight move from each cell, in the direction order
+    of `_move_table()`, padded with -1 for the moves that leave the board.
+    Arrays are built once per board size and shared by every batch of those
+    dimensions.
+    """
+    key = (width, height)
+    if key not in _MOVE_ARRAYS:
+        moves = np.full((width * height, 8), -1, dtype=np.intp)
+        for idx, cell_moves in enumerate(_move_table(width, height)):
+            moves[idx, :len(cell_moves)] = [move_idx for move_idx, _ in cell_moves]
+        moves.flags.writeable = False
+        _MOVE_ARRAYS[key] = moves
+    return _MOVE_ARRAYS[key]
+
+
+class BatchBoard(object):
+    """A batch of independent Isolation games played in lockstep.
+
+    Cells are identified by their index in `Board._board_state` (row +
+    column * height) and players by their index (0 for player 1, 1 for
+    player 2). A game is over once the player to move has no legal moves,
+    at which point its opponent is recorded as the `winner`.
+
+    Parameters
+    ----------
+    size : int
+        The number of games in the batch.
+
+    width : int (optional)
+        The number of columns of every board.
+
+    height : int (optional)
+        The number of rows of every board.
+
+    seed : int or None (optional)
+        Seed of the random number generator used by `random_moves()`.
+
+    Attributes
+    ----------
+    blocked : numpy.ndarray
+        Boolean array of shape (size, width * height), True for the cells
+        that have been occupied in each game.
+
+    locations : numpy.ndarray
+        Array of shape (size, 2) with the cell index of each player in each
+        game, or -1 if the player has not moved yet.
+
+    active : numpy.ndarray
+        The index of the player holding the initiative in each game.
+
+    move_count : numpy.ndarray
+        The number of moves applied to each game.
+
+    winner : numpy.ndarray
+        The index of the player who won each game, or -1 if it is still in
+        play.
+    """
+
+    def __init__(self, size, width=7, height=7, seed=None):
+        self.size = size
+        self.width = width
+        self.height = height
+        self.rng = np.random.default_rng(seed)
+        self.blocked = np.zeros((size, width * height), dtype=bool)
+        self.locations = np.full((size, 2), -1, dtype=np.intp)
+        self.active = np.zeros(size, dtype=np.intp)
+        self.move_count = np.zeros(size, dtype=np.intp)
+        self.winner = np.full(size, -1, dtype=np.intp)
+        self._moves = _move_array(width, height)
+        self._rows = np.arange(size)
+
+    @classmethod
+    def from_board(cls, board, size, seed=None):
+        """Return a batch of `size` copies of the position of an
+        `isolation.Board` (or `BitBoard`).
+        """
+        state = board._board_state
+        batch = cls(size, board.width, board.height, seed)
+        batch.blocked[:] = np.array(state[:-3]) != Board.BLANK
+        batch.locations[:] = [-1 if loc == Board.NOT_MOVED else loc
+                              for loc in (state[-1], state[-2])]
+        batch.active[:] = state[-3]
+        batch.move_count[:] = board.move_count
+        batch.update_winners()
+        return batch
+
+    def to_board(self, game, player_1, player_2, board_cls=Board):
+        """Return the position of one game of the batch as a new `Board` (or
+        `board_cls`) between the given players.
+        """
+        board = board_cls(player_1, player_2, self.width, self.height)
+        state = self.blocked[game].astype(int).tolist()
+        p1_loc, p2_loc = (Board.NOT_MOVED if loc < 0 else int(loc)
+                          for loc in self.locations[game])
+        board._board_state = state + [int(self.active[game]), p2_loc, p1_loc]
+        board.move_count = int(self.move_count[game])
+        if self.active[game]:
+            board._active_player, board._inactive_player = player_2, player_1
+        return board
+
+    @property
+    def done(self):
+        """Boolean array, True for the games that are over. """
+        return self.winner >= 0
+
+    def legal_move_mask(self):
+        """Return a boolean array of shape (size, width * height), True for
+        the cells the active player of each game can move to. Finished games
+        have no legal moves.
+        """
+        cells = self.width * self.height
+        rows = self._rows[:, np.newaxis]
+        locs = self.locations[self._rows, self.active]
+        open_cells = ~self.blocked
+
+        # knight moves from the player's cell; the padding (-1) and blocked
+        # destinations are sent to an extra column that is dropped
+        dest = self._moves[np.maximum(locs, 0)]
+        legal = (dest >= 0) & open_cells[rows, dest]
+        mask = np.zeros((self.size, cells + 1), dtype=bool)
+        mask[rows, np.where(legal, dest, cells)] = True
+        mask = mask[:, :cells]
+
+        # a player that hasn't moved yet can move to any blank cell
+        unmoved = locs < 0
+        mask[unmoved] = open_cells[unmoved]
+        mask[self.done] = False
+        return mask
+
+    def update_winners(self, mask=None):
+        """End the unfinished games where the active player has no legal
+        moves (according to `mask`, the result of `legal_move_mask()`),
+        recording the opponent as the winner.
+        """
+        if mask is None:
+            mask = self.legal_move_mask()
+        lost = ~mask.any(axis=1) & ~self.done
+        self.winner[lost] = 1 - self.active[lost]
+
+    def random_moves(self, mask=None):
+        """Return the cell index of a legal move chosen uniformly at random
+        for the active player of each game, or -1 for the games without legal
+        moves.
+        """
+        if mask is None:
+            mask = self.legal_move_mask()
+        keys = self.rng.random(mask.shape)
+        keys[~mask] = -1.
+        moves = keys.argmax(axis=1)
+        moves[~mask.any(axis=1)] = -1
+        return moves
+
+    def apply_moves(self, moves):
+        """Move the active player of each game to the cell index in `moves`,
+        skipping the games where the move is -1. The moves are assumed to be
+        legal.
+        """
+        moves = np.asarray(moves)
+        rows = np.flatnonzero(moves >= 0)
+        cells = moves[rows]
+        self.blocked[rows, cells] = True
+        self.locations[rows, self.active[rows]] = cells
+        self.active[rows] ^= 1
+        self.move_count[rows] += 1
+
+    def step(self):
+        """Play one random move in every unfinished game, ending the games
+        where the active player has no legal moves.
+
+        Returns
+        -------
+        int
+            The number of games that made a move.
+        """
+        mask = self.legal_move_mask()
+        self.update_winners(mask)
+        moves = self.random_moves(mask)
+        self.apply_moves(moves)
+        return int(np.count_nonzero(moves >= 0))
+
+    def play_random(self):
+        """Play every game of the batch to the end with random moves.
+
+        Returns
+        -------
+        numpy.ndarray
+            The index of the winner of each game.
+        """
+        while self.step():
+            pass
+        return self.winner
+
+
+def random_win_rate(board, playouts, seed=None):
+    """Estimate the probability that the active player of an
+    `isolation.Board` wins when both players move at random, from `playouts`
+    random games played in a single batch.
+    """
+    player = board._board_state[-3]
+    winners = BatchBoard.from_board(board, playouts, seed).play_random()
+    return float(np.mean(winners == player))
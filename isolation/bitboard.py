@@ -0,0 +1,288 @@
+"""
+This file contains the `BitBoard` class, an alternative implementation of
+`isolation.Board` that packs the game state into integers instead of a list.
+
+Blocked cells are stored as a single integer with one bit per cell, and the
+player locations are stored as plain cell indices, so copying a board or
+applying a move costs a handful of integer operations rather than a list copy.
+Cells are numbered exactly as in `Board` (index = row + column * height), and
+the public API is the same, so the two engines can be swapped per game.
+"""
+import random
+
+from .isolation import (Board, _cell_table, _copy_rng, _move_table, _move_mask_table, _popcount,
+                        _zobrist_table)
+
+
+class BitBoard(Board):
+    """Implement a model for the game Isolation using integer bitboards.
+
+    The behavior (including the order of the legal moves returned for a given
+    state of the `random` module) is identical to `Board`, so a game played on
+    either engine with the same random seed produces the same move history.
+
+    Parameters
+    ----------
+    player_1 : object
+        An object with a get_move() function. This is the only function
+        directly called by the Board class for each player.
+
+    player_2 : object
+        An object with a get_move() function. This is the only function
+        directly called by the Board class for each player.
+
+    width : int (optional)
+        The number of columns that the board should have.
+
+    height : int (optional)
+        The number of rows that the board should have.
+
+    shuffle : bool (optional)
+        See `Board`.
+
+    seed : hashable or None (optional)
+        See `Board`.
+    """
+
+    def __init__(self, player_1, player_2, width=7, height=7, shuffle=True, seed=None):
+        self.width = width
+        self.height = height
+        self.move_count = 0
+        self._player_1 = player_1
+        self._player_2 = player_2
+        self._active_player = player_1
+        self._inactive_player = player_2
+
+        # One bit per cell (index = row + column * height) for blocked cells,
+        # and the cell index (or NOT_MOVED) of each player
+        self._blocked = 0
+        self._p1_loc = Board.NOT_MOVED
+        self._p2_loc = Board.NOT_MOVED
+        self._initiative = 0
+        self._move_table = _move_table(width, height)
+        self._move_masks = _move_mask_table(width, height)
+        self._zobrist_keys = _zobrist_table(width, height)
+        self._zobrist = 0
+        self._blank_count = width * height
+        self._shuffle = shuffle
+        self._rng = random.Random(seed) if seed is not None else None
+
+    @property
+    def _board_state(self):
+        """A list in the `Board._board_state` layout describing the current
+        state. This is only provided for compatibility with code written
+        against `Board`, and is rebuilt on every access.
+        """
+        state = [(self._blocked >> idx) & 1 for idx in range(self.width * self.height)]
+        return state + [self._initiative, self._p2_loc, self._p1_loc]
+
+    @_board_state.setter
+    def _board_state(self, state):
+        self._blocked = 0
+        for idx, value in enumerate(state[:-3]):
+            if value != Board.BLANK:
+                self._blocked |= 1 << idx
+        self._initiative = state[-3]
+        self._p2_loc = state[-2]
+        self._p1_loc = state[-1]
+        self._zobrist = self._compute_zobrist()
+        self._blank_count = _popcount(self._blank_mask())
+
+    def _compute_zobrist(self):
+        """Compute the Zobrist hash of the current state from scratch. """
+        blocked_keys, p1_keys, p2_keys, initiative_key = self._zobrist_keys
+        z = 0
+        for idx in range(self.width * self.height):
+            if (self._blocked >> idx) & 1:
+                z ^= blocked_keys[idx]
+        if self._p1_loc != Board.NOT_MOVED:
+            z ^= p1_keys[self._p1_loc]
+        if self._p2_loc != Board.NOT_MOVED:
+            z ^= p2_keys[self._p2_loc]
+        if self._initiative:
+            z ^= initiative_key
+        return z
+
+    def copy(self):
+        """ Return a deep copy of the current board. """
+        # Every attribute but the move order generator is immutable, so a
+        # shallow copy is a deep copy
+        new_board = object.__new__(self.__class__)
+        new_board.__dict__.update(self.__dict__)
+        new_board._rng = _copy_rng(self._rng)
+        return new_board
+
+    def move_is_legal(self, move):
+        """Test whether a move is legal in the current game state.
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+
+        Returns
+        -------
+        bool
+            Returns True if the move is legal, False otherwise
+        """
+        return (0 <= move[0] < self.height and 0 <= move[1] < self.width and
+                not (self._blocked >> (move[0] + move[1] * self.height)) & 1)
+
+    def get_blank_spaces(self):
+        """Return a list of the locations that are still available on the board.
+        """
+        blocked = self._blocked
+        return [cell for idx, cell in enumerate(_cell_table(self.width, self.height))
+                if not (blocked >> idx) & 1]
+
+    def _blank_mask(self):
+        """Return an integer with one bit set for each blank cell. """
+        return ~self._blocked & ((1 << (self.width * self.height)) - 1)
+
+    def get_player_location(self, player):
+        """Find the current location of the specified player on the board.
+
+        Parameters
+        ----------
+        player : object
+            An object registered as a player in the current game.
+
+        Returns
+        -------
+        (int, int) or None
+            The coordinate pair (row, column) of the input player, or None
+            if the player has not moved.
+        """
+        if player == self._player_1:
+            idx = self._p1_loc
+        elif player == self._player_2:
+            idx = self._p2_loc
+        else:
+            raise RuntimeError(
+                "Invalid player in get_player_location: {}".format(player))
+        if idx == Board.NOT_MOVED:
+            return Board.NOT_MOVED
+        return (idx % self.height, idx // self.height)
+
+    def get_legal_moves(self, player=None):
+        """Return the list of all legal moves for the specified player.
+
+        Parameters
+        ----------
+        player : object (optional)
+            An object registered as a player in the current game. If None,
+            return the legal moves for the active player on the board.
+
+        Returns
+        -------
+        list<(int, int)>
+            The list of coordinate pairs (row, column) of all legal moves
+            for the player constrained by the current game state.
+        """
+        if player is None:
+            player = self._active_player
+        if player == self._player_1:
+            return self.__get_moves(self._p1_loc)
+        elif player == self._player_2:
+            return self.__get_moves(self._p2_loc)
+        raise RuntimeError(
+            "Invalid player in get_legal_moves: {}".format(player))
+
+    def apply_move(self, move):
+        """Move the active player to a specified location.
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+
+        Returns
+        -------
+        (int, int or None)
+            An undo record that can be passed to `undo_move()` to restore
+            the board to the state it had before this move was applied.
+        """
+        idx = move[0] + move[1] * self.height
+        blocked_keys, p1_keys, p2_keys, initiative_key = self._zobrist_keys
+        if self._active_player == self._player_2:
+            last_loc, player_keys = self._p2_loc, p2_keys
+            self._p2_loc = idx
+        else:
+            last_loc, player_keys = self._p1_loc, p1_keys
+            self._p1_loc = idx
+        z = self._zobrist ^ blocked_keys[idx] ^ player_keys[idx] ^ initiative_key
+        if last_loc != Board.NOT_MOVED:
+            z ^= player_keys[last_loc]
+        self._zobrist = z
+        self._blocked |= 1 << idx
+        self._blank_count -= 1
+        self._initiative ^= 1
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        self.move_count += 1
+        return (idx, last_loc)
+
+    def undo_move(self, undo):
+        """Revert the most recent move applied to the board in-place.
+
+        Parameters
+        ----------
+        undo : (int, int or None)
+            The undo record returned by the `apply_move()` call being reverted.
+        """
+        idx, last_loc = undo
+        blocked_keys, p1_keys, p2_keys, initiative_key = self._zobrist_keys
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        if self._active_player == self._player_2:
+            self._p2_loc, player_keys = last_loc, p2_keys
+        else:
+            self._p1_loc, player_keys = last_loc, p1_keys
+        z = self._zobrist ^ blocked_keys[idx] ^ player_keys[idx] ^ initiative_key
+        if last_loc != Board.NOT_MOVED:
+            z ^= player_keys[last_loc]
+        self._zobrist = z
+        self._blocked &= ~(1 << idx)
+        self._blank_count += 1
+        self._initiative ^= 1
+        self.move_count -= 1
+
+    def __get_moves(self, loc):
+        """Generate the list of possible moves for an L-shaped motion (like a
+        knight in chess) from the cell index `loc`.
+        """
+        if loc == Board.NOT_MOVED:
+            return self.get_blank_spaces()
+
+        blocked = self._blocked
+        valid_moves = [move for idx, move in self._move_table[loc]
+                       if not (blocked >> idx) & 1]
+        if self._shuffle:
+            (self._rng or random).shuffle(valid_moves)
+        return valid_moves
+
+    def to_string(self, symbols=['1', '2']):
+        """Generate a string representation of the current game state, marking
+        the location of each player and indicating which cells have been
+        blocked, and which remain open.
+        """
+        col_margin = len(str(self.height - 1)) + 1
+        prefix = "{:<" + "{}".format(col_margin) + "}"
+        offset = " " * (col_margin + 3)
+        out = offset + '   '.join(map(str, range(self.width))) + '\n\r'
+        for i in range(self.height):
+            out += prefix.format(i) + ' | '
+            for j in range(self.width):
+                idx = i + j * self.height
+                if not (self._blocked >> idx) & 1:
+                    out += ' '
+                elif self._p1_loc == idx:
+                    out += symbols[0]
+                elif self._p2_loc == idx:
+                    out += symbols[1]
+                else:
+                    out += '-'
+                out += ' | '
+            out += '\n\r'
+
+        return out
@@ -13,6 +13,113 @@ from copy import copy
 
 TIME_LIMIT_MILLIS = 150
 
+_DIRECTIONS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+               (1, -2), (1, 2), (2, -1), (2, 1)]
+
+_MOVE_TABLES = {}
+
+_MOVE_MASKS = {}
+
+_ZOBRIST_TABLES = {}
+
+_RADIUS_MASKS = {}
+
+_CELL_TABLES = {}
+
+
+def _move_table(width, height):
+    """Return a tuple indexed by cell index where each entry is a tuple of
+    (index, (row, column)) pairs for every in-bounds knight move from that
+    cell, listed in a fixed direction order. Tables are built once per board
+    size and shared by every board of those dimensions.
+    """
+    key = (width, height)
+    if key not in _MOVE_TABLES:
+        table = []
+        for idx in range(width * height):
+            r, c = idx % height, idx // height
+            table.append(tuple(((r + dr) + (c + dc) * height, (r + dr, c + dc))
+                               for dr, dc in _DIRECTIONS
+                               if 0 <= r + dr < height and 0 <= c + dc < width))
+        _MOVE_TABLES[key] = tuple(table)
+    return _MOVE_TABLES[key]
+
+
+def _cell_table(width, height):
+    """Return a tuple mapping each cell index to its (row, column) pair.
+    Tables are shared like those of `_move_table()`.
+    """
+    key = (width, height)
+    if key not in _CELL_TABLES:
+        _CELL_TABLES[key] = tuple((idx % height, idx // height)
+                                  for idx in range(width * height))
+    return _CELL_TABLES[key]
+
+
+def _move_mask_table(width, height):
+    """Return a tuple indexed by cell index where each entry is an integer
+    with one bit set (bit index = cell index) for every cell a knight can
+    reach from that cell. Tables are shared like those of `_move_table()`.
+    """
+    key = (width, height)
+    if key not in _MOVE_MASKS:
+        _MOVE_MASKS[key] = tuple(sum(1 << idx for idx, _ in moves)
+                                 for moves in _move_table(width, height))
+    return _MOVE_MASKS[key]
+
+
+def _radius_mask_table(width, height, radius):
+    """Return a tuple indexed by cell index where each entry is an integer
+    with one bit set for every cell at most `radius` rows and `radius`
+    columns away from that cell (including the cell itself). Tables are
+    shared like those of `_move_table()`.
+    """
+    key = (width, height, radius)
+    if key not in _RADIUS_MASKS:
+        table = []
+        for idx in range(width * height):
+            r, c = idx % height, idx // height
+            table.append(sum(1 << (row + col * height)
+                             for col in range(max(0, c - radius), min(width, c + radius + 1))
+                             for row in range(max(0, r - radius), min(height, r + radius + 1))))
+        _RADIUS_MASKS[key] = tuple(table)
+    return _RADIUS_MASKS[key]
+
+
+def _zobrist_table(width, height):
+    """Return the Zobrist keys for a board size as a tuple (blocked, player_1,
+    player_2, initiative), where the first three are tuples of 64-bit keys
+    indexed by cell index and the last is a single key that is mixed in when
+    player 2 holds the initiative. Keys come from a generator seeded by the
+    board size so hashes are stable across processes and runs.
+    """
+    key = (width, height)
+    if key not in _ZOBRIST_TABLES:
+        rng = random.Random("isolation-zobrist-{}x{}".format(width, height))
+        cells = width * height
+        _ZOBRIST_TABLES[key] = (tuple(rng.getrandbits(64) for _ in range(cells)),
+                                tuple(rng.getrandbits(64) for _ in range(cells)),
+                                tuple(rng.getrandbits(64) for _ in range(cells)),
+                                rng.getrandbits(64))
+    return _ZOBRIST_TABLES[key]
+
+
+def _popcount(mask):
+    """Return the number of bits set in a non-negative integer mask. """
+    return bin(mask).count("1")
+
+
+def _copy_rng(rng):
+    """Return a generator that starts in the state of `rng` (or None), so a
+    board copy draws the same move order as the original without advancing
+    the original's sequence.
+    """
+    if rng is None:
+        return None
+    new_rng = random.Random(0)
+    new_rng.setstate(rng.getstate())
+    return new_rng
+
 
 class Board(object):
     """Implement a model for the game Isolation assuming each player moves like
@@ -33,11 +140,22 @@ class Board(object):
 
     height : int (optional)
         The number of rows that the board should have.
+
+    shuffle : bool (optional)
+        Return the legal moves in a random order (the default). If False,
+        moves are always listed in the same fixed order, which is faster and
+        makes search results independent of any random number generator.
+
+    seed : hashable or None (optional)
+        If set, the legal moves are shuffled with a random number generator
+        owned by this game (and shared with its copies) seeded with this
+        value, instead of the global `random` module, so the game can be
+        replayed exactly.
     """
     BLANK = 0
     NOT_MOVED = None
 
-    def __init__(self, player_1, player_2, width=7, height=7):
+    def __init__(self, player_1, player_2, width=7, height=7, shuffle=True, seed=None):
         self.width = width
         self.height = height
         self.move_count = 0
@@ -48,12 +166,64 @@ class Board(object):
 
         # The last 3 entries of the board state includes initiative (0 for
         # player 1, 1 for player 2) player 2 last move, and player 1 last move
-        self._board_state = [Board.BLANK] * (width * height + 3)
-        self._board_state[-1] = Board.NOT_MOVED
-        self._board_state[-2] = Board.NOT_MOVED
+        self._state = [Board.BLANK] * (width * height + 3)
+        self._state[-1] = Board.NOT_MOVED
+        self._state[-2] = Board.NOT_MOVED
+        self._move_table = _move_table(width, height)
+        self._move_masks = _move_mask_table(width, height)
+        self._zobrist_keys = _zobrist_table(width, height)
+        self._zobrist = 0
+        self._blank = (1 << (width * height)) - 1
+        self._blank_count = width * height
+        self._shuffle = shuffle
+        self._rng = random.Random(seed) if seed is not None else None
+
+    @property
+    def _board_state(self):
+        """The list encoding the current game state. Assigning a new list
+        rebuilds all of the state that is otherwise maintained incrementally
+        by `apply_move()` and `undo_move()`.
+        """
+        return self._state
+
+    @_board_state.setter
+    def _board_state(self, state):
+        self._state = state
+        self._zobrist = self._compute_zobrist()
+        self._blank = 0
+        for idx, value in enumerate(state[:-3]):
+            if value == Board.BLANK:
+                self._blank |= 1 << idx
+        self._blank_count = _popcount(self._blank)
+
+    def _compute_zobrist(self):
+        """Compute the Zobrist hash of the current state from scratch. """
+        blocked_keys, p1_keys, p2_keys, initiative_key = self._zobrist_keys
+        z = 0
+        for idx, value in enumerate(self._state[:-3]):
+            if value != Board.BLANK:
+                z ^= blocked_keys[idx]
+        if self._state[-1] != Board.NOT_MOVED:
+            z ^= p1_keys[self._state[-1]]
+        if self._state[-2] != Board.NOT_MOVED:
+            z ^= p2_keys[self._state[-2]]
+        if self._state[-3]:
+            z ^= initiative_key
+        return z
+
+    @property
+    def zobrist(self):
+        """A 64-bit Zobrist hash of the current game state covering the
+        blocked cells, the location of each player and which player holds the
+        initiative. The value is updated incrementally by `apply_move()` and
+        `undo_move()`, so reading it is O(1). Boards of the same size in the
+        same state always hash to the same value, across processes and
+        engines.
+        """
+        return self._zobrist
 
     def hash(self):
-        return str(self._board_state).__hash__()
+        return self._zobrist
 
     @property
     def active_player(self):
@@ -96,7 +266,12 @@ class Board(object):
         new_board.move_count = self.move_count
         new_board._active_player = self._active_player
         new_board._inactive_player = self._inactive_player
-        new_board._board_state = copy(self._board_state)
+        new_board._state = copy(self._state)
+        new_board._zobrist = self._zobrist
+        new_board._blank = self._blank
+        new_board._blank_count = self._blank_count
+        new_board._shuffle = self._shuffle
+        new_board._rng = _copy_rng(self._rng)
         return new_board
 
     def forecast_move(self, move):
@@ -134,13 +309,87 @@ class Board(object):
         """
         idx = move[0] + move[1] * self.height
         return (0 <= move[0] < self.height and 0 <= move[1] < self.width and
-                self._board_state[idx] == Board.BLANK)
+                self._state[idx] == Board.BLANK)
 
     def get_blank_spaces(self):
         """Return a list of the locations that are still available on the board.
         """
-        return [(i, j) for j in range(self.width) for i in range(self.height)
-                if self._board_state[i + j * self.height] == Board.BLANK]
+        # the cell table is shorter than the state, so zip skips the last 3
+        # entries (initiative and player locations)
+        return [cell for cell, value in zip(_cell_table(self.width, self.height), self._state)
+                if value == Board.BLANK]
+
+    def get_blank_count(self):
+        """Return the number of locations that are still available on the
+        board. The count is maintained incrementally, so this is O(1).
+        """
+        return self._blank_count
+
+    def _blank_mask(self):
+        """Return an integer with one bit set for each blank cell (bit index
+        = row + column * height). The mask is maintained incrementally by
+        `apply_move()` and `undo_move()`.
+        """
+        return self._blank
+
+    def count_blank_near(self, loc, radius):
+        """Return the number of blank cells at most `radius` rows and
+        `radius` columns away from a location.
+
+        Parameters
+        ----------
+        loc : (int, int)
+            A coordinate pair (row, column) on the board.
+
+        radius : int
+            The half-width of the square neighborhood counted around `loc`.
+        """
+        masks = _radius_mask_table(self.width, self.height, radius)
+        return _popcount(masks[loc[0] + loc[1] * self.height] & self._blank_mask())
+
+    def get_reachable_mask(self, player):
+        """Return the cells the specified player could still reach by any
+        sequence of its own moves through blank cells, ignoring the opponent.
+
+        Parameters
+        ----------
+        player : object
+            An object registered as a player in the current game.
+
+        Returns
+        -------
+        int
+            An integer with one bit set (bit index = row + column * height)
+            for each reachable cell, or 0 if the player has not moved yet.
+        """
+        loc = self.get_player_location(player)
+        if loc == Board.NOT_MOVED:
+            return 0
+
+        masks = self._move_masks
+        blank = self._blank_mask()
+        region = 0
+        frontier = masks[loc[0] + loc[1] * self.height] & blank
+        while frontier:
+            region |= frontier
+            reached = 0
+            while frontier:
+                low = frontier & -frontier
+                reached |= masks[low.bit_length() - 1]
+                frontier ^= low
+            frontier = reached & blank & ~region
+        return region
+
+    def is_partitioned(self):
+        """Test whether the players have been separated, i.e. both players
+        are on the board and no blank cell is reachable by both of them, so
+        neither player can affect the other for the rest of the game.
+        """
+        if self.get_player_location(self._player_1) == Board.NOT_MOVED or \
+                self.get_player_location(self._player_2) == Board.NOT_MOVED:
+            return False
+        return not (self.get_reachable_mask(self._player_1) &
+                    self.get_reachable_mask(self._player_2))
 
     def get_player_location(self, player):
         """Find the current location of the specified player on the board.
@@ -157,13 +406,13 @@ class Board(object):
             if the player has not moved.
         """
         if player == self._player_1:
-            if self._board_state[-1] == Board.NOT_MOVED:
+            if self._state[-1] == Board.NOT_MOVED:
                 return Board.NOT_MOVED
-            idx = self._board_state[-1]
+            idx = self._state[-1]
         elif player == self._player_2:
-            if self._board_state[-2] == Board.NOT_MOVED:
+            if self._state[-2] == Board.NOT_MOVED:
                 return Board.NOT_MOVED
-            idx = self._board_state[-2]
+            idx = self._state[-2]
         else:
             raise RuntimeError(
                 "Invalid player in get_player_location: {}".format(player))
@@ -198,14 +447,60 @@ class Board(object):
         move : (int, int)
             A coordinate pair (row, column) indicating the next position for
             the active player on the board.
+
+        Returns
+        -------
+        (int, int or None)
+            An undo record that can be passed to `undo_move()` to restore
+            the board to the state it had before this move was applied.
         """
         idx = move[0] + move[1] * self.height
         last_move_idx = int(self.active_player == self._player_2) + 1
-        self._board_state[-last_move_idx] = idx
-        self._board_state[idx] = 1
-        self._board_state[-3] ^= 1
+        last_loc = self._state[-last_move_idx]
+        self._state[-last_move_idx] = idx
+        self._state[idx] = 1
+        self._blank &= ~(1 << idx)
+        self._blank_count -= 1
+        self._state[-3] ^= 1
+        self._zobrist ^= self.__zobrist_delta(idx, last_move_idx, last_loc)
         self._active_player, self._inactive_player = self._inactive_player, self._active_player
         self.move_count += 1
+        return (idx, last_loc)
+
+    def undo_move(self, undo):
+        """Revert the most recent move applied to the board in-place.
+
+        Moves must be undone in the reverse order they were applied, so
+        search can walk the game tree on a single board instead of copying
+        it at every node with `forecast_move()`.
+
+        Parameters
+        ----------
+        undo : (int, int or None)
+            The undo record returned by the `apply_move()` call being reverted.
+        """
+        idx, last_loc = undo
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        last_move_idx = int(self.active_player == self._player_2) + 1
+        self._state[-last_move_idx] = last_loc
+        self._state[idx] = Board.BLANK
+        self._blank |= 1 << idx
+        self._blank_count += 1
+        self._state[-3] ^= 1
+        self._zobrist ^= self.__zobrist_delta(idx, last_move_idx, last_loc)
+        self.move_count -= 1
+
+    def __zobrist_delta(self, idx, last_move_idx, last_loc):
+        """Return the value XORed into the Zobrist hash when the player whose
+        location is stored at `_state[-last_move_idx]` moves from `last_loc`
+        to the cell `idx` (or back again, since XOR is its own inverse).
+        """
+        blocked_keys, p1_keys, p2_keys, initiative_key = self._zobrist_keys
+        player_keys = p1_keys if last_move_idx == 1 else p2_keys
+        delta = blocked_keys[idx] ^ player_keys[idx] ^ initiative_key
+        if last_loc != Board.NOT_MOVED:
+            delta ^= player_keys[last_loc]
+        return delta
 
     def is_winner(self, player):
         """ Test whether the specified player has won the game. """
@@ -254,12 +549,11 @@ class Board(object):
         if loc == Board.NOT_MOVED:
             return self.get_blank_spaces()
 
-        r, c = loc
-        directions = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
-                      (1, -2), (1, 2), (2, -1), (2, 1)]
-        valid_moves = [(r + dr, c + dc) for dr, dc in directions
-                       if self.move_is_legal((r + dr, c + dc))]
-        random.shuffle(valid_moves)
+        state = self._state
+        valid_moves = [move for idx, move in self._move_table[loc[0] + loc[1] * self.height]
+                       if state[idx] == Board.BLANK]
+        if self._shuffle:
+            (self._rng or random).shuffle(valid_moves)
         return valid_moves
 
     def print_board(self):
@@ -271,8 +565,8 @@ class Board(object):
         the location of each player and indicating which cells have been
         blocked, and which remain open.
         """
-        p1_loc = self._board_state[-1]
-        p2_loc = self._board_state[-2]
+        p1_loc = self._state[-1]
+        p2_loc = self._state[-2]
 
         col_margin = len(str(self.height - 1)) + 1
         prefix = "{:<" + "{}".format(col_margin) + "}"
@@ -282,7 +576,7 @@ class Board(object):
             out += prefix.format(i) + ' | '
             for j in range(self.width):
                 idx = i + j * self.height
-                if not self._board_state[idx]:
+                if not self._state[idx]:
                     out += ' '
                 elif p1_loc == idx:
                     out += symbols[0]
@@ -295,6 +589,15 @@ class Board(object):
 
         return out
 
+    def _notify_players(self, move):
+        """Call `notify_move(game, move)` on each player that defines it,
+        passing this board.
+        """
+        for player in (self._player_1, self._player_2):
+            notify = getattr(player, "notify_move", None)
+            if notify is not None:
+                notify(self, move)
+
     def play(self, time_limit=TIME_LIMIT_MILLIS):
         """Execute a match between the players by alternately soliciting them
         to select a move and applying it in the game.
@@ -310,33 +613,52 @@ class Board(object):
         (player, list<[(int, int),]>, str)
             Return multiple including the winning player, the complete game
             move history, and a string indicating the reason for losing
-            (e.g., timeout or invalid move).
+            (e.g., timeout or invalid move). The number of milliseconds each
+            player spent on each of its turns is recorded in `move_times`.
+
+        Notes
+        -----
+        Players that define a `notify_move(game, move)` method are called
+        after every move with this board once `move` has been applied
+        (whoever made it), and a final time with `move` set to None when the
+        game ends, so they can use the opponent's turn (e.g., for pondering)
+        and release any resources when the match is over. The board must not
+        be modified (players that keep it or search it must copy it), so the
+        notifications cost nothing to the players that ignore them. The time
+        spent in these calls is not charged to either player's clock.
         """
         move_history = []
+        self.move_times = []
 
         time_millis = lambda: 1000 * timeit.default_timer()
 
-        while True:
+        try:
+            while True:
 
-            legal_player_moves = self.get_legal_moves()
-            game_copy = self.copy()
+                legal_player_moves = self.get_legal_moves()
+                game_copy = self.copy()
 
-            move_start = time_millis()
-            time_left = lambda : time_limit - (time_millis() - move_start)
-            curr_move = self._active_player.get_move(game_copy, time_left)
-            move_end = time_left()
+                move_start = time_millis()
+                time_left = lambda : time_limit - (time_millis() - move_start)
+                curr_move = self._active_player.get_move(game_copy, time_left)
+                move_end = time_left()
+                self.move_times.append(time_limit - move_end)
 
-            if curr_move is None:
-                curr_move = Board.NOT_MOVED
+                if curr_move is None:
+                    curr_move = Board.NOT_MOVED
 
-            if move_end < 0:
-                return self._inactive_player, move_history, "timeout"
+                if move_end < 0:
+                    return self._inactive_player, move_history, "timeout"
 
-            if curr_move not in legal_player_moves:
-                if len(legal_player_moves) > 0:
-                    return self._inactive_player, move_history, "forfeit"
-                return self._inactive_player, move_history, "illegal move"
+                if curr_move not in legal_player_moves:
+                    if len(legal_player_moves) > 0:
+                        return self._inactive_player, move_history, "forfeit"
+                    return self._inactive_player, move_history, "illegal move"
 
-            move_history.append(list(curr_move))
+                move_history.append(list(curr_move))
 
-            self.apply_move(curr_move)
+                self.apply_move(curr_move)
+                self._notify_players(curr_move)
+        finally:
+            # let the players stop any work started on the previous moves
+            self._notify_players(None)
@@ -0,0 +1,177 @@
+import random
+import unittest
+
+import isolation
+
+from benchmarks.movegen import legacy_get_moves, random_positions
+
+
+class BoardTest(unittest.TestCase):
+    """Unit tests for isolation.Board"""
+
+    def setUp(self):
+        self.player1 = "Player1"
+        self.player2 = "Player2"
+        self.game = isolation.Board(self.player1, self.player2)
+
+    def test_move_tables_are_shared_per_board_size(self):
+        other = isolation.Board(self.player1, self.player2)
+        larger = isolation.Board(self.player1, self.player2, width=9, height=9)
+        self.assertIs(self.game._move_table, other._move_table)
+        self.assertIs(self.game._move_table, self.game.copy()._move_table)
+        self.assertIsNot(self.game._move_table, larger._move_table)
+
+    def test_legal_moves_match_legacy_generator(self):
+        for width, height in [(7, 7), (9, 9), (5, 8)]:
+            for game in random_positions(width, height, 50):
+                for player in (game.active_player, game.inactive_player):
+                    loc = game.get_player_location(player)
+                    self.assertEqual(sorted(game.get_legal_moves(player)),
+                                     sorted(legacy_get_moves(game, loc)))
+
+    def test_undo_move_restores_board(self):
+        for board_cls in (isolation.Board, isolation.BitBoard):
+            game = board_cls(self.player1, self.player2)
+            history = []
+            while game.get_legal_moves():
+                before = (game._board_state, game.to_string(), game.move_count,
+                          game.active_player, game.hash(), game.get_blank_count())
+                history.append((before, game.apply_move(random.choice(game.get_legal_moves()))))
+
+            for before, undo in reversed(history):
+                game.undo_move(undo)
+                self.assertEqual(before, (game._board_state, game.to_string(), game.move_count,
+                                          game.active_player, game.hash(), game.get_blank_count()))
+
+    def test_zobrist_matches_full_recomputation(self):
+        for board_cls in (isolation.Board, isolation.BitBoard):
+            random.seed(0)
+            game = board_cls(self.player1, self.player2)
+            while game.get_legal_moves():
+                game.apply_move(random.choice(game.get_legal_moves()))
+                self.assertEqual(game.zobrist, game._compute_zobrist())
+                self.assertEqual(game.zobrist, game.copy().zobrist)
+
+    def test_zobrist_identifies_transpositions(self):
+        # player 1 walks the same 4-cycle of cells in a different order
+        p1_paths = [[(0, 0), (2, 1), (3, 3), (1, 2)], [(3, 3), (2, 1), (0, 0), (1, 2)]]
+        p2_path = [(6, 6), (4, 5), (6, 4), (4, 3)]
+        games = []
+        for p1_path, board_cls in zip(p1_paths, (isolation.Board, isolation.BitBoard)):
+            game = board_cls(self.player1, self.player2)
+            for p1_move, p2_move in zip(p1_path, p2_path):
+                game.apply_move(p1_move)
+                game.apply_move(p2_move)
+            games.append(game)
+        self.assertEqual(games[0].to_string(), games[1].to_string())
+        self.assertEqual(games[0].zobrist, games[1].zobrist)
+
+        games[1].apply_move((2, 4))
+        self.assertNotEqual(games[0].zobrist, games[1].zobrist)
+
+    def test_zobrist_includes_initiative(self):
+        game = isolation.Board(self.player1, self.player2)
+        game.apply_move((0, 0))
+        game.apply_move((6, 6))
+        state = list(game._board_state)
+        state[-3] ^= 1
+        other = isolation.Board(self.player1, self.player2)
+        other._board_state = state
+        self.assertNotEqual(game.zobrist, other.zobrist)
+
+    def test_reachable_mask_matches_flood_fill(self):
+        for board_cls in (isolation.Board, isolation.BitBoard):
+            for game in random_positions(7, 7, 50, seed=1):
+                regions = []
+                for player in (game.active_player, game.inactive_player):
+                    loc = game.get_player_location(player)
+                    if loc is None:
+                        continue
+                    reached, frontier = set(), [loc]
+                    while frontier:
+                        for move in legacy_get_moves(game, frontier.pop()):
+                            if move not in reached:
+                                reached.add(move)
+                                frontier.append(move)
+                    expected = sum(1 << (r + c * game.height) for r, c in reached)
+                    board = board_cls(game._player_1, game._player_2)
+                    board._board_state = game._board_state
+                    self.assertEqual(board.get_reachable_mask(player), expected)
+                    regions.append(reached)
+                if len(regions) == 2:
+                    self.assertEqual(board.is_partitioned(), not regions[0] & regions[1])
+
+    def test_blank_tracking_matches_scan(self):
+        for board_cls in (isolation.Board, isolation.BitBoard):
+            random.seed(0)
+            game = board_cls(self.player1, self.player2, width=8, height=6)
+            while game.get_legal_moves():
+                game.apply_move(random.choice(game.get_legal_moves()))
+                state = game._board_state
+                blank = game.get_blank_spaces()
+                self.assertEqual(blank, [(i, j) for j in range(game.width) for i in range(game.height)
+                                         if state[i + j * game.height] == isolation.Board.BLANK])
+                self.assertEqual(game.get_blank_count(), len(blank))
+                self.assertEqual(game._blank_mask(),
+                                 sum(1 << (r + c * game.height) for r, c in blank))
+                loc = game.get_player_location(game.inactive_player)
+                for radius in (1, 2, 4):
+                    self.assertEqual(game.count_blank_near(loc, radius), len(
+                        [(r, c) for r, c in blank
+                         if abs(r - loc[0]) <= radius and abs(c - loc[1]) <= radius]))
+
+    def test_move_order_is_seedable(self):
+        for board_cls in (isolation.Board, isolation.BitBoard):
+            games = [board_cls(self.player1, self.player2, seed=3) for _ in range(2)]
+            fixed = board_cls(self.player1, self.player2, shuffle=False)
+            for game in games + [fixed]:
+                game.apply_move((3, 3))
+                game.apply_move((2, 4))
+
+            random.seed(0)
+            state = random.getstate()
+            orders = [[g.get_legal_moves() for _ in range(5)] for g in games]
+            self.assertEqual(orders[0], orders[1])
+            self.assertGreater(len({tuple(order) for order in orders[0]}), 1)
+
+            # unshuffled moves are listed in the direction order of the move tables
+            moves = [(3 + dr, 3 + dc) for dr, dc in isolation.isolation._DIRECTIONS]
+            self.assertEqual(fixed.get_legal_moves(), [m for m in moves if fixed.move_is_legal(m)])
+            self.assertEqual(random.getstate(), state)
+
+    def test_copies_do_not_advance_move_order(self):
+        for board_cls in (isolation.Board, isolation.BitBoard):
+            games = [board_cls(self.player1, self.player2, seed=3) for _ in range(2)]
+            for game in games:
+                game.apply_move((3, 3))
+                game.apply_move((2, 4))
+
+            # searching copies of one game must not change the order it draws
+            copies = [games[0].copy(), games[0].forecast_move((1, 2))]
+            copy_orders = [[c.get_legal_moves() for _ in range(3)] for c in copies]
+            orders = [[g.get_legal_moves() for _ in range(3)] for g in games]
+            self.assertEqual(orders[0], orders[1])
+            self.assertEqual(copy_orders[0], orders[0])
+
+    def test_play_notifies_players_of_moves(self):
+        class Recorder(object):
+            def __init__(self):
+                self.notified = []
+
+            def get_move(self, game, time_left):
+                moves = game.get_legal_moves()
+                return moves[0] if moves else (-1, -1)
+
+            def notify_move(self, game, move):
+                self.notified.append((move, game.move_count))
+
+        players = [Recorder(), Recorder()]
+        game = isolation.Board(*players, shuffle=False)
+        _, history, _ = game.play()
+        expected = [(tuple(move), ply + 1) for ply, move in enumerate(history)]
+        for player in players:
+            self.assertEqual(player.notified, expected + [(None, len(history))])
+
+
+if __name__ == '__main__':
+    unittest.main()
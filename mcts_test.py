@@ -0,0 +1,73 @@
+import itertools
+import pickle
+import random
+import unittest
+
+import isolation
+import competition_agent
+
+from sample_players import improved_score
+
+
+def playout_clock(budget=500.):
+    """Return a time_left function losing one millisecond per call. """
+    calls = itertools.count()
+    return lambda: budget - next(calls)
+
+
+class MCTSTest(unittest.TestCase):
+    """Unit tests for the Monte Carlo tree search competition agent"""
+
+    def setUp(self):
+        random.seed(0)
+        self.player1 = competition_agent.CustomPlayer()
+        self.player2 = "Player2"
+        self.game = isolation.Board(self.player1, self.player2)
+        self.game.apply_move((3, 3))
+        self.game.apply_move((2, 4))
+
+    def test_playouts_are_counted_in_tree(self):
+        move = self.player1.get_move(self.game, playout_clock())
+        self.assertIn(move, self.game.get_legal_moves())
+
+        tree = self.player1._tree
+        self.assertGreater(self.player1.playouts, 100)
+        self.assertEqual(tree.visits[0], self.player1.playouts)
+        self.assertEqual(sum(tree.visits[c] for c in tree.children(0)), self.player1.playouts)
+        best = max(tree.children(0), key=lambda c: tree.visits[c])
+        self.assertEqual(move, (tree.move[best] % 7, tree.move[best] // 7))
+        self.assertGreater(self.player1.average_playout_rate(), 0)
+
+    def test_tree_is_reused_after_reply(self):
+        move = self.player1.get_move(self.game, playout_clock())
+        tree, node = self.player1._tree, self.player1._tree_node
+        self.game.apply_move(move)
+
+        reply = max(tree.children(node), key=lambda c: tree.visits[c])
+        reply_move = (tree.move[reply] % 7, tree.move[reply] // 7)
+        self.game.apply_move(reply_move)
+        subtree = self.player1._reuse_tree(self.game)
+        self.assertEqual(subtree.visits[0], tree.visits[reply])
+        self.assertEqual(sorted(subtree.move[c] for c in subtree.children(0)),
+                         sorted(tree.move[c] for c in tree.children(reply)))
+        self.assertEqual(len(subtree), len(tree.subtree(reply)))
+
+        # a position that doesn't follow the previous search starts afresh
+        self.assertEqual(len(self.player1._reuse_tree(self.game)), 1)
+
+    def test_guided_playouts_and_pickling(self):
+        player = competition_agent.CustomPlayer(rollout_score=improved_score)
+        player.get_move(self.game.copy(), playout_clock(50.))
+        self.assertGreater(player.playouts, 0)
+        player.time_left = None
+        clone = pickle.loads(pickle.dumps(player))
+        self.assertEqual(list(clone._tree.visits), list(player._tree.visits))
+
+        board = isolation.Board(self.player1, self.player2, width=3, height=3)
+        board.apply_move((1, 1))
+        board.apply_move((0, 0))
+        self.assertEqual(self.player1.get_move(board, playout_clock()), (-1, -1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -42,6 +42,17 @@ class MinimaxTest(unittest.TestCase):
             self.player1.get_move(self.game, lambda : 15.)
             self.assertEqual(score_fn.call_count, 35)
 
+    def test_search_does_not_copy_board(self):
+        self.game.apply_move((2, 3))
+        self.game.apply_move((0, 5))
+        before = self.game.to_string()
+        self.player1.time_left = lambda : 15.
+        with mock.patch.object(self.game, 'copy', wraps=self.game.copy) as copy_fn:
+            self.player1.minimax(self.game, 3)
+            self.assertEqual(copy_fn.call_count, 0)
+        self.assertEqual(self.game.to_string(), before)
+        self.assertEqual(self.game.active_player, self.player1)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,521 @@
+"""Game-playing agents that run the iterative deepening alpha-beta search
+of `game_agent.AlphaBetaPlayer` on several processes: splitting the root
+moves across a pool of workers (`ParallelAlphaBetaPlayer`), or searching on
+the opponent's time (`PonderingAlphaBetaPlayer`).
+
+These live outside of `game_agent.py` because they need modules (e.g.,
+`multiprocessing`) that the Project Assistant sandbox does not allow.
+"""
+import math
+import multiprocessing
+import os
+import timeit
+import weakref
+
+from game_agent import (AlphaBetaPlayer, SearchTimeout, TimeManager, TranspositionTable,
+                        custom_score)
+
+
+class ParallelAlphaBetaPlayer(AlphaBetaPlayer):
+    """Game-playing agent that splits the root moves of each iterative
+    deepening iteration across a persistent pool of worker processes.
+
+    Every worker holds its own `AlphaBetaPlayer` (with its own transposition
+    table and move ordering) and searches the subtree below one root move with
+    the full window, so each iteration searches more nodes than the serial
+    search but finishes sooner when several cores are available. The results
+    are merged in the parent, trying the previous iteration's best move first
+    so ties keep the serial search's choice.
+
+    The pool is started by start() (or by entering the player as a context
+    manager) before the first move, so its start-up time is not charged to
+    that move, and reused until close() (or leaving the context). A pool
+    that is never closed is terminated when the player is garbage
+    collected. If only one process is requested, the pool is not running,
+    or it cannot be started (e.g., when the player is already running inside
+    a daemonic pool worker as in `tournament_mp.py`), get_move() runs the
+    serial search.
+
+    Parameters
+    ----------
+    search_depth : int (optional)
+        See `IsolationPlayer`.
+
+    score_fn : callable (optional)
+        See `IsolationPlayer`. Must be picklable (e.g., a module level
+        function) to be sent to the workers.
+
+    timeout : float (optional)
+        See `IsolationPlayer`.
+
+    processes : int or None (optional)
+        The number of worker processes; defaults to `os.cpu_count()`.
+
+    **kwargs
+        Passed to `AlphaBetaPlayer`. The transposition table and search mode
+        options are also used by the workers; aspiration windows are only
+        used by the serial search.
+    """
+
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.,
+                 processes=None, **kwargs):
+        super().__init__(search_depth, score_fn, timeout, **kwargs)
+        self.processes = processes or os.cpu_count() or 1
+        kwargs.pop("aspiration_window", None)
+        self._worker_kwargs = dict(kwargs, search_depth=search_depth, score_fn=score_fn,
+                                   timeout=timeout, endgame_threshold=None)
+        self._pool = None
+        self._pool_finalizer = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_pool"] = state["_pool_finalizer"] = None
+        return state
+
+    def start(self):
+        """Start the worker pool if it is not running and more than one
+        process is requested.
+        """
+        if self.processes < 2 or self._pool is not None:
+            return
+        try:
+            self._pool = multiprocessing.Pool(
+                self.processes, _init_search_worker, (self._worker_kwargs,))
+        except (AssertionError, OSError):
+            # daemonic processes are not allowed to have children
+            self.processes = 1
+            return
+        self._pool_finalizer = weakref.finalize(self, self._pool.terminate)
+
+    def close(self):
+        """Shut down the worker pool (start() restarts it). """
+        if self._pool is not None:
+            self._pool_finalizer.detach()
+            self._pool_finalizer = None
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def get_move(self, game, time_left):
+        """Search for the best move with parallel iterative deepening and
+        return a result before the time limit expires.
+
+        Parameters
+        ----------
+        game : `isolation.Board`
+            An instance of `isolation.Board` encoding the current state of the
+            game (e.g., player locations and blocked cells).
+
+        time_left : callable
+            A function that returns the number of milliseconds left in the
+            current turn. Returning with any less than 0 ms remaining forfeits
+            the game.
+
+        Returns
+        -------
+        (int, int)
+            Board coordinates corresponding to a legal move; may return
+            (-1, -1) if there are no available legal moves.
+        """
+        pool = self._pool
+        if pool is None:
+            return super().get_move(game, time_left)
+
+        self._start_clock(time_left)
+        if self._prepare_tt(game) and self.reuse_search:
+            start_depth, best_move = self._carry_over_search(game)
+        else:
+            self._reset_ordering()
+            start_depth, best_move = 1, (-1, -1)
+
+        if self.endgame is not None:
+            solved_move = self._solve_endgame(game)
+            if solved_move is not None:
+                self._stop_clock(game.get_blank_count())
+                return solved_move
+
+        # no game lasts more plies than there are blank cells, so deeper
+        # iterations would only repeat the same search
+        max_depth = max(game.get_blank_count(), start_depth)
+
+        self.time_manager = manager = TimeManager(time_left, self.TIMER_THRESHOLD)
+        try:
+            self.search_depth = start_depth - 1
+            self.node_counts = [0] * (start_depth - 1)
+            while self.search_depth < max_depth and (
+                    manager.should_continue() if self.adaptive_time else
+                    self.time_left() > self.TIMER_THRESHOLD):
+                self.search_depth += 1
+                best_move = self.parallel_search(game, pool)
+                self.node_counts.append(self.nodes)
+                manager.iteration_done(self.nodes, best_move)
+                self._store_pv(game)
+
+        except SearchTimeout:
+            pass
+
+        self._stop_clock(len(self.node_counts), sum(self.node_counts))
+        return best_move
+
+    def _store_pv(self, game):
+        """Store the positions of the PV of the last iteration in the
+        transposition table, which is otherwise not used by this process, so
+        the next move can carry the search over (see `reuse_search`). The
+        value of every PV position is the root value.
+        """
+        if self.tt is None:
+            return
+        undos = []
+        for ply, move in enumerate(self.pv):
+            self.tt.store(game.zobrist, self.search_depth - ply, TranspositionTable.EXACT,
+                          self.root_value, move)
+            undos.append(game.apply_move(move))
+        for undo in reversed(undos):
+            game.undo_move(undo)
+
+    def parallel_search(self, game, pool):
+        """Search every root move to `self.search_depth` on the worker pool
+        and return the best one; (-1, -1) if there are no legal moves.
+
+        Raise SearchTimeout if any worker (or the wait for the results) runs
+        out of time.
+        """
+        actions = game.get_legal_moves()
+        self.nodes = 1
+        if not actions:
+            return (-1, -1)
+
+        actions.sort()
+        if self.pv and self.pv[0] in actions:
+            actions.remove(self.pv[0])
+            actions.insert(0, self.pv[0])
+
+        # workers get an absolute deadline, since time_left can't be pickled
+        remaining = self.time_left() / 1000.
+        deadline = timeit.default_timer() + remaining
+        state = game._board_state
+        jobs = [(game.__class__, game.width, game.height, state, game.move_count,
+                 action, self.search_depth, self.pv if self.pv[:1] == [action] else [],
+                 deadline)
+                for action in actions]
+
+        wait = None if math.isinf(remaining) else max(0., remaining - self.TIMER_THRESHOLD / 1000.)
+        try:
+            results = pool.map_async(_search_root_move, jobs, chunksize=1).get(wait)
+        except multiprocessing.TimeoutError:
+            raise SearchTimeout()
+        if None in results:
+            raise SearchTimeout()
+
+        best_move, best_value, pv = actions[0], float("-inf"), [actions[0]]
+        for action, (value, action_pv, nodes) in zip(actions, results):
+            self.nodes += nodes
+            if value > best_value:
+                best_move, best_value, pv = action, value, action_pv
+
+        self.pv = pv
+        self.root_value = best_value
+        return best_move
+
+
+class PonderingAlphaBetaPlayer(AlphaBetaPlayer):
+    """Game-playing agent that keeps searching on the opponent's time.
+
+    When `notify_move()` (called by `isolation.Board.play`) reports this
+    player's move, a background process starts iterative deepening from the
+    position after the predicted reply (the next move of the PV). It is
+    stopped when the opponent moves, and if the prediction was right, its
+    transposition table entries and PV are merged into this player's before
+    searching, so the search is carried over from the depth reached while
+    pondering (see `reuse_search`). Hits and misses are counted in
+    `ponder_hits` and `ponder_misses`.
+
+    get_move() waits for the pondered results for at most PONDER_WAIT of
+    the time left above the TIMER_THRESHOLD, so stopping the pondering
+    process can't make the player run out of time. Results that arrive
+    later are dropped and counted in `ponder_timeouts`.
+
+    The process is started on the first ponder and kept until close() is
+    called. Pondering is only useful (and fair to the opponent) when a spare
+    core is available; it is turned off if the process cannot be started
+    (e.g., inside the daemonic pool workers of `tournament_mp.py`) or the
+    transposition table is disabled.
+
+    Parameters
+    ----------
+    search_depth : int (optional)
+        See `IsolationPlayer`.
+
+    score_fn : callable (optional)
+        See `IsolationPlayer`.
+
+    timeout : float (optional)
+        See `IsolationPlayer`.
+
+    ponder_depth : int or None (optional)
+        If set, each ponder searches exactly this many plies (ignoring the
+        opponent's move), and the next get_move() waits for it to finish.
+        This makes pondering deterministic, e.g. for tests, so get_move()
+        waits for the results without a time limit.
+
+    **kwargs
+        Passed to `AlphaBetaPlayer`, and used by the pondering search except
+        for the endgame solver. `reuse_search` defaults to True, since the
+        pondered search is only used when it is carried over.
+    """
+    PONDER_WAIT = 0.25
+
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.,
+                 ponder_depth=None, **kwargs):
+        kwargs.setdefault("reuse_search", True)
+        super().__init__(search_depth, score_fn, timeout, **kwargs)
+        self.ponder_depth = ponder_depth
+        self._worker_kwargs = dict(kwargs, search_depth=search_depth, score_fn=score_fn,
+                                   timeout=timeout, endgame_threshold=None)
+        self.ponder = self.tt is not None
+        self.ponder_hits = 0
+        self.ponder_misses = 0
+        self.ponder_timeouts = 0
+        self._ponder_process = None
+        self._ponder_conn = None
+        self._ponder_root = None
+        self._ponder_stopped = False
+        self._ponder_unread = False
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_ponder_process"] = state["_ponder_conn"] = state["_ponder_root"] = None
+        return state
+
+    def _prepare_tt(self, game):
+        """Age or clear the transposition table like `AlphaBetaPlayer`, then
+        merge the results of pondering if it predicted this position.
+        """
+        kept = super()._prepare_tt(game)
+        if self._ponder_root is not None:
+            kept = self._stop_pondering(game) or kept
+        return kept
+
+    def notify_move(self, game, move):
+        """Start or stop pondering when a move is played.
+
+        Parameters
+        ----------
+        game : `isolation.Board`
+            The board after `move` was applied; it is copied before being
+            changed.
+
+        move : (int, int) or None
+            The move just played by either player, or None when the game is
+            over.
+        """
+        if self._ponder_root is not None and not self._ponder_stopped:
+            # the opponent moved or the game ended; the results are collected
+            # by the next get_move() if the prediction was right
+            self._ponder_conn.send("stop")
+            self._ponder_stopped = True
+        if move is None and self._ponder_root is not None:
+            self._stop_pondering(None)
+        elif self.ponder and game.inactive_player == self:
+            self._start_pondering(game, move)
+
+    def close(self):
+        """Stop the pondering process (it is restarted by the next ponder). """
+        if self._ponder_process is not None:
+            if self._ponder_root is not None:
+                self._stop_pondering(None)
+            self._drain_ponder()
+            self._ponder_conn.send(None)
+            self._ponder_process.join()
+            self._ponder_conn.close()
+            self._ponder_process = self._ponder_conn = None
+
+    def _start_pondering(self, game, move):
+        """Start searching the position after the predicted reply to `move`
+        in the pondering process, starting the process if needed.
+        """
+        self._drain_ponder()
+        if len(self.pv) > 1 and self.pv[0] == move:
+            reply = self.pv[1]
+        else:
+            entry = self.tt.lookup(game.zobrist)
+            reply = entry[4] if entry is not None else None
+        if reply not in game.get_legal_moves():
+            return
+        game = game.forecast_move(reply)
+        if not game.get_legal_moves():
+            return
+
+        if self._ponder_process is None:
+            parent_conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_ponder_worker, args=(child_conn, self._worker_kwargs, self.ponder_depth),
+                daemon=True)
+            try:
+                process.start()
+            except (AssertionError, OSError):
+                # daemonic processes are not allowed to have children
+                self.ponder = False
+                return
+            child_conn.close()
+            self._ponder_process, self._ponder_conn = process, parent_conn
+
+        self._ponder_conn.send((game.__class__, game.width, game.height,
+                                game._board_state, game.move_count))
+        self._ponder_root = (game.zobrist, game.move_count, move, reply)
+        self._ponder_stopped = False
+
+    def _drain_ponder(self):
+        """Read (and drop) the results of a pondering search that arrived too
+        late for `_stop_pondering`, so the next reply matches the next job.
+        """
+        if self._ponder_unread:
+            self._ponder_conn.recv()
+            self._ponder_unread = False
+
+    def _stop_pondering(self, game):
+        """Stop the pondering search (unless notify_move() already did) and
+        wait for its results: without a time limit if `game` is None or
+        `ponder_depth` is set, and for at most PONDER_WAIT of the time left
+        above the threshold otherwise. If the results arrive in time and
+        `game` is the position that was pondered, merge them into the
+        transposition table and PV.
+
+        Returns
+        -------
+        bool
+            True if the pondered results were merged.
+        """
+        key, move_count, move, reply = self._ponder_root
+        if not self._ponder_stopped:
+            self._ponder_conn.send("stop")
+        self._ponder_root = None
+        if game is None or self.ponder_depth is not None:
+            wait = None
+        else:
+            wait = max(0., self.time_left() - self.TIMER_THRESHOLD) * self.PONDER_WAIT / 1000.
+        if not self._ponder_conn.poll(wait):
+            self._ponder_unread = True
+            self.ponder_timeouts += 1
+            return False
+        entries, pv = self._ponder_conn.recv()
+        if game is None:
+            return False
+        if (game.zobrist, game.move_count) != (key, move_count):
+            self.ponder_misses += 1
+            return False
+
+        self.ponder_hits += 1
+        for entry in entries:
+            self.tt.store(*entry)
+        self.pv = [move, reply] + pv
+        return True
+
+
+# the time left reported to the pondering search until it is stopped
+PONDER_CLOCK_MS = 1e9
+
+_search_worker = None
+_search_worker_root = None
+
+
+def _worker_game(player, board_cls, width, height, state, move_count):
+    """Rebuild a position sent to a worker process with the worker's
+    searcher holding the initiative.
+    """
+    opponent = "opponent"
+    if state[-3]:
+        game = board_cls(opponent, player, width=width, height=height)
+        game._active_player, game._inactive_player = player, opponent
+    else:
+        game = board_cls(player, opponent, width=width, height=height)
+    game._board_state = state
+    game.move_count = move_count
+    return game
+
+
+def _ponder_worker(conn, player_kwargs, max_depth=None):
+    """Target of the pondering process of a `PonderingAlphaBetaPlayer`.
+
+    Each job received on `conn` is a position to search with iterative
+    deepening until a "stop" message arrives (or the search reaches the end
+    of the game, or completes `max_depth` plies if it is set); the reply
+    holds the transposition table entries stored by the search, as
+    `TranspositionTable.store()` arguments, and its PV. The process exits
+    when it receives None.
+    """
+    if max_depth is None:
+        # the time manager stops deepening at the number of blank cells, so
+        # the search ends with the game instead of repeating it until the
+        # stop message arrives
+        player_kwargs = dict(player_kwargs, adaptive_time=True)
+    player = AlphaBetaPlayer(**player_kwargs)
+    for job in iter(conn.recv, None):
+        game = _worker_game(player, *job)
+        if max_depth is None:
+            # a clock that runs down in real time, so the `SearchClock`
+            # polls for the stop message every few milliseconds however
+            # long the opponent thinks
+            start = timeit.default_timer()
+            time_left = lambda: (0. if conn.poll() else
+                                 PONDER_CLOCK_MS - 1000. * (timeit.default_timer() - start))
+        else:
+            time_left = lambda: 0. if player.search_depth > max_depth else float("inf")
+        player.get_move(game, time_left)
+        conn.recv()  # the stop message
+        generation = player.tt.generation
+        entries = [entry[:5] for entry in player.tt._entries or ()
+                   if entry is not None and entry[5] == generation]
+        conn.send((entries, player.pv))
+    conn.close()
+
+
+def _init_search_worker(player_kwargs):
+    """Pool initializer creating the searcher used by this worker process. """
+    global _search_worker
+    _search_worker = AlphaBetaPlayer(**player_kwargs)
+
+
+def _search_root_move(job):
+    """Search the subtree below one root move in a worker process.
+
+    Returns
+    -------
+    (float, list<(int, int)>, int) or None
+        The value of the move for the player to move at the root, the
+        principal variation starting with the move, and the number of nodes
+        searched; None if the search ran out of time.
+    """
+    global _search_worker_root
+    board_cls, width, height, state, move_count, move, depth, pv, deadline = job
+    player = _search_worker
+    game = _worker_game(player, board_cls, width, height, state, move_count)
+
+    player._start_clock(lambda: 1000. * (deadline - timeit.default_timer()))
+    root = (board_cls, move_count, game.zobrist)
+    if root != _search_worker_root:
+        # the table and ordering are kept between the root moves and the
+        # iterations searched from the same root, and carried over from the
+        # previous root like in the serial search
+        if player._prepare_tt(game) and player.reuse_search:
+            player._carry_over_search(game)
+        else:
+            player._reset_ordering()
+        _search_worker_root = root
+
+    player.search_depth = depth
+    player.pv = pv
+    player.nodes = 0
+    game.apply_move(move)
+    try:
+        value = player._min_value(game, float("-inf"), float("inf"), 1)
+    except SearchTimeout:
+        return None
+    return value, [move] + player._pv_table.get(1, []), player.nodes
@@ -0,0 +1,224 @@
+"""Verify and time the move generation of the board implementations with
+perft: count the leaf nodes of the game tree to a fixed depth from a set of
+positions (the benchmark corpus of `benchmarks.suite`, or a position given
+as a sequence of moves from the empty board).
+
+Every engine must count the same number of leaves from every position. With
+--diff, two engines walk the same trees in lockstep, comparing every node
+(board state, hash, blank count and the legal moves of both players), and
+the first divergent position is reported with the moves leading to it. This
+is the check to run before playing tournaments on a new engine.
+
+    python perft.py
+    python perft.py --depth 3 --moves 3,3 2,5 --divide
+    python perft.py --depth 5 --diff list bitboard
+"""
+import argparse
+import sys
+import timeit
+
+from benchmarks.suite import BOARD_SIZES, corpus, load
+from isolation import ENGINES
+
+DEPTH = 6
+NUM_POSITIONS = 4  # positions per board size and phase of the corpus
+
+
+def perft(game, depth):
+    """Return the number of positions reached by every sequence of `depth`
+    legal moves from the current state of `game` (games that end sooner
+    don't count). The board is walked with apply_move() and undo_move(), and
+    is left unchanged.
+    """
+    moves = game.get_legal_moves()
+    if depth <= 1:
+        return len(moves) if depth == 1 else 1
+
+    nodes = 0
+    for move in moves:
+        undo = game.apply_move(move)
+        nodes += perft(game, depth - 1)
+        game.undo_move(undo)
+    return nodes
+
+
+def divide(game, depth):
+    """Return a dict mapping each legal move of `game` to the perft count
+    of the position it leads to, `depth` - 1 plies deeper.
+    """
+    counts = {}
+    for move in game.get_legal_moves():
+        undo = game.apply_move(move)
+        counts[move] = perft(game, depth - 1)
+        game.undo_move(undo)
+    return counts
+
+
+def node_signature(game):
+    """Return a dict describing the observable state of `game`, used to
+    compare two engines in the same position.
+    """
+    active, inactive = game.active_player, game.inactive_player
+    return {
+        "board_state": list(game._board_state),
+        "zobrist": game.zobrist,
+        "move_count": game.move_count,
+        "blank_count": game.get_blank_count(),
+        "active_player": active,
+        "locations": (game.get_player_location(active), game.get_player_location(inactive)),
+        "active_moves": sorted(game.get_legal_moves(active)),
+        "inactive_moves": sorted(game.get_legal_moves(inactive)),
+    }
+
+
+def find_divergence(game_a, game_b, depth):
+    """Walk the game trees of two boards in the same position to `depth`
+    plies in lockstep (in the move order of `game_a`), comparing the
+    `node_signature()` of every node.
+
+    Returns
+    -------
+    (list<(int, int)>, dict) or None
+        The moves from the root to the first position where the engines
+        disagree, and the {field: (value in game_a, value in game_b)} of the
+        fields that differ; None if the trees are identical.
+    """
+    path = []
+
+    def walk(depth):
+        sig_a, sig_b = node_signature(game_a), node_signature(game_b)
+        fields = {key: (sig_a[key], sig_b[key]) for key in sig_a if sig_a[key] != sig_b[key]}
+        if fields:
+            return list(path), fields
+        if depth == 0:
+            return None
+        for move in game_a.get_legal_moves():
+            path.append(move)
+            undo_a, undo_b = game_a.apply_move(move), game_b.apply_move(move)
+            divergence = walk(depth - 1)
+            game_a.undo_move(undo_a)
+            game_b.undo_move(undo_b)
+            path.pop()
+            if divergence is not None:
+                return divergence
+        return None
+
+    return walk(depth)
+
+
+def positions_from_args(args):
+    """Return the corpus positions to run on, as `benchmarks.suite.corpus()`
+    tuples.
+    """
+    if args.moves is None:
+        return [position for width, height in BOARD_SIZES
+                for phase in ("opening", "midgame", "endgame")
+                for position in corpus(width, height, phase, NUM_POSITIONS)]
+
+    width, height = args.size
+    game = ENGINES["list"]("p1", "p2", width=width, height=height, shuffle=False)
+    for move in args.moves:
+        if move not in game.get_legal_moves():
+            raise SystemExit("Illegal move {} in --moves".format(move))
+        game.apply_move(move)
+    return [(width, height, game._board_state, game.move_count)]
+
+
+def run_perft(positions, depth, engines, show_divide=False):
+    """Print the perft count and the nodes per second of each engine on each
+    position (and on the whole set), and return True if every engine counted
+    the same leaves everywhere.
+    """
+    print("{:<10}{:>8}{:>16}{:>16}{:>14}".format("Engine", "Pos", "nodes", "nodes/s", "match"))
+    totals = {engine: [0, 0.] for engine in engines}
+    agree = True
+    for idx, position in enumerate(positions):
+        counts = {}
+        for engine in engines:
+            game = load(position, ENGINES[engine])
+            start = timeit.default_timer()
+            counts[engine] = divide(game, depth) if show_divide else perft(game, depth)
+            elapsed = timeit.default_timer() - start
+            nodes = sum(counts[engine].values()) if show_divide else counts[engine]
+            totals[engine][0] += nodes
+            totals[engine][1] += elapsed
+            match = counts[engine] == counts[engines[0]]
+            agree = agree and match
+            print("{:<10}{:>8}{:>16,}{:>16,.0f}{:>14}".format(
+                engine, idx, nodes, nodes / max(elapsed, 1e-9), "yes" if match else "NO"))
+            if show_divide:
+                for move, count in sorted(counts[engine].items()):
+                    print("    {:<10}{:>16,}".format(str(move), count))
+
+    for engine, (nodes, elapsed) in totals.items():
+        print("{:<10}{:>8}{:>16,}{:>16,.0f}".format(engine, "all", nodes, nodes / max(elapsed, 1e-9)))
+    return agree
+
+
+def run_diff(positions, depth, engine_a, engine_b):
+    """Search for the first position where two engines diverge and print
+    it. Return True if the engines agree on every position.
+    """
+    for idx, position in enumerate(positions):
+        game_a, game_b = load(position, ENGINES[engine_a]), load(position, ENGINES[engine_b])
+        divergence = find_divergence(game_a, game_b, depth)
+        if divergence is None:
+            continue
+
+        path, fields = divergence
+        print("Position {}: {} and {} diverge after moves {}".format(
+            idx, engine_a, engine_b, path or "(root)"))
+        for move in path:
+            game_a.apply_move(move)
+        print(game_a.to_string())
+        for field, (value_a, value_b) in sorted(fields.items()):
+            print("  {}:\n    {:<9} {}\n    {:<9} {}".format(field, engine_a, value_a,
+                                                            engine_b, value_b))
+        return False
+
+    print("{} and {} agree on all {} positions to depth {}".format(
+        engine_a, engine_b, len(positions), depth))
+    return True
+
+
+def _move(text):
+    row, col = text.split(",")
+    return int(row), int(col)
+
+
+def _size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--depth", type=int, default=DEPTH,
+                        help="number of plies to count (or compare) from each position")
+    parser.add_argument("--engine", action="append", dest="engines",
+                        choices=sorted(ENGINES),
+                        help="engine to run; may be repeated (default: all, "
+                             "compared against the first)")
+    parser.add_argument("--moves", nargs="*", type=_move, metavar="ROW,COL",
+                        help="run from the position reached by these moves "
+                             "instead of the benchmark corpus")
+    parser.add_argument("--size", type=_size, default=(7, 7), metavar="WxH",
+                        help="board size of the --moves position")
+    parser.add_argument("--divide", action="store_true",
+                        help="also print the count below each legal move")
+    parser.add_argument("--diff", nargs=2, choices=sorted(ENGINES), metavar="ENGINE",
+                        help="compare two engines node by node and print the "
+                             "first divergent position")
+    args = parser.parse_args()
+
+    positions = positions_from_args(args)
+    if args.diff:
+        agree = run_diff(positions, args.depth, *args.diff)
+    else:
+        agree = run_perft(positions, args.depth, args.engines or list(ENGINES), args.divide)
+    if not agree:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
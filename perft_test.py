@@ -0,0 +1,58 @@
+import unittest
+
+import isolation
+
+from benchmarks.movegen import legacy_get_moves
+from perft import perft, divide, find_divergence
+
+
+class BrokenBitBoard(isolation.BitBoard):
+    """A BitBoard that loses a legal move of the active player four plies
+    into the game."""
+
+    def get_legal_moves(self, player=None):
+        moves = super().get_legal_moves(player)
+        if self.move_count == 4 and player in (None, self.active_player):
+            moves = sorted(moves)[1:]
+        return moves
+
+
+class PerftTest(unittest.TestCase):
+    """Unit tests for perft.py"""
+
+    def setUp(self):
+        self.games = []
+        for board_cls in (isolation.Board, isolation.BitBoard, BrokenBitBoard):
+            game = board_cls("Player1", "Player2", shuffle=False)
+            game.apply_move((3, 3))
+            game.apply_move((2, 5))
+            self.games.append(game)
+
+    def test_perft_matches_legacy_move_generator(self):
+        def count(game, depth):
+            if depth == 0:
+                return 1
+            loc = game.get_player_location(game.active_player)
+            return sum(count(game.forecast_move(move), depth - 1)
+                       for move in legacy_get_moves(game, loc))
+
+        expected = count(self.games[0], 4)
+        for game in self.games[:2]:
+            state = game._board_state
+            self.assertEqual(perft(game, 4), expected)
+            self.assertEqual(sum(divide(game, 4).values()), expected)
+            self.assertEqual(game._board_state, state)
+
+    def test_find_divergence_pinpoints_first_divergent_position(self):
+        board, bitboard, broken = self.games
+        self.assertIsNone(find_divergence(board, bitboard, 3))
+
+        path, fields = find_divergence(board, broken, 3)
+        self.assertEqual(len(path), 2)
+        self.assertEqual(list(fields), ["active_moves"])
+        expected, actual = fields["active_moves"]
+        self.assertEqual(expected[1:], actual)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,6 +11,7 @@ players, and the players play each match twice -- once as the first player and
 once as the second player.  Randomizing the openings and switching the player
 order corrects for imbalances due to both starting position and initiative.
 """
+import argparse
 import itertools
 import random
 import warnings
@@ -37,37 +38,43 @@ game_agent.py.
 Agent = namedtuple("Agent", ["player", "name"])
 
 
-def play_round(cpu_agent, test_agents, win_counts, num_matches):
+def play_round(cpu_agent, test_agents, win_counts, num_matches, rng=random):
     """Compare the test agents to the cpu agent in "fair" matches.
 
     "Fair" matches use random starting locations and force the agents to
     play as both first and second player to control for advantages resulting
     from choosing better opening moves or having first initiative to move.
+
+    The openings and a seed for each game are drawn from `rng` before any
+    game is played. Each game seeds the `random` module and the board's move
+    order with its seed, so it can be replayed on its own.
     """
     timeout_count = 0
     forfeit_count = 0
     for _ in range(num_matches):
 
-        games = sum([[Board(cpu_agent.player, agent.player),
-                      Board(agent.player, cpu_agent.player)]
-                    for agent in test_agents], [])
+        pairings = sum([[(cpu_agent.player, agent.player), (agent.player, cpu_agent.player)]
+                        for agent in test_agents], [])
+        seeds = [rng.getrandbits(32) for _ in pairings]
+        games = [Board(p1, p2, seed=seed) for (p1, p2), seed in zip(pairings, seeds)]
 
         # initialize all games with a random move and response
         for _ in range(2):
-            move = random.choice(games[0].get_legal_moves())
+            move = rng.choice(games[0].get_legal_moves())
             for game in games:
                 game.apply_move(move)
 
         # play all games and tally the results
-        for game in games:
+        for game, seed in zip(games, seeds):
+            random.seed(seed)
             winner, _, termination = game.play(time_limit=TIME_LIMIT)
             win_counts[winner] += 1
 
             if termination == "timeout":
-                print("TIMEOUT: {}".format(game))
+                print("TIMEOUT: {} (seed {})".format(game, seed))
                 timeout_count += 1
             elif termination == "forfeit":
-                print("FORFEIT: {}".format(game))
+                print("FORFEIT: {} (seed {})".format(game, seed))
                 forfeit_count += 1
 
     return timeout_count, forfeit_count
@@ -79,8 +86,11 @@ def update(total_wins, wins):
     return total_wins
 
 
-def play_matches(cpu_agents, test_agents, num_matches):
-    """Play matches between the test agent and each cpu_agent individually. """
+def play_matches(cpu_agents, test_agents, num_matches, seed=None):
+    """Play matches between the test agent and each cpu_agent individually.
+    A `seed` makes the openings and the games of the tournament reproducible.
+    """
+    rng = random.Random(seed)
     total_wins = {agent.player: 0 for agent in test_agents}
     total_timeouts = 0.
     total_forfeits = 0.
@@ -95,7 +105,7 @@ def play_matches(cpu_agents, test_agents, num_matches):
 
         print("{!s:^9}{:^13}".format(idx + 1, agent.name), end="", flush=True)
 
-        counts = play_round(agent, test_agents, wins, num_matches)
+        counts = play_round(agent, test_agents, wins, num_matches, rng)
         total_timeouts += counts[0]
         total_forfeits += counts[1]
         total_wins = update(total_wins, wins)
@@ -127,6 +137,10 @@ def play_matches(cpu_agents, test_agents, num_matches):
 
 
 def main():
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
+    parser.add_argument("--seed", type=int,
+                        help="seed the openings and the games to reproduce a tournament")
+    args = parser.parse_args()
 
     # Define two agents to compare -- these agents will play from the same
     # starting position against the same adversaries in the tournament
@@ -152,7 +166,7 @@ def main():
     print("{:^74}".format("*************************"))
     print("{:^74}".format("Playing Matches"))
     print("{:^74}".format("*************************"))
-    play_matches(cpu_agents, test_agents, NUM_MATCHES)
+    play_matches(cpu_agents, test_agents, NUM_MATCHES, args.seed)
 
 
 if __name__ == "__main__":
@@ -11,7 +11,11 @@ players, and the players play each match twice -- once as the first player and
 once as the second player.  Randomizing the openings and switching the player
 order corrects for imbalances due to both starting position and initiative.
 """
+import argparse
 import itertools
+import json
+import math
+import os
 import random
 import warnings
 
@@ -19,16 +23,28 @@ from collections import namedtuple
 # from multiprocessing.pool import ThreadPool as Pool
 from multiprocessing import Pool
 
-from isolation import Board
-from sample_players import (RandomPlayer, open_move_score,
+from isolation import Board, ENGINES
+from sample_players import (RandomPlayer, GreedyPlayer, open_move_score,
                             improved_score, center_score)
+from competition_agent import CustomPlayer
 from game_agent import (MinimaxPlayer, AlphaBetaPlayer, custom_score,
                         custom_score_2, custom_score_3,
                         custom_score_general, custom_score_general2)
 
-NUM_PROCS = 4
+NUM_PROCS = 4  # number of worker processes used to play the games
+CHUNKS_PER_PROC = 4  # split each round into this many job chunks per process
+
+# sequential probability ratio test (SPRT) defaults: test H0 "the test agent
+# is SPRT_ELO0 Elo stronger than the cpu agent" against H1 "it is SPRT_ELO1
+# Elo stronger" with false positive and false negative rates SPRT_ALPHA and
+# SPRT_BETA
+SPRT_ELO0 = 0.
+SPRT_ELO1 = 50.
+SPRT_ALPHA = 0.05
+SPRT_BETA = 0.05
 NUM_MATCHES = 100  # number of matches against each opponent
 TIME_LIMIT = 150  # number of milliseconds before timeout
+ENGINE = "list"  # name of the board implementation (see `isolation.ENGINES`)
 
 DESCRIPTION = """
 This script evaluates the performance of the custom_score evaluation
@@ -39,13 +55,46 @@ game_agent.py.
 """
 
 Agent = namedtuple("Agent", ["player", "name"])
+Workers = namedtuple("Workers", ["pool", "agent_ids", "processes"])
+SPRTResult = namedtuple("SPRTResult", ["decision", "counts", "elo", "margin", "llr"])
+RoundProgress = namedtuple("RoundProgress", ["done", "openings", "wins", "timeouts", "forfeits"])
+
+# agents registered with this worker process, indexed by agent ID
+_agents = {}
+
+
+def _init_worker(agents):
+    """Pool initializer registering the agents with a worker process, so
+    each job only needs to carry the agent IDs instead of pickled players.
+    """
+    global _agents
+    _agents = agents
+
 
 def _run(*args):
-    idx, p1, p2, moves = args[0]
-    game = Board(p1, p2)
+    idx, p1_id, p2_id, moves, engine, seed = args[0]
+    p1, p2 = _agents[p1_id], _agents[p2_id]
+    for player in (p1, p2):
+        # players are reused between games, so only keep this game's depths
+        if hasattr(player, "timeout_depths"):
+            player.timeout_depths = []
+    # seed the players' random choices and the board's move order, so the
+    # game can be replayed from its record (exactly so for agents that don't
+    # depend on the clock, e.g. fixed-depth search)
+    random.seed(seed)
+    game = ENGINES[engine](p1, p2, seed=seed)
     for m in moves:
         game.apply_move(m)
     winner, _, termination = game.play(time_limit=TIME_LIMIT)
+    for player in (p1, p2):
+        # a game's entries are no use to the next game, so release the table
+        # instead of holding one for every agent this worker has run
+        if getattr(player, "tt", None) is not None:
+            player.tt.clear()
+    # the players alternate turns, starting with the player to move after
+    # the opening
+    first, second = sum(game.move_times[::2]), sum(game.move_times[1::2])
+    times = (first, second) if len(moves) % 2 == 0 else (second, first)
 
     try:
         p1_avg_timeout_depth = game._player_1.average_timeout_depth()
@@ -58,62 +107,500 @@ def _run(*args):
         p2_avg_timeout_depth = -1
 
 
-    return (idx, winner == p1), termination, p1_avg_timeout_depth, p2_avg_timeout_depth
+    return (idx, winner == p1), termination, p1_avg_timeout_depth, p2_avg_timeout_depth, times
+
+
+def _replay(*args):
+    """Play one game between a RandomPlayer and a GreedyPlayer on the named
+    engine with the `random` module seeded, and return everything needed to
+    compare the outcome against another engine.
+    """
+    seed, engine = args[0]
+    random.seed(seed)
+    p1, p2 = RandomPlayer(), GreedyPlayer(score_fn=improved_score)
+    game = ENGINES[engine](p1, p2)
+    winner, history, termination = game.play(time_limit=float("inf"))
+    return seed, winner == p1, history, termination, game.to_string()
+
+
+def compare_engines(engines, num_games, seed=0):
+    """Play the same seeded games on each engine side by side and report any
+    game where the winner, move history, termination or final board differ
+    from the first engine in the list.
+
+    Returns
+    -------
+    list<int>
+        The seeds of the games with divergent outcomes (empty if the engines
+        are equivalent on every game played).
+    """
+    pool = Pool(NUM_PROCS)
+    reference, others = engines[0], engines[1:]
+    seeds = range(seed, seed + num_games)
+    try:
+        expected = {r[0]: r[1:] for r in pool.imap_unordered(_replay, [(s, reference) for s in seeds])}
+
+        mismatches = set()
+        for engine in others:
+            for result in pool.imap_unordered(_replay, [(s, engine) for s in seeds]):
+                if result[1:] != expected[result[0]]:
+                    print("MISMATCH: seed {} ({} vs {})".format(result[0], reference, engine))
+                    mismatches.add(result[0])
+    finally:
+        pool.close()
+        pool.join()
+
+    print("{} games compared across engines {}: {} mismatches".format(
+        num_games, ', '.join(engines), len(mismatches)))
+    return sorted(mismatches)
+
+
+class ResultsLog:
+    """An append-only log of finished games, stored as one JSON object per
+    line so that an interrupted run loses at most the game being written.
+
+    Each record holds the names of the `cpu` and `test` agents, the `match`
+    number within their round, which of them moved `first`, the `opening`
+    moves, the game's random `seed`, the `winner` ("cpu" or "test"), the `termination` reason, and for
+    each of the players "p1" and "p2" the total thinking time in milliseconds
+    (`p1_time`, `p2_time`) and average timeout depth (`p1_timeout_depth`,
+    `p2_timeout_depth`).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __iter__(self):
+        """Stream the records in the log, one line at a time. """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    pass  # a record cut short by an interrupted run
+
+    def append(self, record):
+        """Write a record to the log and flush it to disk. """
+        if self._file is None:
+            cut_short = False
+            if os.path.exists(self.path) and os.path.getsize(self.path):
+                with open(self.path, "rb") as f:
+                    f.seek(-1, os.SEEK_END)
+                    cut_short = f.read(1) != b"\n"
+            self._file = open(self.path, "a")
+            if cut_short:
+                # end the partial record so it doesn't swallow the next one
+                self._file.write("\n")
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def round_progress(self, cpu_name, test_names, num_matches):
+        """Stream the log and summarize the recorded games of a round of
+        `num_matches` matches between the named cpu and test agents, keeping
+        only what is needed to resume it.
+
+        Returns
+        -------
+        RoundProgress
+            The (test agent name, match number, first player) of every
+            recorded game (`done`), the opening of every recorded match
+            (`openings`), the [test agent wins, cpu agent wins] of each test
+            agent (`wins`), and the number of recorded games lost by timeout
+            (`timeouts`) and forfeited by a test agent (`forfeits`).
+        """
+        progress = RoundProgress(set(), {}, {name: [0, 0] for name in test_names}, 0, 0)
+        timeouts = forfeits = 0
+        for r in self:
+            key = (r["test"], r["match"], r["first"])
+            if (r["cpu"] != cpu_name or r["test"] not in progress.wins
+                    or r["match"] >= num_matches or key in progress.done):
+                continue
+            progress.done.add(key)
+            progress.openings.setdefault(r["match"], [tuple(m) for m in r["opening"]])
+            progress.wins[r["test"]][r["winner"] != "test"] += 1
+            if r["termination"] == "timeout":
+                timeouts += 1
+            elif r["winner"] == "cpu" and r["termination"] == "forfeit":
+                forfeits += 1
+        return progress._replace(timeouts=timeouts, forfeits=forfeits)
+
+
+def summarize_results(path):
+    """Stream the results log at `path` and count the games won and lost by
+    each test agent against each cpu agent.
+
+    Returns
+    -------
+    dict
+        Maps (cpu name, test name) to [games won, games lost] by the test
+        agent.
+    """
+    totals = {}
+    for record in ResultsLog(path):
+        counts = totals.setdefault((record["cpu"], record["test"]), [0, 0])
+        counts[record["winner"] != "test"] += 1
+    return totals
+
+
+def print_summary(path):
+    """Print the win rate of each test agent recorded in a results log. """
+    totals = {}
+    for (cpu, test), (won, lost) in sorted(summarize_results(path).items()):
+        print("{:<15} vs {:<15} {:>6} | {:<6}".format(test, cpu, won, lost))
+        total = totals.setdefault(test, [0, 0])
+        total[0] += won
+        total[1] += lost
+
+    print("-" * 74)
+    print('{:^9}{:^13}'.format("", "Win Rates:"))
+    rates = [(test, 100 * won / (won + lost)) for test, (won, lost) in totals.items()]
+    for name, rate in sorted(rates, reverse=True, key=lambda x: x[1]):
+        print("{} - {:.1f}% ({} games)".format(name, rate, sum(totals[name])))
+
+
+def start_pool(agents, processes=NUM_PROCS):
+    """Start the worker pool used for the whole tournament, registering
+    every agent with each worker once.
+
+    Returns
+    -------
+    Workers
+        The pool, a dict mapping each agent's player to the ID used to refer
+        to it in the jobs sent to the pool, and the number of processes.
+    """
+    players = [agent.player for agent in agents]
+    pool = Pool(processes, _init_worker, (dict(enumerate(players)),))
+    return Workers(pool, {player: i for i, player in enumerate(players)}, processes)
+
+
+def stop_pool(workers):
+    """Shut down a pool started by `start_pool` once its jobs are done. """
+    workers.pool.close()
+    workers.pool.join()
+
+
+def play_games(workers, games, engine):
+    """Play the games on the `workers` pool in chunks sized to keep every
+    process busy, and yield the results as the games finish.
+
+    Each game is a tuple (index, player 1, player 2, opening moves, test
+    name, match, first, seed) as built by `new_game`; the results are tuples (game, True if player 1 won, termination,
+    player 1 timeout depth, player 2 timeout depth, player times).
+    """
+    ids = workers.agent_ids
+    jobs = [(idx, ids[game[1]], ids[game[2]], game[3], engine, game[7])
+            for idx, game in enumerate(games)]
+    chunksize = max(1, len(jobs) // (workers.processes * CHUNKS_PER_PROC))
+    for result, termination, p1_avg_timeout_depth, p2_avg_timeout_depth, times in \
+            workers.pool.imap_unordered(_run, jobs, chunksize):
+        yield (games[result[0]], result[1], termination, p1_avg_timeout_depth,
+               p2_avg_timeout_depth, times)
+
+
+def new_game(games, players, opening, test_name, match, first, seed=None):
+    """Append a game to the list of `games` to be played by `play_games`,
+    drawing a random seed for it from the `random` module unless one is
+    given.
+    """
+    if seed is None:
+        seed = random.getrandbits(32)
+    games.append((len(games), players[0], players[1], opening, test_name, match, first, seed))
+
+
+def game_record(cpu_agent, game, winner, termination, engine, times, timeout_depths):
+    """Return the `ResultsLog` record of a finished game, where `game` is a
+    tuple (index, player 1, player 2, opening, test name, match, first, seed).
+    """
+    test_name, match, first, seed = game[4:]
+    return {
+        "cpu": cpu_agent.name, "test": test_name, "match": match, "first": first,
+        "opening": game[3], "seed": seed, "engine": engine,
+        "winner": "cpu" if winner is cpu_agent.player else "test",
+        "termination": termination,
+        "p1_time": round(times[0], 3), "p2_time": round(times[1], 3),
+        "p1_timeout_depth": timeout_depths[0], "p2_timeout_depth": timeout_depths[1]}
+
+
+def random_opening():
+    """Return a random move and response to initialize the games of a
+    match.
+    """
+    init_moves = []
+    init_game = Board("p1", "p2")
+    for _ in range(2):
+        move = random.choice(init_game.get_legal_moves())
+        init_moves.append(move)
+        init_game.apply_move(move)
+    return init_moves
 
 
-def play_round(cpu_agent, test_agents, win_counts, num_matches, average_timeout_depths):
+def play_round(cpu_agent, test_agents, win_counts, num_matches, average_timeout_depths,
+               engine=ENGINE, workers=None, results=None):
     """Compare the test agents to the cpu agent in "fair" matches.
 
     "Fair" matches use random starting locations and force the agents to
     play as both first and second player to control for advantages resulting
     from choosing better opening moves or having first initiative to move.
+
+    The games are played on the `workers` pool (see `start_pool`); a
+    temporary pool is started (and shut down) if no pool is given.
+
+    Every finished game is appended to the `results` log (see `ResultsLog`)
+    if one is given. Games already recorded in the log are counted instead
+    of played again, and the unplayed games of a partly recorded match
+    reuse its recorded opening, so an interrupted round can be resumed.
     """
-    timeout_count = 0
-    forfeit_count = 0
-    pool = Pool(NUM_PROCS)
+    if workers is None:
+        workers = start_pool([cpu_agent] + list(test_agents))
+        try:
+            return play_round(cpu_agent, test_agents, win_counts, num_matches,
+                              average_timeout_depths, engine, workers, results)
+        finally:
+            stop_pool(workers)
+
+    test_names = [agent.name for agent in test_agents]
+    progress = (results.round_progress(cpu_agent.name, test_names, num_matches)
+                if results is not None else
+                RoundProgress(set(), {}, {name: [0, 0] for name in test_names}, 0, 0))
 
-    for _ in range(num_matches):
+    # count the recorded results instead of playing the games again
+    for agent in test_agents:
+        test_wins, cpu_wins = progress.wins[agent.name]
+        win_counts[agent.player] += test_wins
+        win_counts[cpu_agent.player] += cpu_wins
+    timeout_count = progress.timeouts
+    forfeit_count = progress.forfeits
+
+    games = []
+    for match in range(num_matches):
 
         # initialize all games with a random move and response
-        init_moves = []
-        init_game = Board("p1", "p2")
-        for _ in range(2):
-            move = random.choice(init_game.get_legal_moves())
-            init_moves.append(move)
-            init_game.apply_move(move)
+        init_moves = progress.openings.get(match, random_opening())
 
-        games = sum([[(2 * i, cpu_agent.player, agent.player, init_moves),
-                      (2 * i + 1, agent.player, cpu_agent.player, init_moves)]
-                    for i, agent in enumerate(test_agents)], [])
+        for agent in test_agents:
+            for first in ("cpu", "test"):
+                # draw the seed even for recorded games, so a resumed run
+                # gives the remaining games the same seeds
+                seed = random.getrandbits(32)
+                if (agent.name, match, first) in progress.done:
+                    continue
+                players = ((cpu_agent.player, agent.player) if first == "cpu" else
+                           (agent.player, cpu_agent.player))
+                new_game(games, players, init_moves, agent.name, match, first, seed)
 
-        # play all games and tally the results
-        for result, termination, p1_avg_timeout_depth, p2_avg_timeout_depth in pool.imap_unordered(_run, games):
-            game = games[result[0]]
-            winner = game[1] if result[1] else game[2]
+    # play all games and tally the results
+    for game, p1_won, termination, p1_avg_timeout_depth, p2_avg_timeout_depth, times in \
+            play_games(workers, games, engine):
+        winner = game[1] if p1_won else game[2]
 
-            win_counts[winner] += 1
+        win_counts[winner] += 1
 
-            if termination == "timeout":
-                print("TIMEOUT: {}".format(game))
-                timeout_count += 1
-            elif winner not in test_agents and termination == "forfeit":
-                print("FORFEIT: {}".format(game))
-                forfeit_count += 1
+        if results is not None:
+            results.append(game_record(cpu_agent, game, winner, termination, engine, times,
+                                        (p1_avg_timeout_depth, p2_avg_timeout_depth)))
 
-            average_timeout_depths[game[1]] = p1_avg_timeout_depth
-            average_timeout_depths[game[2]] = p2_avg_timeout_depth
+        if termination == "timeout":
+            print("TIMEOUT: {}".format(game[:4]))
+            timeout_count += 1
+        elif winner is cpu_agent.player and termination == "forfeit":
+            print("FORFEIT: {}".format(game[:4]))
+            forfeit_count += 1
+
+        average_timeout_depths[game[1]] = p1_avg_timeout_depth
+        average_timeout_depths[game[2]] = p2_avg_timeout_depth
 
     return timeout_count, forfeit_count
 
 
+def elo_to_score(elo):
+    """Return the expected score of a player `elo` points stronger than its
+    opponent.
+    """
+    return 1. / (1. + 10. ** (-elo / 400.))
+
+
+def score_to_elo(score):
+    """Return the Elo difference corresponding to an expected score. """
+    score = min(max(score, 1e-9), 1. - 1e-9)
+    return -400. * math.log10(1. / score - 1.)
+
+
+def pair_statistics(counts):
+    """Return the number, mean and variance of the paired game scores, where
+    `counts` holds the number of pairs (one game as each player, from the
+    same opening) with 0, 1 and 2 games won by the test agent, scoring 0,
+    0.5 and 1 respectively.
+
+    Half a pair is added to each outcome, so that the variance is never zero
+    (e.g., when one agent won every game) and the estimates stay finite.
+    """
+    counts = [c + 0.5 for c in counts]
+    n = sum(counts)
+    mean = (0.5 * counts[1] + counts[2]) / n
+    var = sum(c * (x - mean) ** 2 for c, x in zip(counts, (0., 0.5, 1.))) / n
+    return n, mean, var
+
+
+def sprt_llr(counts, elo0=SPRT_ELO0, elo1=SPRT_ELO1):
+    """Return the log-likelihood ratio of H1 (Elo difference `elo1`) to H0
+    (Elo difference `elo0`) for the paired game `counts` (see
+    `pair_statistics`), using the normal approximation of the generalized
+    SPRT.
+    """
+    n, mean, var = pair_statistics(counts)
+    s0, s1 = elo_to_score(elo0), elo_to_score(elo1)
+    return n * (s1 - s0) * (2 * mean - s0 - s1) / (2 * var)
+
+
+def elo_estimate(counts, z=1.96):
+    """Return the Elo difference estimated from the paired game `counts`
+    (see `pair_statistics`) and the half-width of its confidence interval
+    (95% by default).
+    """
+    n, mean, var = pair_statistics(counts)
+    se = math.sqrt(var / n)
+    # propagate the standard error of the score through the Elo curve
+    margin = z * se * 400. / (math.log(10) * mean * (1. - mean))
+    return score_to_elo(mean), margin
+
+
+def play_sprt(cpu_agent, test_agent, workers, engine=ENGINE, elo0=SPRT_ELO0, elo1=SPRT_ELO1,
+              alpha=SPRT_ALPHA, beta=SPRT_BETA, max_pairs=NUM_MATCHES, results=None):
+    """Play paired games between the test agent and the cpu agent in batches
+    until a sequential probability ratio test decides between H0 (the test
+    agent is `elo0` Elo stronger) and H1 (it is `elo1` Elo stronger), or
+    `max_pairs` pairs have been played.
+
+    Each pair plays one game as each player from the same random opening.
+    Every finished game is appended to the `results` log if one is given.
+
+    Returns
+    -------
+    SPRTResult
+        The accepted hypothesis ("H0", "H1", or None if the test was
+        inconclusive), the number of pairs with 0, 1 and 2 wins by the test
+        agent, the estimated Elo difference and its 95% error margin, and
+        the final log-likelihood ratio.
+    """
+    lower, upper = math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+    counts = [0, 0, 0]
+    decision, llr, match = None, 0., 0
+
+    while decision is None and match < max_pairs:
+        games = []
+        for _ in range(min(workers.processes, max_pairs - match)):
+            opening = random_opening()
+            new_game(games, (cpu_agent.player, test_agent.player), opening,
+                     test_agent.name, match, "cpu")
+            new_game(games, (test_agent.player, cpu_agent.player), opening,
+                     test_agent.name, match, "test")
+            match += 1
+
+        pair_wins = {}
+        for game, p1_won, termination, p1_depth, p2_depth, times in \
+                play_games(workers, games, engine):
+            winner = game[1] if p1_won else game[2]
+            pair_wins[game[5]] = pair_wins.get(game[5], 0) + (winner is test_agent.player)
+            if termination == "timeout":
+                print("TIMEOUT: {}".format(game[:4]))
+            if results is not None:
+                results.append(game_record(cpu_agent, game, winner, termination, engine,
+                                            times, (p1_depth, p2_depth)))
+
+        for wins in pair_wins.values():
+            counts[wins] += 1
+        llr = sprt_llr(counts, elo0, elo1)
+        if llr >= upper:
+            decision = "H1"
+        elif llr <= lower:
+            decision = "H0"
+
+    elo, margin = elo_estimate(counts)
+    return SPRTResult(decision, counts, elo, margin, llr)
+
+
+def play_sprt_matches(cpu_agents, test_agents, engine=ENGINE, processes=NUM_PROCS,
+                      elo0=SPRT_ELO0, elo1=SPRT_ELO1, max_pairs=NUM_MATCHES,
+                      results_path=None, seed=None):
+    """Run `play_sprt` between each test agent and each cpu agent on a single
+    pool of `processes` workers and print the results.
+
+    If a `seed` is given, the `random` module is seeded with it first, so
+    the openings and game seeds are the same on every run.
+    """
+    if seed is not None:
+        random.seed(seed)
+    if results_path is not None and os.path.exists(results_path):
+        raise FileExistsError("results log {} already exists; choose another "
+                              "path".format(results_path))
+    results = ResultsLog(results_path) if results_path is not None else None
+
+    print("\nH0: Elo {:+.0f}, H1: Elo {:+.0f} (alpha {}, beta {}), at most {} pairs".format(
+        elo0, elo1, SPRT_ALPHA, SPRT_BETA, max_pairs))
+    print("{:<15}{:<15}{:>7}{:>14}{:>18}{:>8}{:>10}".format(
+        "Agent", "Opponent", "Pairs", "2-1-0 wins", "Elo", "LLR", "Result"))
+
+    workers = start_pool(list(cpu_agents) + list(test_agents), processes)
+    try:
+        for test_agent in test_agents:
+            for cpu_agent in cpu_agents:
+                result = play_sprt(cpu_agent, test_agent, workers, engine, elo0, elo1,
+                                   max_pairs=max_pairs, results=results)
+                print("{:<15}{:<15}{:>7}{:>14}{:>18}{:>8.2f}{:>10}".format(
+                    test_agent.name, cpu_agent.name, sum(result.counts),
+                    "{}-{}-{}".format(*reversed(result.counts)),
+                    "{:+.0f} +/- {:.0f}".format(result.elo, result.margin),
+                    result.llr, result.decision or "-"), flush=True)
+    finally:
+        stop_pool(workers)
+        if results is not None:
+            results.close()
+
+
 def update(total_wins, wins):
     for player in total_wins:
         total_wins[player] += wins[player]
     return total_wins
 
 
-def play_matches(cpu_agents, test_agents, num_matches):
-    """Play matches between the test agent and each cpu_agent individually. """
+def play_matches(cpu_agents, test_agents, num_matches, engine=ENGINE, processes=NUM_PROCS,
+                 results_path=None, resume=False, seed=None):
+    """Play matches between the test agent and each cpu_agent individually.
+    All of the games are played on a single pool of `processes` workers.
+
+    If `results_path` is given, every finished game is appended to that
+    results log (see `ResultsLog`). An existing log is only accepted when
+    `resume` is True, in which case the games it records are not played
+    again but still count towards the results.
+
+    If a `seed` is given, the `random` module is seeded with it first, so
+    the openings and game seeds are the same on every run.
+    """
+    if seed is not None:
+        random.seed(seed)
+    if results_path is not None and os.path.exists(results_path) and not resume:
+        raise FileExistsError("results log {} already exists; resume it or choose "
+                              "another path".format(results_path))
+    results = ResultsLog(results_path) if results_path is not None else None
+
+    workers = start_pool(list(cpu_agents) + list(test_agents), processes)
+    try:
+        _play_matches(cpu_agents, test_agents, num_matches, engine, workers, results)
+    finally:
+        stop_pool(workers)
+        if results is not None:
+            results.close()
+
+
+def _play_matches(cpu_agents, test_agents, num_matches, engine, workers, results):
     total_wins = {agent.player: 0 for agent in test_agents}
     average_timeout_depths = {agent.player: -1 for agent in test_agents}
     total_timeouts = 0.
@@ -141,7 +628,8 @@ def play_matches(cpu_agents, test_agents, num_matches):
 
         print("{!s:^9}{:^13}".format(idx + 1, agent.name), end="", flush=True)
 
-        counts = play_round(agent, test_agents, wins, num_matches, average_timeout_depths)
+        counts = play_round(agent, test_agents, wins, num_matches, average_timeout_depths,
+                            engine, workers, results)
         # print(average_timeout_depths)
         total_timeouts += counts[0]
         total_forfeits += counts[1]
@@ -200,6 +688,8 @@ def play_matches(cpu_agents, test_agents, num_matches):
 """
 Create some grid search agents
 """
+# NOTE: tuning.py searches these weights by successive halving, building the
+# score functions with game_agent.WeightedScore instead of exec
 # wed. night trials
 # gs_constants = [[-1, 0, 1], [-1, 0, 1], [-1, 0, 1], [-1, 0, 1], [-1, 0, 1]]
 # specific_gs_constants = [[1, -1, 1, 0, 0],
@@ -443,6 +933,51 @@ Create some grid search agents
 #     exec("""gs2_funcs[label] = gs2_score_func_{}""".format(i))
 
 def main():
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
+    parser.add_argument("--engine", choices=sorted(ENGINES), default=ENGINE,
+                        help="board implementation used to play the games")
+    parser.add_argument("--processes", type=int, default=NUM_PROCS,
+                        help="number of worker processes used to play the games")
+    parser.add_argument("--results", metavar="PATH",
+                        help="append every finished game to this results log")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue the run recorded in the --results log, "
+                             "skipping the games it already contains")
+    parser.add_argument("--summary", metavar="PATH",
+                        help="print the win rates recorded in a results log "
+                             "instead of playing a tournament")
+    parser.add_argument("--sprt", action="store_true",
+                        help="play paired games until a sequential probability "
+                             "ratio test decides each pairing")
+    parser.add_argument("--elo0", type=float, default=SPRT_ELO0,
+                        help="Elo difference of the SPRT null hypothesis")
+    parser.add_argument("--elo1", type=float, default=SPRT_ELO1,
+                        help="Elo difference of the SPRT alternative hypothesis")
+    parser.add_argument("--max-pairs", type=int, default=NUM_MATCHES,
+                        help="maximum number of game pairs per SPRT pairing")
+    parser.add_argument("--mcts", action="store_true",
+                        help="add the Monte Carlo tree search agent of "
+                             "competition_agent.py to the test agents")
+    parser.add_argument("--seed", type=int,
+                        help="seed the openings and the random choices of every "
+                             "game, so the tournament can be replayed")
+    parser.add_argument("--compare-engines", type=int, default=0, metavar="N",
+                        help="play N seeded games on every engine and report "
+                             "any divergent outcomes instead of a tournament")
+    args = parser.parse_args()
+
+    if args.summary:
+        print_summary(args.summary)
+        return
+
+    if args.resume and not args.results:
+        parser.error("--resume requires --results")
+    if args.resume and args.sprt:
+        parser.error("--resume is not supported with --sprt")
+
+    if args.compare_engines:
+        compare_engines(list(ENGINES), args.compare_engines)
+        return
 
     # Define two agents to compare -- these agents will play from the same
     # starting position against the same adversaries in the tournament
@@ -452,6 +987,8 @@ def main():
         Agent(AlphaBetaPlayer(score_fn=custom_score_2), "AB_Custom_2"),
         Agent(AlphaBetaPlayer(score_fn=custom_score_3), "AB_Custom_3")
     ]
+    if args.mcts:
+        test_agents.append(Agent(CustomPlayer(timeout=10.), "MCTS"))
 
     """
     Uncomment to add grid search function agents to test_agents
@@ -479,7 +1016,13 @@ def main():
     print("{:^74}".format("*************************"))
     print("{:^74}".format("Playing Matches"))
     print("{:^74}".format("*************************"))
-    play_matches(cpu_agents, test_agents, NUM_MATCHES)
+    if args.sprt:
+        play_sprt_matches(cpu_agents, test_agents, args.engine, args.processes,
+                          args.elo0, args.elo1, args.max_pairs, args.results, args.seed)
+        return
+
+    play_matches(cpu_agents, test_agents, NUM_MATCHES, args.engine, args.processes,
+                 args.results, args.resume, args.seed)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,153 @@
+import json
+import os
+import pickle
+import random
+import tempfile
+import unittest
+
+import isolation
+import game_agent
+import tournament_mp
+import tuning
+
+from sample_players import RandomPlayer
+
+
+class ForfeitPlayer(RandomPlayer):
+    """Player that forfeits by returning an illegal move. """
+
+    def get_move(self, game, time_left):
+        return (-1, -1)
+
+
+def play_round(cpu, tests, num_matches, workers=None, results=None):
+    """Play a round with the `random` module seeded and return the win
+    counts, indexed by agent name, and the (timeout, forfeit) counts.
+    """
+    random.seed(0)
+    wins = {agent.player: 0 for agent in [cpu] + tests}
+    counts = tournament_mp.play_round(cpu, tests, wins, num_matches, {},
+                                      workers=workers, results=results)
+    return {agent.name: wins[agent.player] for agent in [cpu] + tests}, counts
+
+
+class TournamentStatisticsTest(unittest.TestCase):
+    """Unit tests for the match statistics and results log of tournament_mp"""
+
+    def test_elo_score_round_trip(self):
+        self.assertEqual(tournament_mp.elo_to_score(0.), 0.5)
+        for elo in (-300., -50., 25., 400.):
+            self.assertAlmostEqual(tournament_mp.score_to_elo(tournament_mp.elo_to_score(elo)), elo)
+
+    def test_sprt_llr_favors_the_stronger_hypothesis(self):
+        self.assertGreater(tournament_mp.sprt_llr([0, 2, 18]), 0)
+        self.assertLess(tournament_mp.sprt_llr([10, 20, 10]), 0)
+        # one-sided results are decided faster than mixed ones
+        self.assertGreater(tournament_mp.sprt_llr([0, 0, 20]), tournament_mp.sprt_llr([2, 4, 14]))
+
+        elo, margin = tournament_mp.elo_estimate([0, 0, 20])
+        self.assertGreater(elo, 0)
+        self.assertLess(margin, float("inf"))
+
+    def test_results_log_skips_interrupted_record(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.jsonl")
+            record = {"cpu": "Random", "test": "AB", "match": 0, "first": "cpu", "winner": "test"}
+            log = tournament_mp.ResultsLog(path)
+            log.append(record)
+            log.close()
+            with open(path, "a") as f:
+                f.write('{"cpu": "Random", "te')
+
+            log = tournament_mp.ResultsLog(path)
+            log.append(dict(record, first="test", winner="cpu"))
+            log.close()
+            self.assertEqual(len(list(log)), 2)
+            self.assertEqual(tournament_mp.summarize_results(path), {("Random", "AB"): [1, 1]})
+
+
+class TournamentPoolTest(unittest.TestCase):
+    """Unit tests for playing rounds on the tournament's worker pool"""
+
+    def setUp(self):
+        self.cpu = tournament_mp.Agent(RandomPlayer(), "Random")
+        self.tests = [tournament_mp.Agent(RandomPlayer(), "Random_2"),
+                      tournament_mp.Agent(ForfeitPlayer(), "Forfeit")]
+
+    def test_pool_is_reused_between_rounds(self):
+        workers = tournament_mp.start_pool([self.cpu] + self.tests, processes=1)
+        try:
+            first = play_round(self.cpu, self.tests, 2, workers)
+            second = play_round(self.cpu, self.tests, 2, workers)
+        finally:
+            tournament_mp.stop_pool(workers)
+        # the same seeds give the same games on a persistent pool
+        self.assertEqual(first, second)
+        self.assertEqual(first, play_round(self.cpu, self.tests, 2))
+
+        wins, (timeouts, _) = first
+        self.assertEqual(sum(wins.values()), 2 * 2 * len(self.tests))
+        self.assertEqual(wins["Forfeit"], 0)
+        self.assertEqual(timeouts, 0)
+
+    def test_only_test_agent_forfeits_are_counted(self):
+        _, (_, forfeits) = play_round(self.cpu, self.tests, 2)
+        self.assertEqual(forfeits, 2 * 2)
+        _, (_, forfeits) = play_round(self.tests[1], self.tests[:1], 2)
+        self.assertEqual(forfeits, 0)
+
+    def test_round_is_logged_and_resumed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.jsonl")
+            log = tournament_mp.ResultsLog(path)
+            expected = play_round(self.cpu, self.tests, 3, results=log)
+            log.close()
+            records = list(log)
+            self.assertEqual(len(records), 3 * 2 * len(self.tests))
+            self.assertEqual({(r["test"], r["match"], r["first"]) for r in records},
+                             {(agent.name, match, first) for agent in self.tests
+                              for match in range(3) for first in ("cpu", "test")})
+
+            # a finished round is counted from the log without playing
+            log = tournament_mp.ResultsLog(path)
+            self.assertEqual(play_round(self.cpu, self.tests, 3, results=log), expected)
+            log.close()
+            self.assertEqual(len(list(log)), len(records))
+
+            # an interrupted round only plays its missing games, with the
+            # openings and seeds of the full round
+            with open(path, "w") as f:
+                f.writelines(line + "\n" for line in map(json.dumps, records[:5]))
+            log = tournament_mp.ResultsLog(path)
+            self.assertEqual(play_round(self.cpu, self.tests, 3, results=log), expected)
+            log.close()
+            # the replayed games only differ in their thinking times
+            games = lambda log: sorted(
+                (r["test"], r["match"], r["first"], r["opening"], r["seed"], r["winner"])
+                for r in log)
+            self.assertEqual(games(log), games(records))
+
+
+class TuningTest(unittest.TestCase):
+    """Unit tests for the successive halving weight search"""
+
+    def test_candidates_cover_space_and_pickle(self):
+        space = [[2], [-2, -1], [2], [0.5], [-1], [1, 2], [-1]]
+        candidates = tuning.make_candidates(game_agent.custom_score_general2, space)
+        self.assertEqual(len(candidates), 4)
+        self.assertEqual(len({c.agent.name for c in candidates}), 4)
+
+        game = isolation.Board("p1", "p2")
+        game.apply_move((2, 3))
+        game.apply_move((4, 4))
+        for candidate in candidates:
+            # other tests reload game_agent, so pickle with the current module
+            weights = candidate.score.weights
+            score = pickle.loads(pickle.dumps(
+                game_agent.WeightedScore(game_agent.custom_score_general2, weights)))
+            self.assertEqual(score(game, "p1"),
+                             game_agent.custom_score_general2(game, "p1", weights))
+
+
+if __name__ == '__main__':
+    unittest.main()
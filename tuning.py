@@ -0,0 +1,217 @@
+"""Tune the weights of the general heuristics (`custom_score_general` and
+`custom_score_general2`) by successive halving.
+
+Every weight vector in a parameter space (the product of the candidate
+values of each weight) becomes an alpha-beta agent. Each round plays the
+surviving candidates against the same opponents from the same openings, then
+keeps the best 1 / eta of them by win rate (over all of their games so far)
+and multiplies the number of games of the next round by eta, so most of the
+games are spent on the most promising candidates. The final ranking is
+printed and written to a CSV file.
+
+    python tuning.py --space general --pairs 2 --eta 2 --output tuning.csv
+"""
+import argparse
+import csv
+import itertools
+import math
+import random
+
+from collections import namedtuple
+
+import tournament_mp
+
+from isolation import ENGINES
+from tournament_mp import Agent, ENGINE, NUM_PROCS
+from sample_players import improved_score
+from game_agent import (AlphaBetaPlayer, WeightedScore, custom_score_general,
+                        custom_score_general2)
+
+NUM_PAIRS = 2  # game pairs per candidate and opponent in the first round
+ETA = 2  # keep 1 / ETA of the candidates after each round
+OUTPUT = "tuning_results.csv"
+
+# candidate values of each weight, in the order of the features documented
+# by the scoring function
+SPACES = {
+    "general": (custom_score_general, [
+        [1, 2],  # own_moves
+        [-2, -1],  # opp_moves
+        [1, 2],  # move_ratio
+        [0],  # own_openness
+        [-1, 0],  # opp_openness
+        [0, 1],  # openness_ratio
+        [0, 1],  # own_centerness
+        [-1, 0],  # opp_centerness
+        [-1, 0, 1]]),  # centerness_ratio
+    "general2": (custom_score_general2, [
+        [2],  # own_moves
+        [-2, -1],  # opp_moves
+        [2],  # move_ratio
+        [0.25, 0.5],  # apply centerness based on completeness
+        [-2, -1],  # own_centerness
+        [1, 2],  # opp_centerness
+        [-2, -1]]),  # centerness_ratio
+}
+
+Candidate = namedtuple("Candidate", ["agent", "score"])
+
+
+class CandidateStats:
+    """Games played and won by a candidate, and the number of rounds it
+    played before being eliminated.
+    """
+
+    def __init__(self):
+        self.wins = 0
+        self.games = 0
+        self.rounds = 0
+
+    @property
+    def win_rate(self):
+        return self.wins / self.games if self.games else 0.
+
+
+def make_candidates(score_fn, space):
+    """Return a `Candidate` alpha-beta agent for every weight vector in the
+    product of the candidate values in `space`.
+    """
+    candidates = []
+    for weights in itertools.product(*space):
+        score = WeightedScore(score_fn, weights)
+        candidates.append(Candidate(
+            Agent(AlphaBetaPlayer(score_fn=score), "AB_{}".format(score.label())), score))
+    return candidates
+
+
+def play_candidates(candidates, opponents, pairs, workers, engine=ENGINE, results=None):
+    """Play `pairs` pairs of games (one as each player, from a shared random
+    opening) between every candidate and every opponent, with the same
+    openings for all candidates.
+
+    Returns
+    -------
+    dict
+        Maps each candidate's player to the number of games it won.
+    """
+    openings = [[tournament_mp.random_opening() for _ in range(pairs)] for _ in opponents]
+    games = []
+    for candidate in candidates:
+        test = candidate.agent
+        for cpu, cpu_openings in zip(opponents, openings):
+            for match, opening in enumerate(cpu_openings):
+                tournament_mp.new_game(games, (cpu.player, test.player), opening,
+                                       test.name, match, "cpu")
+                tournament_mp.new_game(games, (test.player, cpu.player), opening,
+                                       test.name, match, "test")
+
+    cpu_agents = {cpu.player: cpu for cpu in opponents}
+    wins = {candidate.agent.player: 0 for candidate in candidates}
+    for game, p1_won, termination, p1_depth, p2_depth, times in \
+            tournament_mp.play_games(workers, games, engine):
+        winner = game[1] if p1_won else game[2]
+        if winner in wins:
+            wins[winner] += 1
+        if results is not None:
+            cpu = cpu_agents[game[1] if game[6] == "cpu" else game[2]]
+            results.append(tournament_mp.game_record(
+                cpu, game, winner, termination, engine, times, (p1_depth, p2_depth)))
+    return wins
+
+
+def successive_halving(candidates, opponents, workers, pairs=NUM_PAIRS, eta=ETA,
+                       engine=ENGINE, results=None):
+    """Race the candidates against the opponents by successive halving (see
+    the module docstring) until a single candidate survives.
+
+    Each round plays `pairs` times eta to the power of the round number
+    pairs per surviving candidate and opponent.
+
+    Returns
+    -------
+    list<(Candidate, CandidateStats)>
+        Every candidate with its statistics, best first: the last survivor,
+        then the others by the number of rounds played and by win rate.
+    """
+    stats = {candidate: CandidateStats() for candidate in candidates}
+    survivors = list(candidates)
+    round_pairs = pairs
+
+    while len(survivors) > 1:
+        wins = play_candidates(survivors, opponents, round_pairs, workers, engine, results)
+        for candidate in survivors:
+            s = stats[candidate]
+            s.wins += wins[candidate.agent.player]
+            s.games += 2 * round_pairs * len(opponents)
+            s.rounds += 1
+
+        survivors.sort(key=lambda c: stats[c].win_rate, reverse=True)
+        print("Round with {} candidates x {} pairs: best {} ({:.1f}%)".format(
+            len(survivors), round_pairs, survivors[0].agent.name,
+            100 * stats[survivors[0]].win_rate), flush=True)
+        survivors = survivors[:math.ceil(len(survivors) / eta)]
+        round_pairs *= eta
+
+    ranking = sorted(stats.items(), key=lambda item: (item[1].rounds, item[1].win_rate),
+                     reverse=True)
+    # the last survivor wins ties with the candidates eliminated in the last round
+    ranking.remove((survivors[0], stats[survivors[0]]))
+    return [(survivors[0], stats[survivors[0]])] + ranking
+
+
+def write_ranking(ranking, path):
+    """Write the ranking returned by `successive_halving` to a CSV file. """
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["rank", "name", "weights", "rounds", "games", "wins", "win_rate"])
+        for rank, (candidate, s) in enumerate(ranking, 1):
+            writer.writerow([rank, candidate.agent.name, candidate.score.weights, s.rounds,
+                             s.games, s.wins, round(s.win_rate, 4)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--space", choices=sorted(SPACES), default="general",
+                        help="scoring function and weight values to search")
+    parser.add_argument("--pairs", type=int, default=NUM_PAIRS,
+                        help="game pairs per candidate and opponent in the first round")
+    parser.add_argument("--eta", type=int, default=ETA,
+                        help="keep 1 / ETA of the candidates after each round")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default=ENGINE)
+    parser.add_argument("--processes", type=int, default=NUM_PROCS)
+    parser.add_argument("--output", default=OUTPUT, help="CSV file for the ranking")
+    parser.add_argument("--results", metavar="PATH",
+                        help="append every finished game to this results log")
+    parser.add_argument("--seed", type=int,
+                        help="seed the openings and the random choices of every game")
+    args = parser.parse_args()
+    if args.eta < 2:
+        parser.error("--eta must be at least 2")
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    score_fn, space = SPACES[args.space]
+    candidates = make_candidates(score_fn, space)
+    opponents = [Agent(AlphaBetaPlayer(score_fn=improved_score), "AB_Improved")]
+    print("{} candidates for {}".format(len(candidates), score_fn.__name__))
+
+    results = tournament_mp.ResultsLog(args.results) if args.results else None
+    workers = tournament_mp.start_pool([c.agent for c in candidates] + opponents, args.processes)
+    try:
+        ranking = successive_halving(candidates, opponents, workers, args.pairs, args.eta,
+                                     args.engine, results)
+    finally:
+        tournament_mp.stop_pool(workers)
+        if results is not None:
+            results.close()
+
+    write_ranking(ranking, args.output)
+    print("\n{:<6}{:<40}{:>8}{:>8}{:>10}".format("Rank", "Candidate", "Rounds", "Games", "Win Rate"))
+    for rank, (candidate, s) in enumerate(ranking[:20], 1):
+        print("{:<6}{:<40}{:>8}{:>8}{:>9.1f}%".format(
+            rank, candidate.agent.name, s.rounds, s.games, 100 * s.win_rate))
+    print("\nRanking of all {} candidates written to {}".format(len(ranking), args.output))
+
+
+if __name__ == "__main__":
+    main()